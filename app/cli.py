@@ -0,0 +1,280 @@
+"""Command-line entry point for masking files without the GUI.
+
+Example:
+
+    python -m app.cli "exports/*.csv" --spec spec.json --output masked/ --workers 4
+"""
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.config.settings import DEFAULT_CHUNKSIZE
+from app.services.instrumentation import recording
+from app.services.io import (
+    ARROW_EXTENSIONS,
+    SUPPORTED_EXTENSIONS,
+    read_arrow_table,
+    read_table,
+)
+from app.services.mapping_store import MappingStore
+from app.services.mask import mask_arrow_table, mask_with_plan
+from app.services.parallel import mask_parallel
+from app.services.spec import compile_spec, load_spec
+from app.services.streaming import (
+    mask_arrow_in_batches,
+    mask_csv_in_chunks,
+    mask_workbook,
+)
+from app.services.writers import WRITERS, write_dataframe
+
+
+def expand_inputs(patterns):
+    """Expand glob patterns into a sorted list of supported input files."""
+    files = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) or [pattern]
+        files.extend(
+            path for path in matches if path.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+    return sorted(dict.fromkeys(files))
+
+
+def output_path_for(input_path, output, extension=None, many=False):
+    """Work out where the masked copy of input_path is written."""
+    name, ext = os.path.splitext(os.path.basename(input_path))
+    if ext.lower() == ".xls":
+        ext = ".xlsx"  # xls files cannot be written, fall back to xlsx
+    ext = extension or ext
+    if output and not many and not os.path.isdir(output) and os.path.splitext(output)[1]:
+        return output
+    directory = output or os.path.dirname(input_path)
+    return os.path.join(directory, f"{name}_masked{ext}")
+
+
+def mask_file(
+    input_path,
+    output_path,
+    spec,
+    delimiter=",",
+    stream=False,
+    chunksize=DEFAULT_CHUNKSIZE,
+    mapping_store_path=None,
+    seed=None,
+    secret=None,
+    column_workers=1,
+    metrics_path=None,
+):
+    """Mask one file and write the result; returns the log entries.
+
+    With metrics_path, the timings, memory and counters of every stage are
+    written there as JSON (see instrumentation.MaskingReport).
+    """
+    if metrics_path:
+        with recording(track_memory=True) as recorder:
+            log = mask_file(
+                input_path,
+                output_path,
+                spec,
+                delimiter,
+                stream,
+                chunksize,
+                mapping_store_path,
+                seed,
+                secret,
+                column_workers,
+            )
+        report = recorder.report()
+        report.save(metrics_path)
+        return log + report.summary() + [f"Metrics saved to '{metrics_path}'"]
+
+    plan = compile_spec(spec)
+    mapping_store = MappingStore(mapping_store_path) if mapping_store_path else None
+    try:
+        if stream and input_path.lower().endswith(".csv"):
+            _, log = mask_csv_in_chunks(
+                input_path,
+                output_path,
+                plan,
+                delimiter,
+                chunksize,
+                mapping_store,
+                seed,
+                secret,
+            )
+            return log
+
+        if input_path.lower().endswith((".xlsx", ".xls")):
+            # Every sheet, read and written row by row
+            _, log = mask_workbook(
+                input_path, output_path, plan, chunksize, mapping_store, seed, secret
+            )
+            return log
+
+        if input_path.lower().endswith(ARROW_EXTENSIONS):
+            if stream:
+                _, log = mask_arrow_in_batches(
+                    input_path, output_path, plan, chunksize, mapping_store, seed, secret
+                )
+                return log
+            # Unmasked columns stay Arrow data all the way to the writer
+            table = read_arrow_table(input_path, plan.input_columns)
+            masked_table, log = mask_arrow_table(
+                table, plan, rng=seed, mapping_store=mapping_store, secret=secret
+            )
+            write_dataframe(masked_table, output_path, delimiter)
+            return log
+
+        df = read_table(input_path, delimiter, plan.input_columns)
+        if column_workers > 1 and mapping_store is None:
+            masked_df, log = mask_parallel(
+                df, spec, column_workers, seed=seed, secret=secret, inplace=True
+            )
+        else:
+            masked_df, log = mask_with_plan(
+                df,
+                plan,
+                rng=seed,
+                mapping_store=mapping_store,
+                secret=secret,
+                inplace=True,
+            )
+        write_dataframe(masked_df, output_path, delimiter)
+        return log
+    finally:
+        if mapping_store is not None:
+            mapping_store.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Mask CSV, Excel, Parquet and Feather/Arrow files with fake data "
+        "without the GUI.",
+    )
+    parser.add_argument("inputs", nargs="+", help="Input files or glob patterns.")
+    parser.add_argument(
+        "-s", "--spec", required=True, help="JSON or YAML masking spec file."
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output file (single input) or directory. Defaults to next to each input.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(ext.lstrip(".") for ext in WRITERS),
+        help="Output format. Defaults to the input format.",
+    )
+    parser.add_argument("-d", "--delimiter", default=",", help="CSV delimiter.")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="Number of files masked in parallel."
+    )
+    parser.add_argument(
+        "--column-workers",
+        type=int,
+        default=1,
+        help="Processes used to mask the columns and row ranges of each file.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Mask CSV, Parquet and Feather/Arrow files in chunks.",
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--mapping-store",
+        help="SQLite file with mappings shared across files and runs "
+        "(used by columns with a namespace).",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Random seed for reproducible output."
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Write per-stage timings, memory and counters to <output>.metrics.json.",
+    )
+    parser.add_argument(
+        "--key-env",
+        default="DATA_MASKING_KEY",
+        help="Environment variable holding the secret key of deterministic specs.",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        spec = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        print(f"Error loading spec '{args.spec}': {e}", file=sys.stderr)
+        return 2
+    secret = os.environ.get(args.key_env)
+    if spec.deterministic and not secret:
+        print(
+            f"Deterministic specs need a secret key in ${args.key_env}.", file=sys.stderr
+        )
+        return 2
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print("No matching input files.", file=sys.stderr)
+        return 1
+
+    many = len(inputs) > 1
+    extension = f".{args.format}" if args.format else None
+    jobs = [
+        (path, output_path_for(path, args.output, extension, many)) for path in inputs
+    ]
+    for _, output_path in jobs:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    job_args = [
+        (
+            path,
+            output_path,
+            spec,
+            args.delimiter,
+            args.stream,
+            args.chunksize,
+            args.mapping_store,
+            args.seed,
+            secret,
+            args.column_workers,
+            output_path + ".metrics.json" if args.metrics else None,
+        )
+        for path, output_path in jobs
+    ]
+
+    failures = 0
+    if args.workers > 1 and many:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(mask_file, *a): a for a in job_args}
+            for future in as_completed(futures):
+                path, output_path = futures[future][:2]
+                failures += report(path, output_path, future.result)
+    else:
+        for a in job_args:
+            path, output_path = a[0], a[1]
+            failures += report(path, output_path, lambda a=a: mask_file(*a))
+    return 1 if failures else 0
+
+
+def report(path, output_path, get_log):
+    """Print the outcome of one masking job; returns 1 on failure."""
+    try:
+        log = get_log()
+    except Exception as e:
+        print(f"Error masking '{path}': {e}", file=sys.stderr)
+        return 1
+    for entry in log:
+        print(f"{path}: {entry}")
+    print(f"Masked data saved to '{output_path}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
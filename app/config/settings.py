@@ -1,3 +1,5 @@
+import os
+
 import faker
 from app.utils import generate_uuid
 
@@ -20,3 +22,59 @@ FIELD_TYPES = {
     "Product Name": lambda: fake.catch_phrase(),
     "State or Province": lambda: fake.state(),
 }
+
+# Faker provider method behind each pooled field type
+FAKER_PROVIDERS = {
+    "Name": "name",
+    "Full Name": "name",
+    "Address": "address",
+    "Phone": "phone_number",
+    "Email": "email",
+    "Company": "company",
+    "Department": "job",
+    "City": "city",
+    "Country": "country",
+    "Zip Code": "zipcode",
+    "Product Name": "catch_phrase",
+    "State or Province": "state",
+}
+
+# Value pool settings: pools are generated once per field type and locale
+DEFAULT_LOCALE = "en_US"
+DEFAULT_POOL_SIZE = 5000
+POOL_CACHE_DIR = os.environ.get(
+    "DATA_MASKING_POOL_DIR",
+    os.path.join(os.path.expanduser("~"), ".data_masking_tool", "pools"),
+)
+
+# Number of rows read, masked and written at a time in streaming mode
+DEFAULT_CHUNKSIZE = 100_000
+
+# Number of (namespace, value) pairs the mapping store keeps in its in-memory LRU cache
+DEFAULT_MAPPING_CACHE_SIZE = 100_000
+
+# Rows read to fill the column panel and preview when a file is opened
+DEFAULT_SAMPLE_ROWS = 1000
+
+# Bytes of a CSV file inspected to detect its delimiter
+SNIFF_BYTES = 64 * 1024
+
+# Values per column examined by PII detection, so it runs in constant time per column
+DETECT_SAMPLE_ROWS = 200
+
+# Detected columns with at least this confidence are selected for masking
+DETECT_SELECT_CONFIDENCE = 0.8
+
+# Folder-watch service: seconds between scans of the watched folders, and
+# files waiting to be masked before scanning pauses
+WATCH_POLL_INTERVAL = 2.0
+WATCH_QUEUE_SIZE = 16
+
+# Local HTTP API: address, requests masked at once, seconds a request waits
+# for a free slot before it is turned away, and requests whose latency
+# /metrics reports on
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_MAX_CONCURRENT = 4
+SERVER_WAIT_SECONDS = 5.0
+SERVER_LATENCY_WINDOW = 1000
@@ -0,0 +1,126 @@
+"""Service mode: a local HTTP API that masks CSV, Parquet and Feather data.
+
+Example:
+
+    python -m app.serve --spec customers=customers_spec.json --port 8765
+
+    curl --data-binary @customers.csv -H "Content-Type: text/csv" \\
+        http://127.0.0.1:8765/mask/customers > customers_masked.csv
+"""
+import argparse
+import os
+import sys
+
+from app.config.settings import (
+    DEFAULT_CHUNKSIZE,
+    SERVER_HOST,
+    SERVER_MAX_CONCURRENT,
+    SERVER_PORT,
+    SERVER_WAIT_SECONDS,
+)
+from app.services.mapping_store import MappingStore
+from app.services.server import MaskingServer
+from app.services.spec import load_spec
+
+
+def parse_specs(values):
+    """Map spec names to paths from NAME=PATH values; a bare PATH is named by its file."""
+    specs = {}
+    for value in values:
+        name, separator, path = value.partition("=")
+        if not separator:
+            path = value
+            name = os.path.splitext(os.path.basename(value))[0]
+        specs[name] = path
+    return specs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m app.serve",
+        description="Serve a local HTTP API that masks CSV, Parquet and Feather data.",
+    )
+    parser.add_argument(
+        "-s",
+        "--spec",
+        action="append",
+        default=[],
+        help="Masking spec served at /mask/NAME, as NAME=PATH. May be repeated. "
+        "Requests to /mask send their own spec in the X-Masking-Spec header.",
+    )
+    parser.add_argument("--host", default=SERVER_HOST, help="Address to listen on.")
+    parser.add_argument("-p", "--port", type=int, default=SERVER_PORT)
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=SERVER_MAX_CONCURRENT,
+        help="Requests masked at once; others wait for a free slot.",
+    )
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=SERVER_WAIT_SECONDS,
+        help="Seconds a request waits for a free slot before getting 503.",
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--mapping-store",
+        help="SQLite file with mappings shared across requests and runs "
+        "(used by columns with a namespace).",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Random seed for reproducible output."
+    )
+    parser.add_argument(
+        "--key-env",
+        default="DATA_MASKING_KEY",
+        help="Environment variable holding the secret key of deterministic specs.",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    specs = {}
+    for name, path in parse_specs(args.spec).items():
+        try:
+            specs[name] = load_spec(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading spec '{path}': {e}", file=sys.stderr)
+            return 2
+    secret = os.environ.get(args.key_env)
+    if any(spec.deterministic for spec in specs.values()) and not secret:
+        print(
+            f"Deterministic specs need a secret key in ${args.key_env}.", file=sys.stderr
+        )
+        return 2
+
+    mapping_store = MappingStore(args.mapping_store) if args.mapping_store else None
+    try:
+        server = MaskingServer(
+            (args.host, args.port),
+            specs,
+            args.max_concurrent,
+            args.wait,
+            args.chunksize,
+            mapping_store,
+            args.seed,
+            secret,
+        )
+        host, port = server.server_address[:2]
+        print(f"Serving the masking API on http://{host}:{port} (Ctrl+C to stop).")
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Cannot listen on {args.host}:{args.port}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if mapping_store is not None:
+            mapping_store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import re
+from dataclasses import dataclass
+
+from app.config.settings import DETECT_SAMPLE_ROWS
+from app.services.instrumentation import count, span
+
+
+@dataclass
+class Detector:
+    """Recognizes the values of one field type.
+
+    pattern must match a whole value. A weak pattern also matches plenty of
+    data that is not personal (five-digit codes, capitalized words), so its
+    matches only count fully when the column name agrees.
+    """
+
+    field_type: str
+    pattern: re.Pattern
+    name_hint: re.Pattern
+    weak: bool = False
+    # Digits a matching value must contain, for patterns that allow separators
+    min_digits: int = 0
+    # Distinct values per non-blank value needed, e.g. names rarely repeat much
+    min_distinct: float = 0.0
+
+
+# Checked in this order, so the more specific type wins a tie
+DETECTORS = [
+    Detector(
+        "UUID",
+        re.compile(r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}", re.I),
+        re.compile(r"uuid|guid", re.I),
+    ),
+    Detector(
+        "Email",
+        re.compile(r"[\w.+'-]+@[\w-]+(\.[\w-]+)+"),
+        re.compile(r"e-?mail", re.I),
+    ),
+    Detector(
+        "Date",
+        re.compile(
+            r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?"
+            r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}"
+        ),
+        re.compile(r"date|dob|birth|(^|_)(created|updated)(_|$)", re.I),
+    ),
+    Detector(
+        "Phone",
+        re.compile(r"\+?[\d\s().-]{7,20}(\s*(x|ext\.?)\s*\d{1,5})?", re.I),
+        re.compile(r"phone|mobile|cell|(^|_)tel|fax", re.I),
+        min_digits=7,
+    ),
+    Detector(
+        "Zip Code",
+        re.compile(
+            r"\d{5}(-\d{4})?"
+            r"|[A-Z]{1,2}\d[A-Z\d]? ?\d[A-Z]{2}"
+            r"|[A-Z]\d[A-Z] ?\d[A-Z]\d",
+            re.I,
+        ),
+        re.compile(r"zip|postal|post_?code", re.I),
+        weak=True,
+    ),
+    Detector(
+        "Full Name",
+        re.compile(r"[A-Z][a-z'’-]+\.?( [A-Z][a-z'’-]*\.?){1,3}"),
+        re.compile(r"name|customer|contact|person|employee", re.I),
+        weak=True,
+        min_distinct=0.3,
+    ),
+    Detector(
+        "Name",
+        re.compile(r"[A-Z][a-z'’-]+"),
+        re.compile(r"(first|last|given|sur|middle|maiden)_?name|forename", re.I),
+        weak=True,
+        min_distinct=0.3,
+    ),
+]
+
+# Confidence of a weak pattern whose column name gives no hint
+WEAK_FACTOR = 0.6
+# Added to the confidence when the column name agrees with the values
+NAME_HINT_BONUS = 0.1
+
+
+@dataclass
+class Detection:
+    """Suggested field type of one column."""
+
+    column: str
+    field_type: str
+    # Between 0 and 1; mostly the share of sampled values matching the type
+    confidence: float
+
+
+def sample_values(series, sample_size=DETECT_SAMPLE_ROWS):
+    """Up to sample_size non-blank values of a column as stripped strings."""
+    values = series.head(sample_size * 2).dropna().head(sample_size)
+    values = values.astype(str).str.strip()
+    return values[values != ""]
+
+
+def score(detector, values, column_name=""):
+    """Confidence that values, taken from column column_name, are of detector's type."""
+    if values.empty:
+        return 0.0
+    matches = values.str.fullmatch(detector.pattern).fillna(False)
+    if detector.min_digits:
+        matches &= values.str.count(r"\d") >= detector.min_digits
+    confidence = float(matches.mean())
+    if detector.min_distinct and values.nunique() < detector.min_distinct * len(values):
+        confidence *= values.nunique() / (detector.min_distinct * len(values))
+    if detector.name_hint.search(str(column_name)):
+        confidence = min(1.0, confidence + NAME_HINT_BONUS) if confidence >= 0.5 else confidence
+    elif detector.weak:
+        confidence *= WEAK_FACTOR
+    return confidence
+
+
+def detect_column(series, sample_size=DETECT_SAMPLE_ROWS, column_name=None):
+    """Best suggestion for one column, or None when nothing matches.
+
+    Only the first sample_size non-blank values are examined, so the time
+    taken does not depend on the length of the column.
+    """
+    column_name = series.name if column_name is None else column_name
+    kind = series.dtype.kind
+    if kind == "M":
+        return Detection(column_name, "Date", 1.0)
+    if kind in "fcbmV":
+        return None  # Floats, booleans and durations are not masked as PII
+    values = sample_values(series, sample_size)
+    count("detect.values", len(values))
+    best = None
+    for detector in DETECTORS:
+        if kind in "iu" and (
+            detector.field_type not in ("Phone", "Zip Code")
+            # Integer IDs and amounts have digits only, like unformatted
+            # phone numbers and zip codes; only the column name tells them apart
+            or not detector.name_hint.search(str(column_name))
+        ):
+            continue
+        confidence = score(detector, values, column_name)
+        if confidence > 0 and (best is None or confidence > best.confidence):
+            best = Detection(column_name, detector.field_type, round(confidence, 3))
+    return best
+
+
+def detect_pii(df, sample_size=DETECT_SAMPLE_ROWS, min_confidence=0.5):
+    """Suggested field types of the columns of df that look like personal data.
+
+    Returns {column: Detection} for the columns whose best suggestion has at
+    least min_confidence.
+    """
+    detections = {}
+    with span("detect", columns=len(df.columns)):
+        for name in df.columns:
+            detection = detect_column(df[name], sample_size, name)
+            if detection is not None and detection.confidence >= min_confidence:
+                detections[name] = detection
+    return detections
@@ -0,0 +1,474 @@
+import numpy as np
+import pandas as pd
+
+from app.config.settings import FAKER_PROVIDERS
+from app.services.instrumentation import count
+from app.services.pools import default_pools
+
+# Character tables used to build strings from random byte arrays
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype="S1")
+DIGITS = HEX_DIGITS[:10]
+SECONDS_PER_DAY = 24 * 60 * 60
+# Character class of each ASCII code point (0 other, 1 digit, 2 upper, 3 lower case),
+# with the first code point and size of each class
+CHAR_CLASSES = np.zeros(128, dtype=np.uint8)
+CHAR_CLASSES[ord("0") : ord("9") + 1] = 1
+CHAR_CLASSES[ord("A") : ord("Z") + 1] = 2
+CHAR_CLASSES[ord("a") : ord("z") + 1] = 3
+CLASS_FIRST = np.array([0, ord("0"), ord("A"), ord("a")], dtype=np.uint32)
+CLASS_SIZES = np.array([1, 10, 26, 26], dtype=np.uint16)
+# Luhn value of each digit in a doubled position
+LUHN_DOUBLED = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.uint8)
+LETTERS = np.frombuffer(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ", dtype="S1"
+)
+
+
+def get_rng(rng=None):
+    """Return a NumPy Generator, creating one from a seed when needed."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def _bytes_to_str(chars):
+    """Turn an (n, width) array of single bytes into an object array of str."""
+    width = chars.shape[1]
+    joined = np.ascontiguousarray(chars).view(f"S{width}").ravel()
+    return joined.astype(str).astype(object)
+
+
+def _add_affixes(values, prefix, suffix):
+    if prefix:
+        values = prefix + values
+    if suffix:
+        values = values + suffix
+    return values
+
+
+class ColumnGenerator:
+    """Base class for generators that build whole columns of fake values."""
+
+    # NumPy dtype kind of the generated values
+    value_kind = "O"
+    # Positional generators number rows rather than replace values, so they
+    # are called with generate_rows and ignore mappings
+    positional = False
+    # Generators deriving fake values from the originals, called with generate_from
+    uses_source = False
+
+    def generate(self, n, rng):
+        raise NotImplementedError
+
+    def generate_from(self, values, rng):
+        """Fake values for the original values (by default, ignoring them)."""
+        return self.generate(len(values), rng)
+
+    def generate_for_uniques(self, n, rng, offset=0, assigned=None):
+        """Fake values for n newly seen unique values when mappings are kept.
+
+        offset is the number of values the mapping already holds and assigned
+        their fake values.
+        """
+        return self.generate(n, rng)
+
+
+class FakerGenerator(ColumnGenerator):
+    """Samples Faker values for a field type from a precomputed value pool."""
+
+    def __init__(
+        self, field_type, prefix="", suffix="", locale=None, unique=False, pools=None
+    ):
+        self.field_type = field_type
+        self.prefix = prefix or ""
+        self.suffix = suffix or ""
+        self.locale = locale
+        self.unique = unique
+        self.pools = pools or default_pools
+
+    def generate(self, n, rng):
+        values = self.pools.sample(self.field_type, n, rng, self.locale, self.unique)
+        return _add_affixes(values, self.prefix, self.suffix)
+
+    def generate_for_uniques(self, n, rng, offset=0, assigned=None):
+        if not self.unique or assigned is None or not len(assigned):
+            return self.generate(n, rng)
+        # A mapping filled chunk by chunk must not hand out a value twice
+        pool = self.pools.get(self.field_type, self.locale, True, min_size=n + len(assigned))
+        taken = pd.Index(_add_affixes(pool.values, self.prefix, self.suffix)).isin(assigned)
+        values = pool.sample(n, rng, unique=True, taken=taken)
+        return _add_affixes(values, self.prefix, self.suffix)
+
+
+class NumberGenerator(ColumnGenerator):
+    """Generates integers or two-decimal floats within [min_val, max_val]."""
+
+    def __init__(self, min_val=0, max_val=1, is_integer=False):
+        self.min_val = min_val
+        self.max_val = max_val
+        self.is_integer = is_integer
+
+    @property
+    def value_kind(self):
+        return "i" if self.is_integer else "f"
+
+    def generate(self, n, rng):
+        if self.is_integer:
+            return rng.integers(
+                int(self.min_val), int(self.max_val), size=n, endpoint=True
+            )
+        return np.round(rng.uniform(self.min_val, self.max_val, size=n), 2)
+
+
+class DateGenerator(ColumnGenerator):
+    """Generates dates between start_date and end_date (inclusive).
+
+    distribution is "uniform" over every day or "weekdays" for Monday to
+    Friday only; include_time adds a uniform time of day. With jitter_days
+    the original dates are kept and each one is shifted by up to that many
+    days either way instead.
+    """
+
+    value_kind = "M"
+
+    def __init__(
+        self,
+        start_date="2020-01-01",
+        end_date="2023-12-31",
+        distribution="uniform",
+        include_time=False,
+        jitter_days=None,
+    ):
+        self.start = np.datetime64(start_date, "D")
+        self.end = np.datetime64(end_date, "D")
+        self.span = int((self.end - self.start).astype(int))
+        self.distribution = distribution
+        self.include_time = include_time
+        self.jitter_days = jitter_days
+        self.uses_source = bool(jitter_days)
+        if distribution == "weekdays":
+            self.weekdays = int(np.busday_count(self.start, self.end + 1))
+            if not self.weekdays:
+                raise ValueError("The date range has no weekdays.")
+
+    def generate(self, n, rng):
+        if self.distribution == "weekdays":
+            offsets = rng.integers(0, self.weekdays, size=n)
+            days = np.busday_offset(self.start, offsets, roll="forward")
+        else:
+            offsets = rng.integers(0, self.span, size=n, endpoint=True)
+            days = self.start + offsets.astype("timedelta64[D]")
+        dates = days.astype("datetime64[ns]")
+        if self.include_time:
+            dates = dates + rng.integers(0, SECONDS_PER_DAY, size=n).astype("timedelta64[s]")
+        return dates
+
+    def generate_from(self, values, rng):
+        if not self.jitter_days:
+            return self.generate(len(values), rng)
+        dates = pd.to_datetime(pd.Series(values), errors="coerce").to_numpy(
+            dtype="datetime64[ns]"
+        )
+        n = len(dates)
+        if self.include_time:
+            shift = self.jitter_days * SECONDS_PER_DAY
+            dates = dates + rng.integers(-shift, shift, size=n, endpoint=True).astype(
+                "timedelta64[s]"
+            )
+        else:
+            dates = dates + rng.integers(
+                -self.jitter_days, self.jitter_days, size=n, endpoint=True
+            ).astype("timedelta64[D]")
+        if self.distribution == "weekdays":
+            # Move weekend dates to the next Monday, keeping the time of day
+            valid = ~np.isnat(dates)
+            days = dates[valid].astype("datetime64[D]")
+            time_of_day = dates[valid] - days.astype("datetime64[ns]")
+            dates[valid] = (
+                np.busday_offset(days, 0, roll="forward").astype("datetime64[ns]")
+                + time_of_day
+            )
+        return dates
+
+
+class CustomListGenerator(ColumnGenerator):
+    """Picks values from a user supplied list."""
+
+    def __init__(self, values):
+        if not values:
+            raise ValueError("Custom List requires at least one value.")
+        self.values = np.asarray(values, dtype=object)
+
+    def generate(self, n, rng):
+        return self.values[rng.integers(0, len(self.values), size=n)]
+
+    def generate_for_uniques(self, n, rng, offset=0, assigned=None):
+        # Unique values cycle through the list so every value gets used
+        return self.values[(offset + np.arange(n)) % len(self.values)]
+
+
+class UuidGenerator(ColumnGenerator):
+    """Generates version 4 UUIDs or alphanumeric codes with prefix/suffix."""
+
+    def __init__(self, prefix="", suffix="", uuid_type="UUID", char_length=8):
+        self.prefix = prefix or ""
+        self.suffix = suffix or ""
+        self.uuid_type = uuid_type
+        self.char_length = int(char_length or 8)
+
+    def generate(self, n, rng):
+        if self.uuid_type == "UUID":
+            values = self._uuid4(n, rng)
+        else:
+            idx = rng.integers(0, len(LETTERS), size=(n, self.char_length))
+            values = _bytes_to_str(LETTERS[idx])
+        return _add_affixes(values, self.prefix, self.suffix)
+
+    @staticmethod
+    def _uuid4(n, rng):
+        raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+        # Set the version (4) and variant (RFC 4122) bits
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+        nibbles = np.stack([raw >> 4, raw & 0x0F], axis=-1).reshape(n, 32)
+        chars = np.insert(HEX_DIGITS[nibbles], [8, 12, 16, 20], b"-", axis=1)
+        return _bytes_to_str(chars)
+
+
+class RowNumberGenerator(ColumnGenerator):
+    """Numbers rows as prefix + zero-padded number + suffix, e.g. ROW-0001."""
+
+    positional = True
+
+    def __init__(self, prefix="ROW-", suffix="", start=1, pad_width=4):
+        self.prefix = prefix or ""
+        self.suffix = suffix or ""
+        self.start = int(start)
+        self.pad_width = int(pad_width)
+
+    def generate(self, n, rng):
+        return self.generate_rows(0, n)
+
+    def generate_rows(self, row_offset, n):
+        """Numbers of the n rows starting row_offset rows into the file.
+
+        Chunks and partitions pass their first row as row_offset, so rows
+        masked separately are numbered without gaps or repeats.
+        """
+        first = self.start + row_offset
+        parts = []
+        # The numbers are consecutive, so each digit count covers one slice of
+        # rows, built from a digit matrix like the other string generators
+        position = 0
+        while position < n:
+            number = first + position
+            width = max(self.pad_width, len(str(number)))
+            stop = min(n, 10**width - first)
+            numbers = np.arange(number, first + stop)
+            digits = (numbers[:, None] // 10 ** np.arange(width - 1, -1, -1)) % 10
+            chars = np.ascontiguousarray(DIGITS[digits]).view(f"S{width}").ravel()
+            parts.append(chars.astype(str))
+            position = stop
+        values = np.concatenate(parts) if parts else np.empty(0, dtype=str)
+        if self.prefix:
+            values = np.char.add(self.prefix, values)
+        if self.suffix:
+            values = np.char.add(values, self.suffix)
+        return values.astype(object)
+
+
+class FormatPreservingGenerator(ColumnGenerator):
+    """Randomizes identifiers while keeping their length and character classes.
+
+    Every digit is replaced by a random digit and every letter by a random
+    letter of the same case; punctuation, spaces and other characters stay
+    where they are. With checksum="luhn" the last digit of each value is
+    recomputed so the result passes a Luhn check (card numbers, IMEIs).
+    All values are handled at once as a matrix of UTF-32 code points.
+    """
+
+    uses_source = True
+
+    def __init__(self, checksum=None):
+        self.checksum = checksum
+
+    def generate(self, n, rng):
+        raise ValueError("Format Preserving masking needs the original values.")
+
+    def generate_from(self, values, rng):
+        series = pd.Series(values, dtype=object)
+        missing = series.isna().to_numpy()
+        text = series.where(~missing, "").to_numpy(dtype=str)
+        width = max(text.dtype.itemsize // 4, 1)
+        n = len(text)
+        codes = text.astype(f"U{width}").view(np.uint32).reshape(n, width).copy()
+
+        # 130 is a multiple of both 10 and 26, so draws % 10 and draws % 26 are uniform
+        draws = rng.integers(0, 130, size=(n, width), dtype=np.uint16)
+        classes = CHAR_CLASSES[np.minimum(codes, 127)]
+        replaced = CLASS_FIRST[classes] + draws % CLASS_SIZES[classes]
+        codes = np.where(classes > 0, replaced, codes)
+        digits = classes == 1
+        if self.checksum == "luhn":
+            codes = _luhn_fix(codes, digits)
+
+        masked = codes.view(f"U{width}").ravel().astype(object)
+        masked[missing] = None
+        return masked
+
+
+def _luhn_fix(codes, digits):
+    """Set the last digit of each row of code points to its Luhn check digit."""
+    values = np.where(digits, codes - ord("0"), 0).astype(np.uint8)
+    # Position of each digit counted from the right: 1 for the check digit
+    rank = np.cumsum(digits[:, ::-1], axis=1, dtype=np.int16)[:, ::-1]
+    doubled = (rank % 2 == 0) & digits
+    weighted = np.where(doubled, LUHN_DOUBLED[values], values)
+    weighted[rank == 1] = 0
+    total = weighted.sum(axis=1, dtype=np.int64)
+    check = (10 - total % 10) % 10
+    return np.where(digits & (rank == 1), ord("0") + check[:, None], codes).astype(np.uint32)
+
+
+def make_generator(field_type, config=None, pools=None):
+    """Build the column generator for a field type and its configuration."""
+    config = config or {}
+    if field_type == "Custom List":
+        return CustomListGenerator(config.get("values", []))
+    if field_type == "Number":
+        return NumberGenerator(
+            config.get("min", 0), config.get("max", 1), config.get("is_integer", False)
+        )
+    if field_type == "Date":
+        return DateGenerator(
+            config.get("start_date", "2020-01-01"),
+            config.get("end_date", "2023-12-31"),
+            config.get("distribution", "uniform"),
+            config.get("include_time", False),
+            config.get("jitter_days"),
+        )
+    if field_type == "UUID":
+        return UuidGenerator(
+            config.get("prefix", ""),
+            config.get("suffix", ""),
+            config.get("uuid_type", "UUID"),
+            config.get("char_length", 8),
+        )
+    if field_type == "Format Preserving":
+        return FormatPreservingGenerator(config.get("checksum"))
+    if field_type == "Row Number":
+        return RowNumberGenerator(
+            config.get("prefix", "ROW-"),
+            config.get("suffix", ""),
+            config.get("start", 1),
+            config.get("pad_width", 4),
+        )
+    if field_type in FAKER_PROVIDERS:
+        return FakerGenerator(
+            field_type,
+            config.get("prefix", ""),
+            config.get("suffix", ""),
+            config.get("locale"),
+            config.get("unique", False),
+            pools,
+        )
+    raise ValueError(f"Unsupported field type: {field_type}")
+
+
+# How blank_percent is applied: "random" blanks each row (each unique value
+# when mappings are kept) with that probability, while "rows" and "values"
+# blank exactly that share of the rows or of the distinct original values
+BLANK_MODES = ("random", "rows", "values")
+
+
+def blank_mask(n, blank_percent, rng, exact=False):
+    """Boolean mask marking the positions that should be left blank.
+
+    With exact, round(blank_percent * n) positions are chosen rather than
+    each one being blank with probability blank_percent.
+    """
+    if blank_percent <= 0:
+        return np.zeros(n, dtype=bool)
+    if exact:
+        return _exact_mask(n, blank_percent, rng)
+    return rng.random(n) < blank_percent
+
+
+def _exact_mask(n, share, rng, eligible=None, already=0):
+    """Mask of round(share * n) - already positions drawn from the eligible ones."""
+    mask = np.zeros(n, dtype=bool)
+    candidates = np.arange(n) if eligible is None else np.flatnonzero(eligible)
+    k = min(max(int(np.floor(share * n + 0.5)) - already, 0), len(candidates))
+    if k:
+        mask[candidates[rng.choice(len(candidates), k, replace=False)]] = True
+    return mask
+
+
+def random_blank_percent(column):
+    """Per-row blank probability for generate_column; exact modes blank afterwards."""
+    return column.blank_percent if column.blank_mode == "random" else 0
+
+
+def inject_blanks(values, source, column, rng, mapped=False, mapping=None):
+    """Blank a masked column as its exact blank mode and keep_nulls ask.
+
+    One vectorized mask per column: "rows" blanks exactly blank_percent of
+    the rows, and "values" (unless mapped, when the mapping has already
+    blanked its unique values) every row of exactly blank_percent of the
+    distinct original values. Pass the same ColumnMapping as mapping for
+    every chunk of a file so each value stays blank or filled in all of
+    them. With keep_nulls the original blanks stay blank and count towards
+    the rows to blank.
+    """
+    mode = column.blank_mode
+    if mode == "random" and not column.keep_nulls:
+        return values
+    n = len(values)
+    nulls = pd.isna(source).to_numpy() if column.keep_nulls else np.zeros(n, dtype=bool)
+    mask = nulls
+    if mode == "rows":
+        mask = nulls | _exact_mask(
+            n, column.blank_percent, rng, ~nulls, int(nulls.sum())
+        )
+    elif mode == "values" and not mapped:
+        if mapping is None:
+            from app.services.mapping import ColumnMapping
+
+            mapping = ColumnMapping()
+        mask = nulls | mapping.blanked_rows(source, column, rng)
+    return apply_blanks(values, mask)
+
+
+def apply_blanks(values, mask):
+    """Replace masked positions with the null value matching the array dtype."""
+    if not mask.any():
+        return values
+    if values.dtype.kind == "M":
+        values = values.copy()
+        values[mask] = np.datetime64("NaT")
+    elif values.dtype.kind in "iubf":
+        values = values.astype(float)
+        values[mask] = np.nan
+    else:
+        values = values.astype(object)
+        values[mask] = None
+    return values
+
+
+def generate_column(generator, n, blank_percent, rng, row_offset=0, source=None):
+    """Generate a whole masked column in one batch, including blanks.
+
+    blank_percent is applied as a per-row probability ("random" mode).
+    row_offset is the position of the first row in the file, used by
+    positional generators such as Row Number; source holds the original
+    values, used by generators such as a jittered Date.
+    """
+    count("generator_calls")
+    count("generated_values", n)
+    if generator.positional:
+        values = generator.generate_rows(row_offset, n)
+    elif generator.uses_source:
+        values = generator.generate_from(source, rng)
+    else:
+        values = generator.generate(n, rng)
+    return apply_blanks(values, blank_mask(n, blank_percent, rng))
@@ -0,0 +1,231 @@
+"""Timing, memory and counter instrumentation of the masking pipeline.
+
+The pipeline stages call span() and count(), which do nothing unless a
+Recorder is active in the current context:
+
+    with recording() as recorder:
+        masked_df, log = mask_with_plan(df, plan)
+    print(recorder.report().summary())
+
+Functions in hooks (see add_hook) receive every span and counter event of
+every recorder, so the numbers can be fed into other metrics systems.
+"""
+import contextvars
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+_active = contextvars.ContextVar("masking_recorder", default=None)
+
+# Called with the event dictionary of every finished span and counter update
+hooks = []
+
+
+def add_hook(hook):
+    hooks.append(hook)
+
+
+def remove_hook(hook):
+    hooks.remove(hook)
+
+
+@dataclass
+class Span:
+    """One timed stage, e.g. reading a file or masking one column."""
+
+    name: str
+    attrs: dict = field(default_factory=dict)
+    # Seconds since the recorder started
+    start: float = 0.0
+    seconds: float = 0.0
+    # Peak bytes allocated during the span above what was allocated at its start
+    peak_memory: int = None
+    depth: int = 0
+
+
+@dataclass
+class MaskingReport:
+    """Spans and counters recorded while masking, ready for JSON output."""
+
+    spans: list
+    counters: dict
+    seconds: float
+    # Peak resident memory of the whole process, in bytes
+    peak_rss: int = None
+
+    def stage_totals(self):
+        """Total seconds and largest peak memory of each span name."""
+        totals = {}
+        for span in self.spans:
+            total = totals.setdefault(
+                span.name, {"count": 0, "seconds": 0.0, "peak_memory": None}
+            )
+            total["count"] += 1
+            total["seconds"] += span.seconds
+            if span.peak_memory is not None:
+                total["peak_memory"] = max(total["peak_memory"] or 0, span.peak_memory)
+        return totals
+
+    def to_dict(self):
+        data = asdict(self)
+        data["stages"] = self.stage_totals()
+        return data
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, default=str)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json() + "\n")
+
+    def summary(self):
+        """Readable lines for the log: time and memory per stage, then counters."""
+        lines = [f"Total time: {self.seconds:.3f}s"]
+        for name, total in self.stage_totals().items():
+            line = f"{name}: {total['seconds']:.3f}s in {total['count']} span(s)"
+            if total["peak_memory"] is not None:
+                line += f", peak {total['peak_memory'] / 2**20:.1f} MiB"
+            lines.append(line)
+        lines.extend(f"{name}: {value}" for name, value in sorted(self.counters.items()))
+        return lines
+
+
+class Recorder:
+    """Collects spans and counters; activate it with recording().
+
+    With track_memory, tracemalloc measures the peak memory of every span.
+    It slows allocation-heavy code down several times, so it is off unless
+    asked for (e.g. by the CLI's --metrics).
+    """
+
+    def __init__(self, hooks=None, track_memory=False):
+        self.hooks = list(hooks or [])
+        self.track_memory = track_memory
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started = time.perf_counter()
+        self._seconds = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        self._seconds = time.perf_counter() - self._started
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @property
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **attrs):
+        stack = self._stack
+        record = Span(name, attrs, time.perf_counter() - self._started, depth=len(stack))
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # The parent's peak so far, before the counter is reset for this span
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        entry = [record, 0]
+        stack.append(entry)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            record.seconds = time.perf_counter() - start
+            if tracing:
+                peak = max(entry[1], tracemalloc.get_traced_memory()[1])
+                record.peak_memory = max(0, peak - current)
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+            with self._lock:
+                self.spans.append(record)
+            self._emit(
+                {
+                    "type": "span",
+                    "name": name,
+                    "attrs": attrs,
+                    "seconds": record.seconds,
+                    "peak_memory": record.peak_memory,
+                }
+            )
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+        self._emit({"type": "counter", "name": name, "value": value})
+
+    def report(self):
+        seconds = self._seconds
+        if seconds is None:
+            seconds = time.perf_counter() - self._started
+        peak_rss = None
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform != "darwin":
+                peak_rss *= 1024
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+            return MaskingReport(spans, dict(self.counters), seconds, peak_rss)
+
+    def _emit(self, event):
+        for hook in self.hooks + hooks:
+            hook(event)
+
+
+@contextmanager
+def recording(hooks=None, track_memory=False, recorder=None):
+    """Activate a Recorder for the code in the with block and yield it."""
+    recorder = recorder or Recorder(hooks, track_memory)
+    token = _active.set(recorder)
+    recorder.start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+        _active.reset(token)
+
+
+def active_recorder():
+    return _active.get()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the with block as a stage of the active recorder, if any."""
+    recorder = _active.get()
+    if recorder is None:
+        yield None
+        return
+    with recorder.span(name, **attrs) as record:
+        yield record
+
+
+def count(name, value=1):
+    """Add value to a counter of the active recorder, if any."""
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.count(name, value)
@@ -0,0 +1,190 @@
+import itertools
+import os
+
+import pandas as pd
+
+from app.config.settings import DEFAULT_CHUNKSIZE
+from app.services.instrumentation import count, span
+
+# File extensions that can be read without the GUI
+ARROW_EXTENSIONS = (".parquet", ".feather", ".arrow")
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls") + ARROW_EXTENSIONS
+
+
+def column_filter(columns):
+    """usecols callable reading only the given columns (all of them for None)."""
+    return None if columns is None else (lambda col: col in columns)
+
+
+def read_table(path, delimiter=",", columns=None, progress=None):
+    """Load a CSV, Excel, Parquet or Feather/Arrow file into a DataFrame.
+
+    columns limits the columns read from the file (None reads all of them).
+    With progress, CSV files are read in chunks and progress("read", rows)
+    is called after each one.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ARROW_EXTENSIONS:
+        return read_arrow_table(path, columns).to_pandas()
+    if ext not in (".csv", ".xlsx", ".xls"):
+        raise ValueError(f"Unsupported file format: '{ext}'.")
+    with span("read", format=ext.lstrip(".")):
+        if ext == ".csv" and progress is not None:
+            df = _read_csv_in_chunks(path, delimiter, columns, progress)
+        elif ext == ".csv":
+            df = pd.read_csv(
+                path,
+                delimiter=delimiter,
+                on_bad_lines="skip",
+                usecols=column_filter(columns),
+            )
+        else:
+            df = pd.read_excel(path, usecols=column_filter(columns))
+    count("rows_read", len(df))
+    return df
+
+
+def _read_csv_in_chunks(path, delimiter, columns, progress):
+    chunks = []
+    rows = 0
+    reader = pd.read_csv(
+        path,
+        delimiter=delimiter,
+        on_bad_lines="skip",
+        usecols=column_filter(columns),
+        chunksize=DEFAULT_CHUNKSIZE,
+    )
+    for chunk in reader:
+        chunks.append(chunk)
+        rows += len(chunk)
+        progress("read", rows)
+    if not chunks:
+        # A file with only a header row yields no chunks
+        return pd.read_csv(
+            path, delimiter=delimiter, usecols=column_filter(columns), nrows=0
+        )
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _openpyxl():
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportError("openpyxl is required to read .xlsx workbooks.") from None
+    return openpyxl
+
+
+def excel_sheet_names(path):
+    """Names of the worksheets of an Excel workbook, in workbook order."""
+    if path.lower().endswith(".xls"):
+        return pd.ExcelFile(path).sheet_names
+    workbook = _openpyxl().load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def iter_excel_chunks(path, sheet_name=None, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrames of at most chunksize rows from one worksheet.
+
+    .xlsx sheets are read row by row with openpyxl in read-only mode, so only
+    one chunk is in memory however long the sheet is. Old .xls files have no
+    streaming reader and are read whole. A sheet with only a header yields
+    one empty DataFrame; sheet_name None reads the first sheet.
+    """
+    if path.lower().endswith(".xls"):
+        df = pd.read_excel(path, sheet_name=sheet_name or 0, usecols=column_filter(columns))
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start : start + chunksize]
+        return
+
+    workbook = _openpyxl().load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            yield pd.DataFrame()
+            return
+        header = [
+            f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)
+        ]
+        keep = [i for i, name in enumerate(header) if columns is None or name in columns]
+        header = [header[i] for i in keep]
+        first = True
+        while True:
+            chunk = list(itertools.islice(rows, chunksize))
+            if not chunk and not first:
+                return
+            first = False
+            yield pd.DataFrame.from_records(
+                [[row[i] if i < len(row) else None for i in keep] for row in chunk],
+                columns=header,
+            )
+            if len(chunk) < chunksize:
+                return
+    finally:
+        workbook.close()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required to read Parquet and Arrow files.") from None
+    return pyarrow
+
+
+def read_arrow_schema(path):
+    """Column names and types of a Parquet or Feather/Arrow file, without reading rows."""
+    pa = _pyarrow()
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def _projection(path, columns):
+    if columns is None:
+        return None
+    return [name for name in read_arrow_schema(path).names if name in columns]
+
+
+def read_arrow_table(path, columns=None):
+    """Read only the given columns of a Parquet or Feather/Arrow file as an Arrow table."""
+    _pyarrow()
+    columns = _projection(path, columns)
+    with span("read", format=os.path.splitext(path)[1].lower().lstrip(".")):
+        if path.lower().endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path, columns=columns)
+        else:
+            import pyarrow.feather as feather
+
+            table = feather.read_table(path, columns=columns, memory_map=True)
+    count("rows_read", table.num_rows)
+    return table
+
+
+def iter_arrow_batches(path, columns=None, batch_size=100_000):
+    """Yield Arrow tables of at most batch_size rows from a Parquet or Feather/Arrow file."""
+    pa = _pyarrow()
+    columns = _projection(path, columns)
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size, columns=columns):
+            yield pa.Table.from_batches([batch])
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            table = pa.Table.from_batches([reader.get_batch(i)])
+            if columns is not None:
+                table = table.select(columns)
+            for offset in range(0, table.num_rows, batch_size):
+                yield table.slice(offset, batch_size)
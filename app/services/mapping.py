@@ -0,0 +1,157 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from app.services.generators import apply_blanks, blank_mask
+from app.services.instrumentation import count
+from app.services.mapping_store import from_stored, to_stored
+
+
+# Dictionary key standing for every blank original value (NaN, None, NaT)
+_BLANK_KEY = object()
+
+
+class ColumnMapping:
+    """Original to fake value mapping of one column, kept as two aligned arrays.
+
+    Each original value already seen has a code in a dictionary, and values
+    holds the fake value at that position, so applying the mapping is a
+    factorize, a lookup of the chunk's unique values and two takes. Both
+    grow in place, so masking a file chunk by chunk costs time in the
+    number of unique values of each chunk, not of the whole file.
+
+    With a MappingStore and namespace, values not seen by this mapping are
+    first looked up in the store and new fake values are added to it, so
+    other files and runs using the namespace get the same values.
+
+    A mapping may be shared by threads masking several files at once; each
+    apply runs under a lock.
+    """
+
+    def __init__(self, store=None, namespace=None):
+        self.store = store if namespace else None
+        self.namespace = namespace
+        self._codes = {}
+        # Fake values, with spare room at the end for later chunks
+        self._values = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def values(self):
+        """Fake values in the order their originals were first seen."""
+        return None if self._values is None else self._values[: self._size]
+
+    def apply(self, series, column, rng):
+        """Return the fake values for series, generating any unseen originals.
+
+        NaN is treated as a regular value, so all blanks of the original column
+        map to the same fake value (as Series.map with a dictionary did).
+        """
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        with self._lock:
+            positions = self._positions(uniques, column, rng)
+            values = self.values
+        return values.take(positions.take(codes))
+
+    def blanked_rows(self, series, column, rng):
+        """Mask of the rows of series to blank in "values" mode.
+
+        Used when fake values are not mapped: the mapping then records, for
+        each original value, whether it is blanked rather than its fake
+        value, so a value is blank in every chunk of a file or in none. Of
+        the values first seen in a chunk, exactly blank_percent are chosen.
+        Blanks of series are never chosen.
+        """
+        present = series.notna().to_numpy()
+        rows = np.zeros(len(series), dtype=bool)
+        codes, uniques = pd.factorize(series[present])
+        with self._lock:
+            positions = self._positions(uniques, column, rng, self._choose_blanks)
+            values = self.values
+        rows[present] = values.take(positions.take(codes))
+        return rows
+
+    def _positions(self, uniques, column, rng, generate=None):
+        """Positions of uniques in values, adding fake values for unseen ones.
+
+        generate replaces _generate for mappings of something other than
+        fake values, which are never shared through the store.
+        """
+        keys = _dictionary_keys(uniques)
+        if not self._codes:
+            positions = np.arange(len(uniques))
+            new = np.ones(len(uniques), dtype=bool)
+        else:
+            positions = np.fromiter(
+                (self._codes.get(key, -1) for key in keys), dtype=np.intp, count=len(keys)
+            )
+            new = positions == -1
+
+        n_new = int(new.sum())
+        count("unique_values", len(uniques))
+        count("new_unique_values", n_new)
+        if n_new or self._values is None:
+            offset = len(self)
+            if generate is not None:
+                fake_values = generate(column, n_new, rng)
+            elif self.store is not None and n_new:
+                stored = self.store.get_or_create(
+                    self.namespace,
+                    uniques[new],
+                    lambda n: to_stored(self._generate(column, n, rng, self.values)),
+                )
+                fake_values = from_stored(stored, column.generator.value_kind)
+            else:
+                fake_values = self._generate(column, n_new, rng, self.values, uniques[new])
+            positions[new] = np.arange(offset, offset + n_new)
+            self._extend(keys[new], fake_values)
+        return positions
+
+    @staticmethod
+    def _generate(column, n, rng, assigned, originals=None):
+        count("generator_calls")
+        count("generated_values", n)
+        if column.generator.uses_source:
+            fake_values = column.generator.generate_from(originals, rng)
+        else:
+            offset = 0 if assigned is None else len(assigned)
+            fake_values = column.generator.generate_for_uniques(n, rng, offset, assigned)
+        # In "rows" mode the rows are blanked after mapping (see inject_blanks);
+        # "values" blanks exactly blank_percent of each batch of new values
+        blank_percent = 0 if column.blank_mode == "rows" else column.blank_percent
+        mask = blank_mask(n, blank_percent, rng, exact=column.blank_mode == "values")
+        return apply_blanks(fake_values, mask)
+
+    @staticmethod
+    def _choose_blanks(column, n, rng):
+        return blank_mask(n, column.blank_percent, rng, exact=True)
+
+    def _extend(self, keys, values):
+        start, end = self._size, self._size + len(keys)
+        self._codes.update(zip(keys, range(start, end)))
+        if self._values is None:
+            self._values = values
+        else:
+            dtype = np.result_type(self._values, values)
+            if end > len(self._values) or dtype != self._values.dtype:
+                # Doubling the room keeps the copies linear in the final size
+                grown = np.empty(max(end, 2 * len(self._values)), dtype=dtype)
+                grown[:start] = self._values[:start]
+                self._values = grown
+            self._values[start:end] = values
+        self._size = end
+
+
+def _dictionary_keys(uniques):
+    """Object array of uniques usable as dictionary keys, blanks all alike."""
+    keys = np.asarray(uniques, dtype=object)
+    blanks = pd.isna(keys)
+    if blanks.any():
+        keys = keys.copy()
+        keys[blanks] = _BLANK_KEY
+    return keys
@@ -0,0 +1,156 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import DEFAULT_MAPPING_CACHE_SIZE
+from app.services.instrumentation import count
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_BATCH_SIZE = 900
+
+# Text used for missing original values
+NULL_KEY = "\x00NA"
+
+
+def normalize_keys(values):
+    """Original values as text, so 1, 1.0 and "1" from different files match."""
+    series = pd.Series(values, dtype=object if len(values) == 0 else None)
+    text = series.astype(str).astype(object)
+    if series.dtype.kind == "f":
+        integral = (series % 1 == 0) & (series.abs() < 2**63)
+        text[integral] = series[integral].astype(np.int64).astype(str)
+    text[series.isna().to_numpy()] = NULL_KEY
+    return text.to_numpy(dtype=object)
+
+
+def to_stored(values):
+    """Convert an array of fake values to Python values SQLite can store."""
+    if values.dtype.kind == "M":
+        text = np.datetime_as_string(values, unit="s")
+        return [None if t == "NaT" else t for t in text.tolist()]
+    return [None if v is None or v != v else v for v in values.tolist()]
+
+
+def from_stored(values, kind):
+    """Turn stored values back into an array of the generator's value kind."""
+    if kind == "M":
+        return np.array(values, dtype="datetime64[ns]")
+    if kind in "if":
+        array = np.array([np.nan if v is None else v for v in values], dtype=float)
+        if kind == "i" and not np.isnan(array).any():
+            return array.astype(np.int64)
+        return array
+    return np.array(values, dtype=object)
+
+
+class MappingStore:
+    """SQLite backed original to fake value mappings shared by files and runs.
+
+    Mappings are grouped by namespace (for example "customer_id") so that the
+    same original value gets the same fake value in every file that uses the
+    namespace. Original values are compared as text. A small LRU cache in front
+    of the database serves frequently used keys without a query.
+    """
+
+    def __init__(self, path, cache_size=DEFAULT_MAPPING_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mappings ("
+            "namespace TEXT NOT NULL, original TEXT NOT NULL, fake, "
+            "PRIMARY KEY (namespace, original)) WITHOUT ROWID"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def get_or_create(self, namespace, keys, generate):
+        """Return stored fake values for keys, creating the missing ones.
+
+        generate(n) must return n new values in stored form (see to_stored).
+        Lookups and inserts run in one write transaction, so concurrent runs
+        sharing the database never assign two fake values to one key.
+        """
+        keys = normalize_keys(keys).tolist()
+        result = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cache_key = (namespace, key)
+                if cache_key in self._cache:
+                    self._cache.move_to_end(cache_key)
+                    result[i] = self._cache[cache_key]
+                    self.hits += 1
+                else:
+                    missing.append(i)
+            self.misses += len(missing)
+            count("mapping_store.cache_hits", len(keys) - len(missing))
+            count("mapping_store.cache_misses", len(missing))
+            if not missing:
+                return result
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                found = self._select(namespace, [keys[i] for i in missing])
+                unknown = [i for i in missing if keys[i] not in found]
+                count("mapping_store.inserts", len(unknown))
+                new_values = generate(len(unknown)) if unknown else []
+                self._conn.executemany(
+                    "INSERT INTO mappings (namespace, original, fake) VALUES (?, ?, ?)",
+                    [(namespace, keys[i], v) for i, v in zip(unknown, new_values)],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            found.update(zip((keys[i] for i in unknown), new_values))
+            for i in missing:
+                result[i] = found[keys[i]]
+                self._remember((namespace, keys[i]), result[i])
+        return result
+
+    def count(self, namespace):
+        with self._lock:
+            (n,) = self._conn.execute(
+                "SELECT COUNT(*) FROM mappings WHERE namespace = ?", (namespace,)
+            ).fetchone()
+        return n
+
+    def _select(self, namespace, keys):
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            batch = keys[start : start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT original, fake FROM mappings "
+                f"WHERE namespace = ? AND original IN ({placeholders})",
+                [namespace, *batch],
+            )
+            found.update(rows)
+        return found
+
+    def _remember(self, cache_key, value):
+        if self.cache_size <= 0:
+            return
+        self._cache[cache_key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
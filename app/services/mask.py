@@ -1,218 +1,204 @@
-import numpy as np
-import pandas as pd
-import random
-import tempfile
-import shutil
 import time
 import os
-from datetime import datetime
-
-from tkinter import filedialog
-
-from app.config.settings import FIELD_TYPES, fake
-from app.utils import generate_uuid, generate_random_date
-
-def mask_data(df, selected_columns, config_settings, keep_mapping=True):
-    masked_df = df.copy()  # Copy the original data
-    log = []
-
-    # Dictionary to store mappings for each column if "Keep Mapping Consistent" is enabled
-    column_fake_mappings = {}
-
-    # Iterate over selected columns and apply fake data where needed
-    for col, settings in selected_columns.items():
-        if settings["selected"].get():
-            field_type = settings["field_type"].get()
-            blank_percent = settings["blank_percent"].get()
-
-            # Generate fake data with or without keeping mappings
-            if keep_mapping:
-                # Generate mappings for unique values in the column to keep them consistent
-                unique_values = df[col].unique()
-                if col not in column_fake_mappings:
-                    fake_mapping = {}
-                    if field_type == "Custom List":
-                        values = config_settings[col].get("values", [])
-                        for idx, val in enumerate(unique_values):
-                            fake_mapping[val] = (
-                                None
-                                if np.random.rand() < blank_percent
-                                else values[idx % len(values)]
-                            )
-                    elif field_type == "Number":
-                        min_val = config_settings[col].get("min", 0)
-                        max_val = config_settings[col].get("max", 1)
-                        is_integer = config_settings[col].get("is_integer", False)
-                        for val in unique_values:
-                            fake_mapping[val] = (
-                                None
-                                if np.random.rand() < blank_percent
-                                else (
-                                    random.randint(int(min_val), int(max_val))
-                                    if is_integer
-                                    else round(random.uniform(min_val), 2)
-                                )
-                            )
-                    elif field_type == "Date":
-                        start_date = datetime.strptime(
-                            config_settings[col].get("start_date", "2020-01-01"),
-                            "%Y-%m-%d",
-                        )
-                        end_date = datetime.strptime(
-                            config_settings[col].get("end_date", "2023-12-31"),
-                            "%Y-%m-%d",
-                        )
-                        for val in unique_values:
-                            fake_mapping[val] = (
-                                None
-                                if np.random.rand() < blank_percent
-                                else generate_random_date(start_date, end_date)
-                            )
-                    elif field_type == "UUID":
-                        prefix = config_settings[col].get("prefix", "")
-                        suffix = config_settings[col].get("suffix", "")
-                        uuid_type = config_settings[col].get("uuid_type", "UUID")
-                        char_length = config_settings[col].get("char_length", 8)
-                        for val in unique_values:
-                            fake_mapping[val] = (
-                                None
-                                if np.random.rand() < blank_percent
-                                else (
-                                    f"{prefix}{generate_uuid()}{suffix}"
-                                    if uuid_type == "UUID"
-                                    else f"{prefix}{fake.bothify('?' * char_length)}{suffix}"
-                                )
-                            )
-                    else:
-                        for val in unique_values:
-                            fake_mapping[val] = (
-                                None
-                                if np.random.rand() < blank_percent
-                                else FIELD_TYPES[field_type]()
-                            )
-                    column_fake_mappings[col] = fake_mapping
-                # Map values based on the generated mapping
-                masked_df[col] = df[col].map(column_fake_mappings[col])
-            else:
-                # Generate new fake data for each row independently when keep_mapping is False
-                if field_type == "Custom List":
-                    values = config_settings[col].get("values", [])
-                    fake_data = [
-                        (
-                            None
-                            if np.random.rand() < blank_percent
-                            else random.choice(values)
-                        )
-                        for _ in range(len(df))
-                    ]
-                elif field_type == "Number":
-                    min_val = config_settings[col].get("min", 0)
-                    max_val = config_settings[col].get("max", 1)
-                    is_integer = config_settings[col].get("is_integer", False)
-                    fake_data = [
-                        (
-                            None
-                            if np.random.rand() < blank_percent
-                            else (
-                                random.randint(int(min_val), int(max_val))
-                                if is_integer
-                                else round(random.uniform(min_val), 2)
-                            )
-                        )
-                        for _ in range(len(df))
-                    ]
-                elif field_type == "Date":
-                    start_date = datetime.strptime(
-                        config_settings[col].get("start_date", "2020-01-01"), "%Y-%m-%d"
-                    )
-                    end_date = datetime.strptime(
-                        config_settings[col].get("end_date", "2023-12-31"), "%Y-%m-%d"
+
+from app.services.generators import (
+    generate_column,
+    get_rng,
+    inject_blanks,
+    random_blank_percent,
+)
+from app.services.instrumentation import count, span
+from app.services.mapping import ColumnMapping
+from app.services.pseudonymize import pseudonymize_column
+from app.services.spec import compile_spec, spec_from_settings
+from app.services.writers import OUTPUT_FILETYPES, write_dataframe
+
+def mask_data(
+    df,
+    selected_columns,
+    config_settings,
+    keep_mapping=True,
+    column_fake_mappings=None,
+    rng=None,
+    inplace=False,
+    progress=None,
+):
+    """Mask a DataFrame using the GUI column settings and configuration panes."""
+    plan = compile_spec(
+        spec_from_settings(selected_columns, config_settings, keep_mapping)
+    )
+    return mask_with_plan(
+        df, plan, column_fake_mappings, rng, inplace=inplace, progress=progress
+    )
+
+def mask_with_plan(
+    df,
+    plan,
+    column_fake_mappings=None,
+    rng=None,
+    mapping_store=None,
+    secret=None,
+    inplace=False,
+    progress=None,
+    row_offset=0,
+):
+    """Mask a DataFrame with a compiled MaskingPlan.
+
+    The result shares the unmasked columns with df; inplace replaces the
+    masked columns of df itself. rng may be a seed for reproducible results.
+    progress is called as progress("mask", columns_done, columns_total) after
+    each column; an exception it raises (e.g. to cancel) stops the masking.
+    Columns with a namespace share their mappings through mapping_store (a
+    MappingStore) when keep_mapping is enabled. Deterministic plans need the
+    secret key their fake values are derived from and use neither mappings
+    nor the store.
+    row_offset is the position of df's first row in the whole file, so that
+    chunks masked one by one get consecutive row numbers.
+    """
+    if plan.deterministic and not secret:
+        raise ValueError("Deterministic masking requires a secret key.")
+
+    rng = get_rng(rng)
+    masked_columns = {}
+
+    # ColumnMapping of each column if "Keep Mapping Consistent" is enabled
+    # (otherwise of "values" blank mode columns, recording the blanked values).
+    # Callers masking a file in chunks pass the same dictionary for every chunk.
+    if column_fake_mappings is None:
+        column_fake_mappings = {}
+
+    count("rows", len(df))
+    with span("mask", rows=len(df)):
+        # Apply fake data to every column of the plan
+        for done, column in enumerate(plan.columns, 1):
+            col = column.name
+            with span("mask.column", column=col, field_type=column.field_type):
+                if column.generator.positional:
+                    # Row numbers follow the row position, not the original values
+                    masked_columns[col] = generate_column(
+                        column.generator, len(df), random_blank_percent(column), rng, row_offset
                     )
-                    fake_data = [
-                        (
-                            None
-                            if np.random.rand() < blank_percent
-                            else generate_random_date(start_date, end_date)
-                        )
-                        for _ in range(len(df))
-                    ]
-                elif field_type == "UUID":
-                    prefix = config_settings[col].get("prefix", "")
-                    suffix = config_settings[col].get("suffix", "")
-                    uuid_type = config_settings[col].get("uuid_type", "UUID")
-                    char_length = config_settings[col].get("char_length", 8)
-                    fake_data = [
-                        (
-                            None
-                            if np.random.rand() < blank_percent
-                            else (
-                                f"{prefix}{generate_uuid()}{suffix}"
-                                if uuid_type == "UUID"
-                                else f"{prefix}{fake.bothify('?' * char_length)}{suffix}"
-                            )
+                elif plan.deterministic:
+                    # Fake values come from a keyed hash of each value, so they are
+                    # consistent across files and runs without storing any mapping
+                    masked_columns[col] = pseudonymize_column(df[col], column, secret)
+                elif plan.keep_mapping:
+                    # Map each unique value to one fake value to keep them consistent
+                    mapping = column_fake_mappings.get(col)
+                    if mapping is None:
+                        mapping = column_fake_mappings[col] = ColumnMapping(
+                            mapping_store, column.namespace
                         )
-                        for _ in range(len(df))
-                    ]
+                    masked_columns[col] = mapping.apply(df[col], column, rng)
                 else:
-                    fake_data = [
-                        (
-                            None
-                            if np.random.rand() < blank_percent
-                            else FIELD_TYPES[field_type]()
-                        )
-                        for _ in range(len(df))
-                    ]
-                # Apply generated fake data to the entire column
-                masked_df[col] = fake_data
-            log.append(
-                f"Masked column '{col}' with fake data ({field_type}) and {blank_percent*100}% blanks."
-            )
-        else:
-            log.append(f"Column '{col}' was not selected for masking.")
+                    # Generate new fake data for the whole column in one batch when keep_mapping is False
+                    masked_columns[col] = generate_column(
+                        column.generator,
+                        len(df),
+                        random_blank_percent(column),
+                        rng,
+                        source=df[col],
+                    )
+                mapped = plan.keep_mapping and not column.generator.positional
+                mapping = None
+                if column.blank_mode == "values" and not mapped:
+                    # The mapping records which values are blanked, so chunks agree
+                    mapping = column_fake_mappings.get(col)
+                    if mapping is None:
+                        mapping = column_fake_mappings[col] = ColumnMapping()
+                # Exact blank counts and the original blanks, once per column
+                masked_columns[col] = inject_blanks(
+                    masked_columns[col], df[col], column, rng, mapped, mapping
+                )
+            if progress:
+                progress("mask", done, len(plan.columns))
+
+    log = masking_log(plan, df.columns)
+    return assemble_masked(df, masked_columns, inplace), log
+
+def assemble_masked(df, masked_columns, inplace=False):
+    """Put the masked column arrays in place of the originals.
 
-    # Retain original values for unselected columns only if keep_mapping is True
-    if keep_mapping:
-        for col in df.columns:
-            if (
-                col not in selected_columns
-                or not selected_columns[col]["selected"].get()
-            ):
-                masked_df[col] = df[col]  # Keep original values for unmasked columns
+    Unmasked columns are shared with df rather than copied (the shallow copy
+    is copy-on-write, so df itself never changes). With inplace the columns
+    of df are replaced directly and df is returned.
+    """
+    masked_df = df if inplace else df.copy(deep=False)
+    for col, values in masked_columns.items():
+        masked_df[col] = values
+    return masked_df
 
-    return masked_df, log
+def mask_arrow_table(
+    table,
+    plan,
+    column_fake_mappings=None,
+    rng=None,
+    mapping_store=None,
+    secret=None,
+    progress=None,
+    row_offset=0,
+):
+    """Mask a pyarrow Table, converting only the masked columns to pandas.
+
+    Every other column keeps its Arrow buffers, so passthrough data is never
+    turned into Python objects and goes to Parquet/Feather writers unchanged.
+    """
+    import pyarrow as pa
+
+    masked_df, log = mask_with_plan(
+        table.select(plan.column_names).to_pandas(),
+        plan,
+        column_fake_mappings,
+        rng,
+        mapping_store,
+        secret,
+        inplace=True,
+        progress=progress,
+        row_offset=row_offset,
+    )
+    for col in plan.column_names:
+        table = table.set_column(
+            table.column_names.index(col),
+            col,
+            pa.array(masked_df[col], from_pandas=True),
+        )
+    return table, masking_log(plan, table.column_names)
+
+def masking_log(plan, columns):
+    """Log entries describing how each of the given columns was masked."""
+    log = [
+        f"Masked column '{column.name}' with fake data ({column.field_type}) and {column.blank_percent*100}% blanks."
+        for column in plan.columns
+    ]
+    masked_columns = set(plan.column_names)
+    for col in columns:
+        if col not in masked_columns:
+            log.append(f"Column '{col}' was not selected for masking.")
+    return log
 
 def save_masked_data(df, original_file, log_text):
+    # Imported here so headless callers of this module never load Tkinter
+    from tkinter import filedialog
+
     retry_attempts = 3  # Number of attempts to retry saving
     for attempt in range(retry_attempts):
         try:
-            # Use a unique temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temp_file:
-                temp_output_file = temp_file.name
-
-            with pd.ExcelWriter(temp_output_file, engine="xlsxwriter") as writer:
-                df.to_excel(writer, index=False, sheet_name="Masked Data")
-            log_text.insert(
-                "end", f"File saved temporarily to '{temp_output_file}'.\n"
-            )
-
-            # Ask user for the final save location
+            # Ask user for the final save location; the extension picks the format
             file_name, _ = os.path.splitext(original_file)
             initial_filename = file_name + "_masked.xlsx"
             final_output_file = filedialog.asksaveasfilename(
                 defaultextension=".xlsx",
                 initialfile=initial_filename,
-                filetypes=[("Excel files", "*.xlsx")],
+                filetypes=OUTPUT_FILETYPES,
                 title="Select Save Location",
             )
 
             if final_output_file:
-                # Try copying to final location
-                shutil.copy(temp_output_file, final_output_file)
+                # Written once, straight next to the final location and renamed into place
+                write_dataframe(df, final_output_file)
                 log_text.insert(
                     "end", f"File successfully saved to '{final_output_file}'.\n"
                 )
-                # Clean up the temporary file
-                os.remove(temp_output_file)
                 return final_output_file
             else:
                 log_text.insert("end", "Save operation canceled.\n")
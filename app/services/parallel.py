@@ -0,0 +1,202 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.config.settings import DEFAULT_CHUNKSIZE
+from app.services.generators import (
+    apply_blanks,
+    generate_column,
+    inject_blanks,
+    random_blank_percent,
+)
+from app.services.mapping import ColumnMapping
+from app.services.mask import assemble_masked, masking_log
+from app.services.pseudonymize import pseudonymize_column
+from app.services.spec import compile_spec
+
+# Plan compiled once in every worker process by _init_worker
+_worker_columns = {}
+
+
+def _init_worker(spec):
+    global _worker_columns
+    _worker_columns = {column.name: column for column in compile_spec(spec).columns}
+
+
+def _result_dtype(column):
+    """Fixed-width dtype of a column's masked values, or None for object values."""
+    kind = column.generator.value_kind
+    if kind == "M":
+        return np.dtype("datetime64[ns]")
+    if kind == "f" or (kind == "i" and (column.blank_percent > 0 or column.keep_nulls)):
+        return np.dtype(float)
+    if kind == "i":
+        return np.dtype(np.int64)
+    return None
+
+
+def _mask_task(name, start, stop, source, seed, secret, keep_mapping, shm_name, dtype, length):
+    """Mask rows [start, stop) of one column in a worker process.
+
+    Fixed-width results are written straight into the shared memory block of
+    the column and nothing is sent back; object results are returned.
+    """
+    column = _worker_columns[name]
+    rng = np.random.default_rng(seed)
+    if column.generator.positional:
+        values = generate_column(
+            column.generator, stop - start, random_blank_percent(column), rng, start
+        )
+    elif secret:
+        values = pseudonymize_column(source, column, secret)
+    elif keep_mapping:
+        values = ColumnMapping().apply(source, column, rng)
+    else:
+        values = generate_column(
+            column.generator, stop - start, random_blank_percent(column), rng, source=source
+        )
+    if source is not None:
+        # Exact row blank counts are per partition of rows; blanked values are
+        # chosen over the whole column by mask_parallel
+        values = inject_blanks(
+            values,
+            source,
+            column,
+            rng,
+            mapped=(keep_mapping and not column.generator.positional)
+            or column.blank_mode == "values",
+        )
+
+    if shm_name is None:
+        return values
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        target = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+        target[start:stop] = values
+        del target
+    finally:
+        shm.close()
+    return None
+
+
+def _tasks(df, plan, partition_rows):
+    """Split the work into (column, start, stop) ranges.
+
+    Keep-mapping columns are masked whole by one worker so that each value
+    gets one fake value; all other columns, including row numbers, are
+    split into row partitions.
+    """
+    n = len(df)
+    for column in plan.columns:
+        positional = column.generator.positional
+        if plan.keep_mapping and not plan.deterministic and not positional:
+            yield column, 0, n
+        else:
+            for start in range(0, max(n, 1), partition_rows):
+                yield column, start, min(start + partition_rows, n)
+
+
+def mask_parallel(
+    df, spec, workers=None, partition_rows=None, seed=None, secret=None, inplace=False
+):
+    """Mask a DataFrame with a pool of worker processes.
+
+    Columns are independent, and without keep_mapping so are row ranges of a
+    column, so both are masked in parallel. Every task gets its own RNG
+    stream spawned from seed. Row ranges hold partition_rows rows
+    (DEFAULT_CHUNKSIZE by default) whatever the number of workers, so a
+    seeded run gives the same result with any number of workers. Numeric
+    and date results come back through shared memory instead of being
+    pickled. As with mask_with_plan, the result shares unmasked columns
+    with df, or is df itself with inplace.
+    """
+    plan = compile_spec(spec)
+    if plan.deterministic and not secret:
+        raise ValueError("Deterministic masking requires a secret key.")
+    workers = workers or os.cpu_count() or 1
+    n = len(df)
+    partition_rows = partition_rows or DEFAULT_CHUNKSIZE
+    tasks = list(_tasks(df, plan, partition_rows))
+    # The extra stream chooses the blanked values of "values" mode columns
+    *seeds, blank_seed = np.random.SeedSequence(seed).spawn(len(tasks) + 1)
+
+    blocks = {}
+    try:
+        for column in plan.columns:
+            dtype = _result_dtype(column)
+            if dtype is not None and n:
+                blocks[column.name] = (
+                    shared_memory.SharedMemory(create=True, size=n * dtype.itemsize),
+                    dtype,
+                )
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(spec,)
+        ) as executor:
+            # Without keep_mapping new values do not depend on the originals
+            needs_source = plan.deterministic or plan.keep_mapping
+            futures = []
+            for (column, start, stop), task_seed in zip(tasks, seeds):
+                shm, dtype = blocks.get(column.name, (None, None))
+                source = (
+                    df[column.name].iloc[start:stop]
+                    if (
+                        (needs_source or column.generator.uses_source)
+                        and not column.generator.positional
+                    )
+                    or column.keep_nulls
+                    or column.blank_mode == "rows"
+                    else None
+                )
+                futures.append(
+                    executor.submit(
+                        _mask_task,
+                        column.name,
+                        start,
+                        stop,
+                        source,
+                        task_seed,
+                        secret if plan.deterministic else None,
+                        plan.keep_mapping,
+                        shm.name if shm else None,
+                        dtype,
+                        n,
+                    )
+                )
+            parts = {}
+            for (column, start, stop), future in zip(tasks, futures):
+                result = future.result()
+                if result is not None:
+                    parts.setdefault(column.name, []).append(result)
+
+        masked_columns = {}
+        for column in plan.columns:
+            if column.name in blocks:
+                shm, dtype = blocks[column.name]
+                # Copied once out of the shared block, which is unlinked below
+                masked_columns[column.name] = np.ndarray(
+                    (n,), dtype=dtype, buffer=shm.buf
+                ).copy()
+            else:
+                values = parts.get(column.name, [])
+                masked_columns[column.name] = (
+                    np.concatenate(values) if values else np.empty(n, dtype=object)
+                )
+        blank_rng = np.random.default_rng(blank_seed)
+        for column in plan.columns:
+            if column.blank_mode == "values" and not (
+                plan.keep_mapping and not column.generator.positional
+            ):
+                # One choice for the whole column, so no value is blank in
+                # some partitions and filled in others
+                rows = ColumnMapping().blanked_rows(df[column.name], column, blank_rng)
+                masked_columns[column.name] = apply_blanks(masked_columns[column.name], rows)
+        masked_df = assemble_masked(df, masked_columns, inplace)
+    finally:
+        for shm, _ in blocks.values():
+            shm.close()
+            shm.unlink()
+
+    return masked_df, masking_log(plan, df.columns)
@@ -0,0 +1,159 @@
+import os
+import re
+import tempfile
+import threading
+
+import faker
+import numpy as np
+
+from app.config.settings import (
+    DEFAULT_LOCALE,
+    DEFAULT_POOL_SIZE,
+    FAKER_PROVIDERS,
+    POOL_CACHE_DIR,
+)
+from app.services.instrumentation import count
+
+# Give up growing a unique pool after this many rounds without new values
+MAX_UNIQUE_ROUNDS = 10
+
+
+class ValuePool:
+    """Precomputed fake values for one field type and locale."""
+
+    def __init__(self, field_type, values, locale=DEFAULT_LOCALE, unique=False):
+        self.field_type = field_type
+        self.locale = locale
+        self.unique = unique
+        self.values = np.asarray(values, dtype=object)
+
+    def __len__(self):
+        return len(self.values)
+
+    def sample(self, n, rng, unique=False, taken=None):
+        """Sample n values by index; unique samples without replacement.
+
+        taken is an optional boolean mask of the positions a unique sample
+        must skip, e.g. those of values already handed out.
+        """
+        if unique:
+            free = np.arange(len(self.values)) if taken is None else np.flatnonzero(~taken)
+            if n > len(free):
+                raise ValueError(
+                    f"Cannot draw {n} unique '{self.field_type}' values from a pool of {len(free)}."
+                )
+            idx = rng.choice(free, size=n, replace=False)
+        else:
+            idx = rng.integers(0, len(self.values), size=n)
+        return self.values[idx]
+
+    def save(self, path):
+        """Write the pool to an .npy file, replacing any previous file atomically."""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, self.values.astype(str), allow_pickle=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, field_type, locale=DEFAULT_LOCALE, unique=False):
+        values = np.load(path, allow_pickle=False).astype(object)
+        return cls(field_type, values, locale, unique)
+
+    @classmethod
+    def build(cls, field_type, size, locale=DEFAULT_LOCALE, unique=False, seed=None):
+        """Generate a new pool by calling the Faker provider size times."""
+        generator = faker.Faker(locale)
+        if seed is not None:
+            generator.seed_instance(seed)
+        pool = cls(field_type, [], locale, unique)
+        return pool.extend(size, generator)
+
+    def extend(self, size, generator=None):
+        """Grow the pool to at least size values (fewer if unique values run out)."""
+        if generator is None:
+            generator = faker.Faker(self.locale)
+        func = getattr(generator, FAKER_PROVIDERS[self.field_type])
+        values = list(self.values)
+        rounds = 0
+        while len(values) < size and rounds < MAX_UNIQUE_ROUNDS:
+            before = len(values)
+            values.extend(func() for _ in range(size - len(values)))
+            if not self.unique:
+                break
+            # Drop duplicates while keeping the original order
+            values = list(dict.fromkeys(values))
+            rounds = rounds + 1 if len(values) == before else 0
+        self.values = np.asarray(values, dtype=object)
+        return self
+
+
+class PoolRegistry:
+    """Keeps value pools in memory and on disk so later runs start warm."""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, cache_dir=POOL_CACHE_DIR, seed=None):
+        self.size = size
+        self.cache_dir = cache_dir
+        self.seed = seed
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, field_type, locale, unique=False):
+        name = re.sub(r"\W+", "_", f"{field_type}-{locale}").strip("_").lower()
+        if unique:
+            name += "-unique"
+        if self.seed is not None:
+            name += f"-seed{self.seed}"
+        return os.path.join(self.cache_dir, name + ".npy")
+
+    def get(self, field_type, locale=None, unique=False, min_size=0):
+        """Return the pool for a field type, building or loading it on first use."""
+        locale = locale or DEFAULT_LOCALE
+        size = max(self.size, min_size)
+        key = (field_type, locale, unique)
+        with self._lock:
+            pool = self._pools.get(key)
+            path = self.path_for(field_type, locale, unique) if self.cache_dir else None
+            if pool is not None:
+                count("pool.memory_hits")
+            elif path and os.path.exists(path):
+                count("pool.disk_loads")
+                pool = ValuePool.load(path, field_type, locale, unique)
+            if pool is None:
+                count("pool.builds")
+                pool = ValuePool.build(field_type, size, locale, unique, self.seed)
+                if path:
+                    pool.save(path)
+            elif len(pool) < size:
+                if self.seed is None:
+                    pool.extend(size)
+                else:
+                    # Grown from the seed, not an unseeded Faker, so a seeded pool
+                    # depends on the seed and size only, never on the cache state
+                    pool = ValuePool.build(field_type, size, locale, unique, self.seed)
+                if path:
+                    pool.save(path)
+            self._pools[key] = pool
+            return pool
+
+    def sample(self, field_type, n, rng, locale=None, unique=False):
+        """Sample a whole column of n values for a field type."""
+        pool = self.get(field_type, locale, unique, min_size=n if unique else 0)
+        return pool.sample(n, rng, unique)
+
+    def clear(self):
+        with self._lock:
+            self._pools.clear()
+
+
+# Shared registry used by the column generators
+default_pools = PoolRegistry()
+
+# Seeded registry for deterministic masking: the same Faker version and pool
+# size always produce the same pools, on any machine
+deterministic_pools = PoolRegistry(seed=0)
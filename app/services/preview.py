@@ -0,0 +1,110 @@
+import csv
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import DEFAULT_CHUNKSIZE, DEFAULT_SAMPLE_ROWS, SNIFF_BYTES
+from app.services.generators import get_rng
+from app.services.instrumentation import span
+from app.services.io import ARROW_EXTENSIONS, iter_arrow_batches, read_arrow_schema
+
+# Delimiters the sniffer chooses from
+DELIMITERS = ",;|\t"
+
+
+@dataclass
+class TableSample:
+    """The header and a bounded sample of rows of a file, for a quick open."""
+
+    path: str
+    sample: pd.DataFrame
+    # Detected (or given) CSV delimiter; None for other formats
+    delimiter: str = None
+    # True when the rows are a uniform sample of the whole file
+    reservoir: bool = False
+
+    @property
+    def columns(self):
+        return list(self.sample.columns)
+
+
+def sniff_delimiter(path, default=",", sample_bytes=SNIFF_BYTES):
+    """Detect the delimiter of a CSV file from its first bytes."""
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        text = f.read(sample_bytes)
+    if len(text) == sample_bytes and "\n" in text:
+        text = text[: text.rindex("\n")]  # Drop the last, possibly cut, line
+    try:
+        return csv.Sniffer().sniff(text, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return default
+
+
+def reservoir_sample(chunks, n, rng=None):
+    """Uniform sample of n rows from an iterator of DataFrame chunks.
+
+    Every row gets a random key and the n rows with the smallest keys are
+    kept, so memory stays at n rows plus one chunk. Rows keep file order.
+    """
+    rng = get_rng(rng)
+    kept, kept_keys = None, np.empty(0)
+    for chunk in chunks:
+        keys = np.concatenate([kept_keys, rng.random(len(chunk))])
+        rows = chunk if kept is None else pd.concat([kept, chunk])
+        if len(rows) > n:
+            keep = np.sort(np.argpartition(keys, n)[:n])
+            rows, keys = rows.iloc[keep], keys[keep]
+        kept, kept_keys = rows, keys
+    return None if kept is None else kept.reset_index(drop=True)
+
+
+def read_sample(
+    path, delimiter=None, rows=DEFAULT_SAMPLE_ROWS, reservoir=False, seed=None
+):
+    """Read the header and up to rows rows of a file without loading all of it.
+
+    By default the first rows are read. With reservoir, CSV and Parquet/Arrow
+    files are scanned in chunks for a uniform sample of the whole file
+    (Excel files always give their first rows). The CSV delimiter is
+    detected unless given.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".csv", ".xlsx", ".xls") + ARROW_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: '{ext}'.")
+    with span("sample", format=ext.lstrip(".")):
+        if ext in (".xlsx", ".xls"):
+            return TableSample(path, pd.read_excel(path, nrows=rows))
+
+        if ext == ".csv":
+            delimiter = delimiter or sniff_delimiter(path)
+            if not reservoir:
+                sample = pd.read_csv(
+                    path, delimiter=delimiter, on_bad_lines="skip", nrows=rows
+                )
+                return TableSample(path, sample, delimiter)
+            with pd.read_csv(
+                path,
+                delimiter=delimiter,
+                on_bad_lines="skip",
+                chunksize=DEFAULT_CHUNKSIZE,
+            ) as reader:
+                sample = reservoir_sample(reader, rows, seed)
+            if sample is None:
+                # Only a header row
+                sample = pd.read_csv(path, delimiter=delimiter, nrows=0)
+            return TableSample(path, sample, delimiter, True)
+
+        batches = iter_arrow_batches(
+            path, batch_size=DEFAULT_CHUNKSIZE if reservoir else max(rows, 1)
+        )
+        frames = (batch.to_pandas() for batch in batches)
+        if reservoir:
+            sample = reservoir_sample(frames, rows, seed)
+        else:
+            sample = next(frames, None)
+        if sample is None:
+            # A schema but no rows
+            sample = read_arrow_schema(path).empty_table().to_pandas()
+        return TableSample(path, sample.head(rows), reservoir=reservoir)
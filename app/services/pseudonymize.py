@@ -0,0 +1,107 @@
+import base64
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from app.services.generators import apply_blanks, blank_mask
+from app.services.instrumentation import count
+from app.services.mapping_store import normalize_keys
+
+# Constants of the SplitMix64 finalizer used to derive independent streams
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def derive_hash_key(secret):
+    """Turn a secret of any length into the 16 character SipHash key pandas expects."""
+    if isinstance(secret, str):
+        secret = secret.encode("utf-8")
+    digest = hashlib.sha256(secret).digest()
+    return base64.b64encode(digest[:12]).decode("ascii")
+
+
+def keyed_hash(values, secret, salt=""):
+    """Keyed 64-bit hash (SipHash-2-4) of each value, computed for the whole array.
+
+    Values are hashed as normalized text, so the same ID stored as a number
+    in one file and as text in another hashes the same. The salt separates
+    namespaces: equal values in different namespaces hash differently.
+    """
+    text = normalize_keys(values)
+    if salt:
+        text = (salt + "\x1f") + text
+    return pd.util.hash_array(
+        text, hash_key=derive_hash_key(secret), categorize=False
+    )
+
+
+def _mix(hashes, stream):
+    with np.errstate(over="ignore"):
+        z = hashes + np.uint64(stream + 1) * GOLDEN_GAMMA
+        z = (z ^ (z >> np.uint64(30))) * MIX_1
+        z = (z ^ (z >> np.uint64(27))) * MIX_2
+        return z ^ (z >> np.uint64(31))
+
+
+class KeyedRandom:
+    """Drop-in for the parts of numpy.random.Generator the column generators use.
+
+    Row i of every draw is derived only from hashes[i], so a value always gets
+    the same fake value no matter which file, chunk, process or machine masks it.
+    Each call to a draw method consumes fresh streams of the hash.
+    """
+
+    def __init__(self, hashes):
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self._stream = 0
+
+    def _bits(self, size):
+        shape = (len(self.hashes),) if size is None else tuple(np.atleast_1d(size))
+        if shape[0] != len(self.hashes):
+            raise ValueError("Deterministic draws must have one row per hashed value.")
+        width = int(np.prod(shape[1:], dtype=np.int64))
+        streams = [_mix(self.hashes, self._stream + j) for j in range(width)]
+        self._stream += width
+        return np.stack(streams, axis=-1).reshape(shape)
+
+    def random(self, size=None):
+        return (self._bits(size) >> np.uint64(11)) * (1.0 / (1 << 53))
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        return low + (high - low) * self.random(size)
+
+    def integers(self, low, high=None, size=None, dtype=np.int64, endpoint=False):
+        if high is None:
+            low, high = 0, low
+        span = int(high) - int(low) + (1 if endpoint else 0)
+        values = int(low) + np.floor(self.random(size) * span).astype(np.int64)
+        return values.astype(dtype)
+
+    def choice(self, a, size=None, replace=True):
+        if not replace:
+            raise ValueError(
+                "Sampling without replacement is not supported for deterministic masking."
+            )
+        if isinstance(a, (int, np.integer)):
+            return self.integers(0, a, size=size)
+        a = np.asarray(a)
+        return a[self.integers(0, len(a), size=size)]
+
+
+def pseudonymize_column(series, column, secret):
+    """Deterministic fake values for a column, derived from keyed hashes.
+
+    Each unique value is hashed once; the generator then draws its fake value
+    from that hash. Columns with a namespace share fake values with every
+    other column and file using the namespace.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    count("unique_values", len(uniques))
+    count("generator_calls")
+    count("generated_values", len(uniques))
+    rng = KeyedRandom(keyed_hash(uniques, secret, column.namespace or column.name))
+    values = column.generator.generate_from(uniques, rng)
+    values = apply_blanks(values, blank_mask(len(uniques), column.blank_percent, rng))
+    return values.take(codes)
@@ -0,0 +1,444 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import (
+    DEFAULT_CHUNKSIZE,
+    SERVER_LATENCY_WINDOW,
+    SERVER_MAX_CONCURRENT,
+    SERVER_WAIT_SECONDS,
+)
+from app.services.io import column_filter, iter_arrow_batches
+from app.services.mapping import ColumnMapping
+from app.services.mask import mask_arrow_table, mask_with_plan
+from app.services.spec import MaskingSpec, SpecError, compile_spec, warm_pools
+from app.services.writers import STREAM_FORMATS, StreamWriter
+
+# Media type of each body format; requests may also name it with ?format=
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "feather": "application/vnd.apache.arrow.file",
+}
+# Ad-hoc specs (sent with a request) kept compiled, with their mappings
+SPEC_CACHE_SIZE = 32
+# Bytes read from or buffered for the socket at a time
+BODY_BUFFER_BYTES = 64 * 1024
+
+
+class RequestBody(io.RawIOBase):
+    """Reads a request body of a known length or in chunked transfer encoding.
+
+    Only what is asked for is read from the socket, so pandas can parse a
+    large CSV body chunk by chunk while it is still arriving.
+    """
+
+    def __init__(self, rfile, length=None, chunked=False):
+        self.rfile = rfile
+        self.chunked = chunked
+        self.bytes_read = 0
+        # Bytes left in the body, or in the current chunk of a chunked body
+        self._left = 0 if chunked else (length or 0)
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._done or not self._next_chunk():
+            return 0
+        data = self.rfile.read(min(len(buffer), self._left))
+        if not data:
+            raise ConnectionError("The request body ended early.")
+        buffer[: len(data)] = data
+        self._left -= len(data)
+        self.bytes_read += len(data)
+        if self.chunked and not self._left:
+            self.rfile.readline()  # CRLF closing the chunk
+        return len(data)
+
+    def _next_chunk(self):
+        """Whether body bytes remain, reading the next chunk header if needed."""
+        if self._left:
+            return True
+        if self.chunked:
+            size_line = self.rfile.readline()
+            try:
+                self._left = int(size_line.split(b";")[0], 16)
+            except ValueError:
+                raise ConnectionError("Malformed chunked request body.") from None
+            if self._left:
+                return True
+            while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                pass  # Trailer fields
+        self._done = True
+        return False
+
+
+class ChunkedResponse:
+    """Binary file-like object sending what is written as a chunked response body.
+
+    Small writes (Parquet writers emit many) are buffered into chunks of
+    about BODY_BUFFER_BYTES.
+    """
+
+    closed = False
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.bytes_written = 0
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self.bytes_written += len(data)
+        if len(self._buffer) >= BODY_BUFFER_BYTES:
+            self.flush()
+        return len(data)
+
+    def tell(self):
+        return self.bytes_written
+
+    def flush(self):
+        if self._buffer:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(self._buffer), self._buffer))
+            self._buffer.clear()
+
+    def finish(self):
+        """Send the rest of the body and the final, empty chunk."""
+        self.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class ServerMetrics:
+    """Request counts, throughput and latency of a MaskingServer."""
+
+    def __init__(self, window=SERVER_LATENCY_WINDOW):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.active = 0
+        self.rows = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Seconds spent on mask requests, summed over concurrent requests
+        self.busy_seconds = 0.0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def begin(self):
+        with self._lock:
+            self.active += 1
+
+    def end(self, seconds, rows=0, bytes_in=0, bytes_out=0, ok=True):
+        with self._lock:
+            self.active -= 1
+            self.requests += 1
+            self.errors += not ok
+            self.rows += rows
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.busy_seconds += seconds
+            self._latencies.append(seconds)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def to_dict(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            busy = self.busy_seconds or float("nan")
+            return {
+                "uptime_seconds": round(time.monotonic() - self.started, 3),
+                "requests": self.requests,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "active": self.active,
+                "rows": self.rows,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                # Rows and bytes per second of time spent serving mask requests
+                "rows_per_second": _rounded(self.rows / busy),
+                "bytes_per_second": _rounded(self.bytes_in / busy),
+                "latency_seconds": {
+                    "window": len(latencies),
+                    **{
+                        name: _rounded(np.percentile(latencies, q)) if len(latencies) else None
+                        for name, q in (("p50", 50), ("p95", 95), ("p99", 99))
+                    },
+                    "mean": _rounded(latencies.mean()) if len(latencies) else None,
+                    "max": _rounded(latencies.max()) if len(latencies) else None,
+                },
+            }
+
+
+def _rounded(value):
+    return None if np.isnan(value) else round(float(value), 6)
+
+
+class MaskingServer(ThreadingHTTPServer):
+    """Local HTTP API around the masking engine.
+
+    POST /mask/<name> masks the request body with a spec loaded at start-up;
+    POST /mask masks it with the JSON spec in the X-Masking-Spec header.
+    Bodies are CSV, Parquet or Feather (by Content-Type or ?format=) and the
+    masked data is streamed back in the same format. GET /metrics returns
+    the ServerMetrics as JSON.
+
+    Compiled plans, value pools and mappings stay loaded between requests:
+    each spec keeps its mappings, so a value gets the same fake value in
+    every request masked with it. At most max_concurrent requests are masked
+    at once; others wait up to wait_seconds for a slot and then get 503.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address,
+        specs=None,
+        max_concurrent=SERVER_MAX_CONCURRENT,
+        wait_seconds=SERVER_WAIT_SECONDS,
+        chunksize=DEFAULT_CHUNKSIZE,
+        mapping_store=None,
+        seed=None,
+        secret=None,
+    ):
+        self.chunksize = chunksize
+        self.mapping_store = mapping_store
+        self.secret = secret
+        self.wait_seconds = wait_seconds
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.metrics = ServerMetrics()
+        self.specs = {name: self._load(spec) for name, spec in (specs or {}).items()}
+        self._adhoc_specs = OrderedDict()
+        self._seeds = np.random.SeedSequence(seed)
+        self._lock = threading.Lock()
+        # Bound only once every spec has loaded
+        super().__init__(address, MaskingRequestHandler)
+
+    def _load(self, spec):
+        """Compile a spec and warm its pools; returns (plan, mappings)."""
+        if spec.deterministic and not self.secret:
+            raise SpecError("Deterministic specs need a secret key.")
+        plan = compile_spec(spec)
+        warm_pools(plan)
+        # Created up front so concurrent requests never race to add them
+        mappings = {
+            column.name: ColumnMapping(self.mapping_store, column.namespace)
+            for column in plan.columns
+        }
+        return plan, mappings
+
+    def plan_for(self, name=None, spec_text=None):
+        """(plan, mappings) of a named spec or of a spec sent as JSON text.
+
+        Raises KeyError for an unknown name and SpecError for an invalid spec.
+        """
+        if name:
+            return self.specs[name]
+        if not spec_text:
+            raise SpecError("Send a JSON masking spec in the X-Masking-Spec header.")
+        with self._lock:
+            if spec_text in self._adhoc_specs:
+                self._adhoc_specs.move_to_end(spec_text)
+                return self._adhoc_specs[spec_text]
+        try:
+            spec = MaskingSpec.from_dict(json.loads(spec_text))
+        except json.JSONDecodeError as e:
+            raise SpecError(f"Invalid JSON spec ({e}).") from None
+        loaded = self._load(spec)
+        with self._lock:
+            loaded = self._adhoc_specs.setdefault(spec_text, loaded)
+            if len(self._adhoc_specs) > SPEC_CACHE_SIZE:
+                self._adhoc_specs.popitem(last=False)
+        return loaded
+
+    def rng(self):
+        """Random generator of one request; threads must not share one."""
+        with self._lock:
+            return np.random.default_rng(self._seeds.spawn(1)[0])
+
+
+class RequestError(Exception):
+    """An error reported to the client with an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MaskingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if urlsplit(self.path).path.rstrip("/") != "/metrics":
+            self._send_error(404, "Not found.")
+            return
+        self._send_json(200, self.server.metrics.to_dict())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts[0] != "mask" or len(parts) > 2:
+            self._send_error(404, "Not found.")
+            return
+        if not self.server.slots.acquire(timeout=self.server.wait_seconds):
+            self.server.metrics.reject()
+            self._send_error(503, "Too many requests are being masked; try again later.")
+            return
+        self.server.metrics.begin()
+        started = time.perf_counter()
+        body = None
+        response = None
+        rows = 0
+        ok = False
+        try:
+            plan, mappings = self._plan(parts[1] if len(parts) == 2 else None)
+            query = parse_qs(url.query)
+            file_format = self._format(query)
+            delimiter = query.get("delimiter", [","])[0]
+            body = self._body()
+            rng = self.server.rng()
+            for masked in self._mask_chunks(body, file_format, delimiter, plan, mappings, rng):
+                if response is None:
+                    response = self._start_response(file_format)
+                    writer = StreamWriter(response, file_format, delimiter)
+                writer.write(masked)
+                rows += len(masked)
+            if response is None:
+                response = self._start_response(file_format)
+            else:
+                writer.close()
+            response.finish()
+            ok = True
+        except Exception as e:
+            if response is not None:
+                # Headers are sent; ending without the last chunk marks the body incomplete
+                self.log_error("Masking failed after the response started: %s", e)
+                self.close_connection = True
+            elif isinstance(e, RequestError):
+                self._send_error(e.status, str(e))
+            elif isinstance(e, (ValueError, KeyError, pd.errors.ParserError)):
+                self._send_error(400, f"Could not mask the request body: {e}")
+            else:
+                self._send_error(500, f"Masking failed: {e}")
+        finally:
+            self.server.slots.release()
+            self.server.metrics.end(
+                time.perf_counter() - started,
+                rows,
+                body.bytes_read if body else 0,
+                response.bytes_written if response else 0,
+                ok,
+            )
+
+    def _plan(self, name):
+        try:
+            return self.server.plan_for(name, self.headers.get("X-Masking-Spec"))
+        except KeyError:
+            raise RequestError(404, f"No spec named '{name}'.") from None
+        except SpecError as e:
+            raise RequestError(400, str(e)) from None
+
+    def _format(self, query):
+        if "format" in query:
+            file_format = query["format"][0].lower()
+        else:
+            content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+            file_format = next(
+                (name for name, media in CONTENT_TYPES.items() if media == content_type),
+                None,
+            )
+        if file_format not in STREAM_FORMATS:
+            raise RequestError(
+                415, f"Send {', '.join(STREAM_FORMATS)} data (Content-Type or ?format=)."
+            )
+        return file_format
+
+    def _body(self):
+        if "chunked" in (self.headers.get("Transfer-Encoding") or "").lower():
+            return RequestBody(self.rfile, chunked=True)
+        length = self.headers.get("Content-Length")
+        if length is None:
+            raise RequestError(411, "Send a Content-Length or a chunked request body.")
+        return RequestBody(self.rfile, int(length))
+
+    def _mask_chunks(self, body, file_format, delimiter, plan, mappings, rng):
+        """Yield the masked chunks of the request body as it is read."""
+        chunksize = self.server.chunksize
+        store, secret = self.server.mapping_store, self.server.secret
+        if file_format == "csv":
+            reader = pd.read_csv(
+                io.BufferedReader(body, BODY_BUFFER_BYTES),
+                delimiter=delimiter,
+                on_bad_lines="skip",
+                chunksize=chunksize,
+                usecols=column_filter(plan.input_columns),
+            )
+            row_offset = 0
+            for chunk in reader:
+                masked, _ = mask_with_plan(
+                    chunk, plan, mappings, rng, store, secret, inplace=True, row_offset=row_offset
+                )
+                row_offset += len(chunk)
+                yield masked
+            return
+
+        # Parquet and Feather keep their metadata at the end of the file, so
+        # the body is spooled to a temporary file and then read batch by batch
+        fd, path = tempfile.mkstemp(suffix=f".{file_format}")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(body, f, BODY_BUFFER_BYTES)
+            row_offset = 0
+            for batch in iter_arrow_batches(path, plan.input_columns, chunksize):
+                masked, _ = mask_arrow_table(
+                    batch, plan, mappings, rng, store, secret, row_offset=row_offset
+                )
+                row_offset += batch.num_rows
+                yield masked
+        finally:
+            os.remove(path)
+
+    def _start_response(self, file_format):
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[file_format])
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        return ChunkedResponse(self.wfile)
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        # The request body may be unread, so the connection cannot be reused
+        self.close_connection = True
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,402 @@
+import json
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.config.settings import FAKER_PROVIDERS
+from app.services.generators import BLANK_MODES, make_generator
+from app.services.pools import deterministic_pools
+
+# Options each field type accepts; anything else in a spec file is an error
+FAKER_OPTIONS = {"prefix", "suffix", "locale", "unique"}
+OPTION_KEYS = {
+    "Custom List": {"values"},
+    "Number": {"min", "max", "is_integer"},
+    "Date": {"start_date", "end_date", "distribution", "include_time", "jitter_days"},
+    "UUID": {"prefix", "suffix", "uuid_type", "char_length"},
+    "Row Number": {"prefix", "suffix", "start", "pad_width"},
+    "Format Preserving": {"checksum"},
+}
+OPTION_KEYS.update({field_type: FAKER_OPTIONS for field_type in FAKER_PROVIDERS})
+UUID_TYPES = ("UUID", "Alphanumeric Code")
+DATE_DISTRIBUTIONS = ("uniform", "weekdays")
+CHECKSUMS = ("luhn",)
+
+
+class SpecError(ValueError):
+    """Raised when a masking spec is invalid."""
+
+
+@dataclass
+class ColumnSpec:
+    """How one column is masked: its field type, blank ratio and options."""
+
+    name: str
+    field_type: str
+    blank_percent: float = 0.0
+    options: dict = field(default_factory=dict)
+    # Mapping store namespace shared with other files, e.g. "customer_id"
+    namespace: str = None
+    # How blank_percent is applied, one of generators.BLANK_MODES
+    blank_mode: str = "random"
+    # Leave the blanks of the original column blank
+    keep_nulls: bool = False
+
+    def validate(self):
+        if self.field_type not in OPTION_KEYS:
+            raise SpecError(
+                f"Column '{self.name}': unsupported field type '{self.field_type}'."
+            )
+        if not isinstance(self.blank_percent, (int, float)) or not (
+            0 <= self.blank_percent <= 1
+        ):
+            raise SpecError(
+                f"Column '{self.name}': blank_percent must be between 0 and 1."
+            )
+        if self.namespace is not None and not isinstance(self.namespace, str):
+            raise SpecError(f"Column '{self.name}': namespace must be a string.")
+        if self.blank_mode not in BLANK_MODES:
+            raise SpecError(
+                f"Column '{self.name}': blank_mode must be one of {BLANK_MODES}."
+            )
+        if not isinstance(self.keep_nulls, bool):
+            raise SpecError(f"Column '{self.name}': keep_nulls must be true or false.")
+        unknown = set(self.options) - OPTION_KEYS[self.field_type]
+        if unknown:
+            raise SpecError(
+                f"Column '{self.name}': unknown options for {self.field_type}: {sorted(unknown)}."
+            )
+
+        options = self.options
+        if self.field_type == "Custom List" and not options.get("values"):
+            raise SpecError(f"Column '{self.name}': Custom List needs values.")
+        if self.field_type == "Number":
+            low, high = options.get("min", 0), options.get("max", 1)
+            if not all(isinstance(v, (int, float)) for v in (low, high)) or low > high:
+                raise SpecError(
+                    f"Column '{self.name}': min and max must be numbers with min <= max."
+                )
+        if self.field_type == "Date":
+            bounds = (
+                options.get("start_date", "2020-01-01"),
+                options.get("end_date", "2023-12-31"),
+            )
+            try:
+                start, end = (np.datetime64(bound, "D") for bound in bounds)
+            except (TypeError, ValueError) as e:
+                raise SpecError(f"Column '{self.name}': invalid date ({e}).") from None
+            # "" and None parse as NaT, and numbers as days since 1970
+            if np.isnat(start) or np.isnat(end) or any(
+                isinstance(bound, (int, float)) for bound in bounds
+            ):
+                raise SpecError(
+                    f"Column '{self.name}': start_date and end_date must be dates (YYYY-MM-DD)."
+                )
+            if start > end:
+                raise SpecError(
+                    f"Column '{self.name}': start_date must not be after end_date."
+                )
+            distribution = options.get("distribution", "uniform")
+            if distribution not in DATE_DISTRIBUTIONS:
+                raise SpecError(
+                    f"Column '{self.name}': distribution must be one of {DATE_DISTRIBUTIONS}."
+                )
+            if distribution == "weekdays" and not np.busday_count(start, end + 1):
+                raise SpecError(f"Column '{self.name}': the date range has no weekdays.")
+            if not isinstance(options.get("include_time", False), bool):
+                raise SpecError(f"Column '{self.name}': include_time must be true or false.")
+            jitter_days = options.get("jitter_days")
+            if jitter_days is not None:
+                if (
+                    not isinstance(jitter_days, int)
+                    or isinstance(jitter_days, bool)
+                    or jitter_days < 1
+                ):
+                    raise SpecError(
+                        f"Column '{self.name}': jitter_days must be a positive integer."
+                    )
+        if self.field_type == "Format Preserving":
+            checksum = options.get("checksum")
+            if checksum is not None and checksum not in CHECKSUMS:
+                raise SpecError(
+                    f"Column '{self.name}': checksum must be one of {CHECKSUMS}."
+                )
+        if self.namespace and self.uses_source:
+            # Stored mappings are generated without seeing the originals
+            raise SpecError(
+                f"Column '{self.name}': {self.field_type} values derived from the "
+                "originals cannot use a namespace; use deterministic mode to keep "
+                "them consistent across files."
+            )
+        if self.field_type == "Row Number":
+            start, pad_width = options.get("start", 1), options.get("pad_width", 4)
+            if not isinstance(start, int) or isinstance(start, bool) or start < 0:
+                raise SpecError(
+                    f"Column '{self.name}': start must be a non-negative integer."
+                )
+            if not isinstance(pad_width, int) or isinstance(pad_width, bool) or pad_width < 0:
+                raise SpecError(
+                    f"Column '{self.name}': pad_width must be a non-negative integer."
+                )
+        if self.field_type == "UUID":
+            if options.get("uuid_type", "UUID") not in UUID_TYPES:
+                raise SpecError(
+                    f"Column '{self.name}': uuid_type must be one of {UUID_TYPES}."
+                )
+            char_length = options.get("char_length", 8)
+            if char_length is not None and (
+                not isinstance(char_length, int) or char_length < 1
+            ):
+                raise SpecError(
+                    f"Column '{self.name}': char_length must be a positive integer."
+                )
+        return self
+
+    @property
+    def uses_source(self):
+        """Whether the fake values are derived from the original values."""
+        return self.field_type == "Format Preserving" or bool(
+            self.field_type == "Date" and self.options.get("jitter_days")
+        )
+
+
+@dataclass
+class MaskingSpec:
+    """A serializable description of which columns to mask and how."""
+
+    columns: list = field(default_factory=list)
+    keep_mapping: bool = True
+    # Derive fake values from a keyed hash of the original value (see pseudonymize)
+    deterministic: bool = False
+    # Unmasked columns copied to the output; None keeps every column
+    passthrough: list = None
+    # Specs of individual Excel worksheets by sheet name; other sheets use columns
+    sheets: dict = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build and validate a spec from its dictionary (JSON/YAML) form."""
+        if not isinstance(data, dict):
+            raise SpecError("A masking spec must be a mapping.")
+        columns = []
+        for name, settings in (data.get("columns") or {}).items():
+            if not isinstance(settings, dict) or "field_type" not in settings:
+                raise SpecError(f"Column '{name}': field_type is required.")
+            options = {
+                # YAML loads unquoted dates as date objects; keep them as ISO strings
+                key: value.isoformat() if hasattr(value, "isoformat") else value
+                for key, value in settings.items()
+            }
+            if not options.pop("selected", True):
+                continue
+            field_type = options.pop("field_type")
+            blank_percent = options.pop("blank_percent", 0.0)
+            namespace = options.pop("namespace", None)
+            blank_mode = options.pop("blank_mode", "random")
+            keep_nulls = options.pop("keep_nulls", False)
+            columns.append(
+                ColumnSpec(
+                    name, field_type, blank_percent, options, namespace, blank_mode, keep_nulls
+                )
+            )
+        keep_mapping = bool(data.get("keep_mapping", True))
+        deterministic = bool(data.get("deterministic", False))
+        sheets = data.get("sheets")
+        if sheets is not None:
+            if not isinstance(sheets, dict):
+                raise SpecError("sheets must map sheet names to their columns.")
+            for name, sheet in sheets.items():
+                if not isinstance(sheet, dict) or "sheets" in sheet:
+                    raise SpecError(f"Sheet '{name}': expected columns and passthrough only.")
+            # Sheets share the mapping and deterministic settings of the file
+            sheets = {
+                name: cls.from_dict(
+                    {**sheet, "keep_mapping": keep_mapping, "deterministic": deterministic}
+                )
+                for name, sheet in sheets.items()
+            }
+        return cls(
+            columns, keep_mapping, deterministic, data.get("passthrough"), sheets
+        ).validate()
+
+    def to_dict(self):
+        return {
+            "keep_mapping": self.keep_mapping,
+            "deterministic": self.deterministic,
+            **({"passthrough": self.passthrough} if self.passthrough is not None else {}),
+            "columns": {
+                column.name: {
+                    "field_type": column.field_type,
+                    "blank_percent": column.blank_percent,
+                    **({"namespace": column.namespace} if column.namespace else {}),
+                    **(
+                        {"blank_mode": column.blank_mode}
+                        if column.blank_mode != "random"
+                        else {}
+                    ),
+                    **({"keep_nulls": True} if column.keep_nulls else {}),
+                    **column.options,
+                }
+                for column in self.columns
+            },
+            **(
+                {
+                    "sheets": {
+                        name: {
+                            key: value
+                            for key, value in sheet.to_dict().items()
+                            if key in ("columns", "passthrough")
+                        }
+                        for name, sheet in self.sheets.items()
+                    }
+                }
+                if self.sheets is not None
+                else {}
+            ),
+        }
+
+    def validate(self):
+        if self.passthrough is not None and (
+            not isinstance(self.passthrough, list)
+            or not all(isinstance(col, str) for col in self.passthrough)
+        ):
+            raise SpecError("passthrough must be a list of column names.")
+        for column in self.columns:
+            column.validate()
+            if self.deterministic and column.options.get("unique"):
+                raise SpecError(
+                    f"Column '{column.name}': unique sampling is not available in deterministic mode."
+                )
+            if self.deterministic and column.blank_mode != "random":
+                # Exact counts depend on the other values of the file, so the
+                # blanks would no longer follow from each value alone
+                raise SpecError(
+                    f"Column '{column.name}': blank_mode '{column.blank_mode}' is not "
+                    "available in deterministic mode."
+                )
+        for sheet in (self.sheets or {}).values():
+            sheet.validate()
+        return self
+
+
+@dataclass
+class ColumnPlan:
+    """A compiled column: the generator is built and its options resolved."""
+
+    name: str
+    field_type: str
+    blank_percent: float
+    generator: object
+    namespace: str = None
+    blank_mode: str = "random"
+    keep_nulls: bool = False
+
+
+@dataclass
+class MaskingPlan:
+    """A compiled spec, ready to be applied to any number of DataFrames."""
+
+    columns: list
+    keep_mapping: bool = True
+    deterministic: bool = False
+    passthrough: list = None
+    # Compiled plans of individual Excel worksheets by sheet name
+    sheets: dict = None
+
+    def for_sheet(self, sheet_name):
+        """The plan of one worksheet: its own, or this plan for unlisted sheets."""
+        return (self.sheets or {}).get(sheet_name, self)
+
+    @property
+    def column_names(self):
+        return [column.name for column in self.columns]
+
+    @property
+    def input_columns(self):
+        """Columns to read from an input file, or None to read all of them."""
+        if self.passthrough is None:
+            return None
+        return list(dict.fromkeys(self.column_names + self.passthrough))
+
+
+def load_spec(path):
+    """Load a masking spec from a JSON or YAML file."""
+    with open(path, encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise SpecError("PyYAML is required to read YAML specs.") from None
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return MaskingSpec.from_dict(data)
+
+
+def save_spec(spec, path):
+    """Write a masking spec to a JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spec.to_dict(), f, indent=2)
+
+
+def _setting_value(setting):
+    """Column settings hold Tkinter variables in the GUI and plain values elsewhere."""
+    return setting.get() if hasattr(setting, "get") else setting
+
+
+def spec_from_settings(selected_columns, config_settings, keep_mapping=True):
+    """Build a spec from the GUI column settings and configuration panes."""
+    columns = []
+    for col, settings in selected_columns.items():
+        if not _setting_value(settings["selected"]):
+            continue
+        field_type = _setting_value(settings["field_type"])
+        # The configuration pane may hold options of a previously chosen field type
+        allowed = OPTION_KEYS.get(field_type, set())
+        options = {
+            key: value
+            for key, value in config_settings.get(col, {}).items()
+            if key in allowed
+        }
+        columns.append(
+            ColumnSpec(
+                col, field_type, float(_setting_value(settings["blank_percent"])), options
+            )
+        )
+    return MaskingSpec(columns, bool(keep_mapping)).validate()
+
+
+def warm_pools(plan):
+    """Load the value pools a compiled plan samples from, before any data arrives."""
+    for sheet_plan in [plan, *(plan.sheets or {}).values()]:
+        for column in sheet_plan.columns:
+            generator = column.generator
+            if hasattr(generator, "pools"):
+                generator.pools.get(generator.field_type, generator.locale, generator.unique)
+
+
+def compile_spec(spec, pools=None):
+    """Compile a spec into a plan of per-column generator objects."""
+    if pools is None and spec.deterministic:
+        pools = deterministic_pools
+    return MaskingPlan(
+        [
+            ColumnPlan(
+                column.name,
+                column.field_type,
+                column.blank_percent,
+                make_generator(column.field_type, column.options, pools),
+                column.namespace,
+                column.blank_mode,
+                column.keep_nulls,
+            )
+            for column in spec.columns
+        ],
+        spec.keep_mapping,
+        spec.deterministic,
+        spec.passthrough,
+        None
+        if spec.sheets is None
+        else {name: compile_spec(sheet, pools) for name, sheet in spec.sheets.items()},
+    )
@@ -0,0 +1,218 @@
+import dataclasses
+
+import pandas as pd
+
+from app.config.settings import DEFAULT_CHUNKSIZE
+from app.services.generators import get_rng
+from app.services.instrumentation import span
+from app.services.io import (
+    column_filter,
+    excel_sheet_names,
+    iter_arrow_batches,
+    iter_excel_chunks,
+)
+from app.services.mapping import ColumnMapping
+from app.services.mask import mask_arrow_table, mask_with_plan
+from app.services.writers import ExcelWriter, open_writer
+
+
+def mask_csv_in_chunks(
+    input_path,
+    output_path,
+    plan,
+    delimiter=",",
+    chunksize=DEFAULT_CHUNKSIZE,
+    mapping_store=None,
+    rng=None,
+    secret=None,
+    progress=None,
+    column_fake_mappings=None,
+):
+    """Mask a CSV file chunk by chunk, appending each masked chunk to output_path.
+
+    Only one chunk is held in memory at a time. The output format follows the
+    extension of output_path (see writers.open_writer). When the plan keeps
+    mappings the same mapping per column is shared by all chunks, so a value
+    is replaced by the same fake value wherever it appears in the file.
+    progress is called as progress("rows", rows_done) after each chunk; an
+    exception it raises stops the job and discards the partial output.
+    Passing column_fake_mappings (see mask_with_plan) keeps the mappings
+    after the file, so later files get the same fake values.
+    """
+    if column_fake_mappings is None:
+        column_fake_mappings = {}
+    rng = get_rng(rng)
+    log = []
+
+    # The writer renames its file into place only once every chunk is written
+    with open_writer(output_path, delimiter) as writer:
+        reader = pd.read_csv(
+            input_path,
+            delimiter=delimiter,
+            on_bad_lines="skip",
+            chunksize=chunksize,
+            usecols=column_filter(plan.input_columns),
+        )
+        for chunk_number, chunk in enumerate(_timed_reads(reader)):
+            # Each chunk is read fresh, so it is masked in place
+            masked_chunk, chunk_log = mask_with_plan(
+                chunk,
+                plan,
+                column_fake_mappings,
+                rng,
+                mapping_store,
+                secret,
+                inplace=True,
+                row_offset=writer.rows,
+            )
+            writer.write(masked_chunk)
+            if chunk_number == 0:
+                log.extend(chunk_log)
+            if progress:
+                progress("rows", writer.rows)
+        rows = writer.rows
+
+    log.append(f"Streamed {rows} rows in chunks of {chunksize}.")
+    return rows, log
+
+
+def _timed_reads(chunks):
+    """Yield the chunks of an iterator, timing each read as a "read" span."""
+    chunks = iter(chunks)
+    while True:
+        with span("read"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def mask_arrow_in_batches(
+    input_path,
+    output_path,
+    plan,
+    chunksize=DEFAULT_CHUNKSIZE,
+    mapping_store=None,
+    rng=None,
+    secret=None,
+    progress=None,
+    column_fake_mappings=None,
+):
+    """Mask a Parquet or Feather/Arrow file batch by batch into output_path.
+
+    Only the masked and passthrough columns are read, and passthrough
+    columns are handed to the writer as Arrow data.
+    """
+    if column_fake_mappings is None:
+        column_fake_mappings = {}
+    rng = get_rng(rng)
+    log = []
+
+    with open_writer(output_path) as writer:
+        batches = _timed_reads(
+            iter_arrow_batches(input_path, plan.input_columns, chunksize)
+        )
+        for batch_number, batch in enumerate(batches):
+            masked_batch, batch_log = mask_arrow_table(
+                batch,
+                plan,
+                column_fake_mappings,
+                rng,
+                mapping_store,
+                secret,
+                row_offset=writer.rows,
+            )
+            writer.write(masked_batch)
+            if batch_number == 0:
+                log.extend(batch_log)
+            if progress:
+                progress("rows", writer.rows)
+        rows = writer.rows
+
+    log.append(f"Streamed {rows} rows in batches of {chunksize}.")
+    return rows, log
+
+
+def mask_workbook(
+    input_path,
+    output_path,
+    plan,
+    chunksize=DEFAULT_CHUNKSIZE,
+    mapping_store=None,
+    rng=None,
+    secret=None,
+    progress=None,
+    mappings=None,
+):
+    """Mask every worksheet of an Excel workbook, chunk by chunk.
+
+    Each sheet is masked with plan.for_sheet(sheet_name): the sheet's own
+    plan, or the plan's columns that the sheet has. Sheets are read in
+    read-only mode and written to an .xlsx output in constant-memory mode,
+    so only one chunk is held in memory. With keep_mapping, a column name
+    and field type found in several sheets shares one mapping. Outputs in
+    other formats receive the first sheet only. Passing mappings keeps them
+    after the workbook, for later files.
+    """
+    rng = get_rng(rng)
+    sheet_names = excel_sheet_names(input_path)
+    if not output_path.lower().endswith(".xlsx"):
+        sheet_names = sheet_names[:1]
+    # Mapping of each (column, field type), shared by all sheets
+    if mappings is None:
+        mappings = {}
+    log = []
+
+    with open_writer(output_path) as writer:
+        for sheet_name in sheet_names:
+            if isinstance(writer, ExcelWriter):
+                writer.start_sheet(sheet_name)
+            sheet_plan = plan.for_sheet(sheet_name)
+            sheet_rows = 0
+            chunks = iter_excel_chunks(
+                input_path, sheet_name, sheet_plan.input_columns, chunksize
+            )
+            for chunk_number, chunk in enumerate(_timed_reads(chunks)):
+                if chunk_number == 0:
+                    sheet_plan = _plan_for_columns(
+                        sheet_plan, chunk.columns, sheet_name, plan.sheets
+                    )
+                column_fake_mappings = {
+                    column.name: mappings.setdefault(
+                        (column.name, column.field_type),
+                        ColumnMapping(mapping_store, column.namespace),
+                    )
+                    for column in sheet_plan.columns
+                }
+                masked_chunk, chunk_log = mask_with_plan(
+                    chunk,
+                    sheet_plan,
+                    column_fake_mappings,
+                    rng,
+                    mapping_store,
+                    secret,
+                    inplace=True,
+                    row_offset=sheet_rows,
+                )
+                writer.write(masked_chunk)
+                sheet_rows += len(chunk)
+                if chunk_number == 0:
+                    log.extend(f"Sheet '{sheet_name}': {entry}" for entry in chunk_log)
+                if progress:
+                    progress("rows", writer.rows)
+        rows = writer.rows
+
+    log.append(f"Streamed {rows} rows from {len(sheet_names)} sheet(s) in chunks of {chunksize}.")
+    return rows, log
+
+
+def _plan_for_columns(plan, columns, sheet_name, sheet_plans):
+    """Drop the columns a sheet does not have from a plan shared by all sheets."""
+    missing = [name for name in plan.column_names if name not in columns]
+    if not missing:
+        return plan
+    if sheet_plans and sheet_name in sheet_plans:
+        raise ValueError(f"Sheet '{sheet_name}' has no column(s) {missing}.")
+    return dataclasses.replace(
+        plan, columns=[column for column in plan.columns if column.name in columns]
+    )
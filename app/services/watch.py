@@ -0,0 +1,222 @@
+import asyncio
+import os
+
+import numpy as np
+
+from app.config.settings import DEFAULT_CHUNKSIZE, WATCH_POLL_INTERVAL, WATCH_QUEUE_SIZE
+from app.services.io import ARROW_EXTENSIONS, SUPPORTED_EXTENSIONS
+from app.services.mapping import ColumnMapping
+from app.services.preview import sniff_delimiter
+from app.services.spec import compile_spec, warm_pools
+from app.services.streaming import mask_arrow_in_batches, mask_csv_in_chunks, mask_workbook
+
+# Spec key used for file types without a spec of their own
+ANY_FILE_TYPE = "*"
+
+
+class WatchService:
+    """Masks the files dropped into watched folders until it is stopped.
+
+    specs maps a file type ("csv", "xlsx", "parquet", ... or ANY_FILE_TYPE)
+    to the MaskingSpec of its files. A scan of the folders runs every
+    poll_interval seconds and queues the files whose size and modification
+    time have not changed since the previous scan, so files still being
+    copied in are left alone. Files whose output is newer than them were
+    masked before (e.g. by a previous run of the service) and are skipped,
+    so a restart does not mask the whole folder again. The queue holds at most queue_size files;
+    when it is full scanning waits, so a burst of files never piles up in
+    memory. workers files are masked at once, each streamed chunk by chunk
+    in a thread while the event loop keeps scanning.
+
+    State stays warm between files: specs are compiled once, value pools
+    are loaded at start-up, and each spec keeps its mappings, so a value
+    gets the same fake value in every file of that type for the life of
+    the service (and across runs with a mapping_store).
+    """
+
+    def __init__(
+        self,
+        specs,
+        output_dir,
+        workers=2,
+        queue_size=WATCH_QUEUE_SIZE,
+        poll_interval=WATCH_POLL_INTERVAL,
+        chunksize=DEFAULT_CHUNKSIZE,
+        mapping_store=None,
+        seed=None,
+        secret=None,
+        log=print,
+    ):
+        if not specs:
+            raise ValueError("The watch service needs at least one masking spec.")
+        self.plans = {
+            file_type.lower().lstrip("."): compile_spec(spec)
+            for file_type, spec in specs.items()
+        }
+        self.output_dir = os.path.abspath(output_dir)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.chunksize = chunksize
+        self.mapping_store = mapping_store
+        self.secret = secret
+        self.log = log
+        # Created up front so files masked at once never race to add them
+        # (workbooks add theirs by column and field type with setdefault)
+        self.mappings = {
+            file_type: {
+                column.name: ColumnMapping(mapping_store, column.namespace)
+                for column in plan.columns
+            }
+            for file_type, plan in self.plans.items()
+        }
+        self.processed = 0
+        self.failed = 0
+        self._seeds = np.random.SeedSequence(seed)
+        # Size and modification time of files at the last scan, and of queued files
+        self._pending = {}
+        self._queued = {}
+
+    def file_type(self, path):
+        """Key of the spec masking path, or None when no spec covers it."""
+        file_type = os.path.splitext(path)[1].lower().lstrip(".")
+        if file_type in self.plans:
+            return file_type
+        return ANY_FILE_TYPE if ANY_FILE_TYPE in self.plans else None
+
+    def output_path(self, path):
+        name, ext = os.path.splitext(os.path.basename(path))
+        if ext.lower() == ".xls":
+            ext = ".xlsx"  # xls files cannot be written, fall back to xlsx
+        return os.path.join(self.output_dir, f"{name}_masked{ext}")
+
+    def is_masked(self, path, mtime_ns):
+        """Whether the output of path was written after path was last modified."""
+        try:
+            return os.stat(self.output_path(path)).st_mtime_ns >= mtime_ns
+        except FileNotFoundError:
+            return False
+
+    def warm(self):
+        """Load the value pools of every spec before the first file arrives."""
+        for plan in self.plans.values():
+            warm_pools(plan)
+
+    def scan(self, directories):
+        """Files of the watched folders that are complete and not yet queued."""
+        ready = []
+        seen = {}
+        for directory in directories:
+            for entry in os.scandir(directory):
+                path = entry.path
+                if (
+                    entry.name.startswith(".")
+                    or not entry.is_file()
+                    or not path.lower().endswith(SUPPORTED_EXTENSIONS)
+                    or self.file_type(path) is None
+                ):
+                    continue
+                stat = entry.stat()
+                seen[path] = state = (stat.st_size, stat.st_mtime_ns)
+                if self._pending.get(path) == state and self._queued.get(path) != state:
+                    self._queued[path] = state
+                    if not self.is_masked(path, state[1]):
+                        ready.append(path)
+        self._pending = seen
+        # Forget deleted files, so a file dropped again under their name is masked
+        self._queued = {path: state for path, state in self._queued.items() if path in seen}
+        return sorted(ready)
+
+    def mask_file(self, path, rng=None):
+        """Mask one file into the output folder; returns the log entries."""
+        file_type = self.file_type(path)
+        plan = self.plans[file_type]
+        mappings = self.mappings[file_type]
+        output_path = self.output_path(path)
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".xlsx", ".xls"):
+            _, log = mask_workbook(
+                path,
+                output_path,
+                plan,
+                self.chunksize,
+                self.mapping_store,
+                rng,
+                self.secret,
+                mappings=mappings,
+            )
+        elif ext in ARROW_EXTENSIONS:
+            _, log = mask_arrow_in_batches(
+                path,
+                output_path,
+                plan,
+                self.chunksize,
+                self.mapping_store,
+                rng,
+                self.secret,
+                column_fake_mappings=mappings,
+            )
+        else:
+            _, log = mask_csv_in_chunks(
+                path,
+                output_path,
+                plan,
+                sniff_delimiter(path),
+                self.chunksize,
+                self.mapping_store,
+                rng,
+                self.secret,
+                column_fake_mappings=mappings,
+            )
+        return log + [f"Masked data saved to '{output_path}'"]
+
+    async def run(self, directories, stop=None):
+        """Watch directories until stop (an asyncio.Event) is set.
+
+        Files already queued are masked before run returns.
+        """
+        directories = [os.path.abspath(directory) for directory in directories]
+        if self.output_dir in directories:
+            raise ValueError("The output folder must not be one of the watched folders.")
+        os.makedirs(self.output_dir, exist_ok=True)
+        await asyncio.to_thread(self.warm)
+        self.log(f"Watching {len(directories)} folder(s) for new files.")
+
+        queue = asyncio.Queue(self.queue_size)
+        workers = [
+            asyncio.create_task(self._work(queue)) for _ in range(self.workers)
+        ]
+        try:
+            while stop is None or not stop.is_set():
+                for path in await asyncio.to_thread(self.scan, directories):
+                    # Waits while the queue is full
+                    await queue.put(path)
+                if stop is None:
+                    await asyncio.sleep(self.poll_interval)
+                else:
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _work(self, queue):
+        while True:
+            path = await queue.get()
+            # Each file gets its own generator, as threads must not share one
+            rng = np.random.default_rng(self._seeds.spawn(1)[0])
+            try:
+                log = await asyncio.to_thread(self.mask_file, path, rng)
+            except Exception as e:
+                self.failed += 1
+                self.log(f"Error masking '{path}': {e}")
+            else:
+                self.processed += 1
+                for entry in log:
+                    self.log(f"{path}: {entry}")
+            finally:
+                queue.task_done()
@@ -0,0 +1,401 @@
+import os
+import tempfile
+
+from app.config.settings import DEFAULT_CHUNKSIZE
+from app.services.instrumentation import count, span
+
+# Excel worksheets hold at most this many rows, including the header row
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _read_umask():
+    # The umask can only be read by setting it, and it is process-wide, so
+    # it is read once at import, before any thread writes files
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Mode open() gives new files, given to the files written through a temporary file
+FILE_MODE = 0o666 & ~_read_umask()
+
+
+class TableWriter:
+    """Writes DataFrame chunks to a temporary file next to path.
+
+    The temporary file is renamed to path when the writer is closed, so the
+    destination is written once, never copied, and readers never see a
+    partial file. Use as a context manager; on error the file is discarded.
+    mkstemp creates the file readable by its owner only, so it is given the
+    mode of a file created with open() before it is renamed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.chunks = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        extension = os.path.splitext(path)[1]
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, suffix=extension)
+        os.close(fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, df):
+        """Append a DataFrame (or a pyarrow Table) to the output."""
+        with span("write", format=os.path.splitext(self.path)[1].lower().lstrip(".")):
+            self._write(df)
+        count("rows_written", len(df))
+        self.rows += len(df)
+        self.chunks += 1
+
+    def close(self):
+        with span("write.close"):
+            self._close()
+            os.chmod(self.temp_path, FILE_MODE)
+            os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        try:
+            self._close()
+        finally:
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+
+    def _write(self, df):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+def _dataframe(df):
+    # Arrow tables are converted only by writers that need Python values
+    return df.to_pandas() if hasattr(df, "to_pandas") else df
+
+
+class CsvWriter(TableWriter):
+    """Streams chunks to a CSV file."""
+
+    def __init__(self, path, delimiter=","):
+        super().__init__(path)
+        self.delimiter = delimiter
+        self._file = open(self.temp_path, "w", newline="", encoding="utf-8")
+
+    def _write(self, df):
+        _dataframe(df).to_csv(self._file, sep=self.delimiter, index=False, header=self.chunks == 0)
+
+    def _close(self):
+        self._file.close()
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("pyarrow is required to write Parquet and Arrow files.") from None
+    return pa
+
+
+def _arrow_table(df, schema=None):
+    """df as an Arrow table, cast to schema when one is given.
+
+    Raises pyarrow.ArrowException when a column cannot take the type of
+    schema, e.g. text after a chunk in which the column was numeric.
+    """
+    pa = _pyarrow()
+    if isinstance(df, pa.Table):
+        table = df
+    else:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is not None and not table.schema.equals(schema):
+        # Later chunks may infer a narrower type (e.g. an all-null column)
+        table = table.cast(schema)
+    return table
+
+
+def _widened_schema(schema, table):
+    """Schema able to hold both the chunks written with schema and table.
+
+    All-null columns take the type of the other side, integers and floats
+    become floats, and any other conflict becomes a string column.
+    """
+    pa = _pyarrow()
+    fields = []
+    for field in schema:
+        other = table.schema.field(field.name).type
+        if field.type == other or pa.types.is_null(other):
+            fields.append(field)
+        elif pa.types.is_null(field.type):
+            fields.append(field.with_type(other))
+        elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in (field.type, other)):
+            fields.append(field.with_type(pa.float64()))
+        else:
+            fields.append(field.with_type(pa.string()))
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class ArrowFileWriter(TableWriter):
+    """Base of the writers of Arrow based formats, whose files have one schema.
+
+    The first chunk sets the schema. CSV chunks are typed one at a time, so
+    a later chunk may not fit it (text in a column that was numeric or
+    empty); the schema is then widened and the chunks already written are
+    rewritten with it, which is rare and costs one extra pass.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._writer = None
+        self._schema = None
+
+    def _write(self, df):
+        pa = _pyarrow()
+        try:
+            table = _arrow_table(df, self._schema)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            table = _arrow_table(df)
+            self._rewrite(_widened_schema(self._schema, table))
+            table = table.cast(self._schema)
+        if self._writer is None:
+            self._schema = table.schema
+            self._writer = self._open(self.temp_path, self._schema)
+        self._writer.write_table(table)
+
+    def _rewrite(self, schema):
+        """Start the file over with schema, copying the chunks written so far."""
+        from app.services.io import iter_arrow_batches
+
+        count("write.schema_widened")
+        self._writer.close()
+        written_path = self.temp_path
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(written_path), suffix=os.path.splitext(self.path)[1]
+        )
+        os.close(fd)
+        try:
+            self._schema = schema
+            self._writer = self._open(self.temp_path, schema)
+            for table in iter_arrow_batches(written_path):
+                self._writer.write_table(table.cast(schema))
+        finally:
+            os.remove(written_path)
+
+    def _open(self, path, schema):
+        raise NotImplementedError
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetWriter(ArrowFileWriter):
+    """Writes each chunk as a row group of a Parquet file."""
+
+    def _open(self, path, schema):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(path, schema)
+
+
+class FeatherWriter(ArrowFileWriter):
+    """Writes chunks as record batches of a Feather v2 (Arrow IPC) file."""
+
+    def _open(self, path, schema):
+        return _pyarrow().ipc.new_file(path, schema)
+
+
+class ExcelWriter(TableWriter):
+    """Writes rows with xlsxwriter in constant_memory mode.
+
+    Rows are flushed to disk as they are written, so memory stays flat, but
+    a worksheet cannot hold more than EXCEL_MAX_ROWS rows. Call start_sheet
+    to write the following chunks to another worksheet of the workbook.
+    """
+
+    def __init__(self, path, sheet_name="Masked Data"):
+        super().__init__(path)
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(
+            self.temp_path,
+            {"constant_memory": True, "default_date_format": "yyyy-mm-dd"},
+        )
+        self._worksheet = None
+        self.start_sheet(sheet_name)
+
+    def start_sheet(self, sheet_name):
+        """Write the following chunks to a new worksheet, headed by their columns.
+
+        The worksheet is added when its first chunk is written.
+        """
+        self._sheet_name = sheet_name
+        # Data rows written to the current worksheet
+        self.sheet_rows = 0
+
+    def _write(self, df):
+        df = _dataframe(df)
+        if self._sheet_name is not None:
+            self._worksheet = self._workbook.add_worksheet(self._sheet_name)
+            self._sheet_name = None
+            self._worksheet.write_row(0, 0, [str(col) for col in df.columns])
+        if self.sheet_rows + len(df) + 1 > EXCEL_MAX_ROWS:
+            raise ValueError(
+                f"Excel sheets are limited to {EXCEL_MAX_ROWS - 1} data rows; "
+                "save as CSV, Parquet or Feather instead."
+            )
+        # Blank cells for missing values; xlsxwriter cannot write NaN
+        values = df.astype(object).where(df.notna(), None)
+        row_number = self.sheet_rows + 1
+        for row in values.itertuples(index=False, name=None):
+            self._worksheet.write_row(row_number, 0, row)
+            row_number += 1
+        self.sheet_rows += len(df)
+
+    def _close(self):
+        if self._workbook is not None:
+            if self._worksheet is None:
+                # Nothing was written; a workbook needs at least one sheet
+                self._workbook.add_worksheet(self._sheet_name)
+            self._workbook.close()
+            self._workbook = None
+
+
+WRITERS = {
+    ".csv": CsvWriter,
+    ".parquet": ParquetWriter,
+    ".feather": FeatherWriter,
+    ".arrow": FeatherWriter,
+    ".xlsx": ExcelWriter,
+}
+
+# File dialog filters for the supported output formats
+OUTPUT_FILETYPES = [
+    ("Excel files", "*.xlsx"),
+    ("CSV files", "*.csv"),
+    ("Parquet files", "*.parquet"),
+    ("Feather files", "*.feather"),
+    ("Arrow files", "*.arrow"),
+]
+
+
+# Formats StreamWriter can write to a file-like object
+STREAM_FORMATS = ("csv", "parquet", "feather")
+
+
+class StreamWriter:
+    """Writes chunks to a binary file-like sink, such as an HTTP response.
+
+    Unlike TableWriter there is no file to rename into place: every chunk
+    goes to sink as soon as it is encoded. Parquet chunks become row groups
+    and Feather chunks record batches, as in the file writers. Chunks already
+    sent cannot be rewritten with a wider schema, so columns that are all
+    null in the first chunk are typed as strings, and a later chunk that
+    still does not fit the schema raises ValueError.
+    """
+
+    def __init__(self, sink, file_format, delimiter=","):
+        if file_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported output format: '{file_format}'.")
+        self.sink = sink
+        self.file_format = file_format
+        self.delimiter = delimiter
+        self.rows = 0
+        self.chunks = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        with span("write", format=self.file_format):
+            if self.file_format == "csv":
+                text = _dataframe(df).to_csv(
+                    sep=self.delimiter, index=False, header=self.chunks == 0
+                )
+                self.sink.write(text.encode("utf-8"))
+            else:
+                self._write_table(df)
+        count("rows_written", len(df))
+        self.rows += len(df)
+        self.chunks += 1
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _write_table(self, df):
+        pa = _pyarrow()
+        if self._writer is None:
+            table = _arrow_table(df)
+            schema = pa.schema(
+                [
+                    field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                    for field in table.schema
+                ],
+                metadata=table.schema.metadata,
+            )
+            table = table.cast(schema)
+            self._schema = schema
+            self._writer = self._open(schema)
+        else:
+            try:
+                table = _arrow_table(df, self._schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(
+                    f"A chunk does not fit the column types of the chunks already sent ({e})."
+                ) from None
+        self._writer.write_table(table)
+
+    def _open(self, schema):
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.sink, schema)
+        import pyarrow as pa
+
+        return pa.ipc.new_file(self.sink, schema)
+
+
+def open_writer(path, delimiter=",", sheet_name="Masked Data"):
+    """Return the writer matching the extension of path."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported output format: '{ext}'.")
+    if ext == ".csv":
+        return CsvWriter(path, delimiter)
+    if ext == ".xlsx":
+        return ExcelWriter(path, sheet_name)
+    return WRITERS[ext](path)
+
+
+def write_dataframe(
+    df, path, delimiter=",", sheet_name="Masked Data", progress=None, chunksize=None
+):
+    """Write a whole DataFrame to path in the format given by its extension.
+
+    With progress, the rows are written in chunks of chunksize and
+    progress("write", rows_written, total_rows) is called after each one.
+    """
+    with open_writer(path, delimiter, sheet_name) as writer:
+        if progress is None:
+            writer.write(df)
+        else:
+            chunksize = chunksize or DEFAULT_CHUNKSIZE
+            for start in range(0, len(df), chunksize):
+                writer.write(_slice(df, start, chunksize))
+                progress("write", writer.rows, len(df))
+    return path
+
+
+def _slice(df, start, length):
+    if hasattr(df, "to_pandas"):
+        return df.slice(start, length)
+    return df.iloc[start : start + length]
@@ -0,0 +1,184 @@
+import fnmatch
+import re
+from dataclasses import dataclass
+
+from pandas import isna
+
+from app.config.settings import DETECT_SELECT_CONFIDENCE, FIELD_TYPES
+
+# Field types offered in the column panel
+FIELD_TYPE_CHOICES = list(FIELD_TYPES.keys()) + [
+    "Row Number",
+    "Custom List",
+    "Number",
+    "Date",
+    "Format Preserving",
+]
+
+# Inferred column type of each NumPy dtype kind, used to bulk-select columns
+INFERRED_TYPES = {
+    "i": "Number",
+    "u": "Number",
+    "f": "Number",
+    "b": "Boolean",
+    "M": "Date",
+    "m": "Duration",
+}
+
+
+# Distinct sample values shown per column, taken from the first rows
+PREVIEW_VALUES = 3
+PREVIEW_ROWS = 50
+
+
+def infer_type(dtype):
+    return INFERRED_TYPES.get(getattr(dtype, "kind", "O"), "Text")
+
+
+def preview(values, n=PREVIEW_VALUES):
+    """The first n distinct non-blank values, joined for display."""
+    shown = []
+    for value in values:
+        if isna(value) or value in shown:
+            continue
+        shown.append(value)
+        if len(shown) == n:
+            break
+    return ", ".join(str(value) for value in shown)
+
+
+@dataclass
+class ColumnSetting:
+    """Masking settings of one column as plain values (no Tk variables)."""
+
+    name: str
+    inferred_type: str = "Text"
+    selected: bool = False
+    field_type: str = "Name"
+    blank_percent: float = 0.0
+    # A few distinct values from the sample, shown as a preview
+    sample: str = ""
+    # Confidence of the detected field type, when PII detection suggested one
+    confidence: float = None
+
+
+class ColumnSettingsModel:
+    """Settings of every column of the loaded file, in file order.
+
+    The column panel only displays this model, so a file with thousands of
+    columns holds thousands of small objects rather than Tk widgets and
+    variables.
+    """
+
+    def __init__(self, columns=()):
+        self.columns = list(columns)
+        self._by_name = {column.name: column for column in self.columns}
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """One setting per column of df; df may be just a sample of the file."""
+        # One object array for all columns, rather than a Series per column
+        head = df.head(PREVIEW_ROWS).to_numpy(dtype=object).T
+        return cls(
+            ColumnSetting(name, infer_type(dtype), sample=preview(values))
+            for (name, dtype), values in zip(df.dtypes.items(), head)
+        )
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    @property
+    def inferred_types(self):
+        return sorted({column.inferred_type for column in self.columns})
+
+    def filter(self, text=""):
+        """Columns whose name contains text (case-insensitive) or matches it as a glob."""
+        text = text.strip().lower()
+        if not text:
+            return list(self.columns)
+        return [
+            column
+            for column in self.columns
+            if text in str(column.name).lower()
+            or fnmatch.fnmatch(str(column.name).lower(), text)
+        ]
+
+    def matching(self, pattern=None, inferred_type=None, regex=False):
+        """Columns matching a name pattern (glob or regex) and/or an inferred type."""
+        compiled = None
+        if regex and pattern:
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern '{pattern}': {e}") from None
+
+        def name_matches(name):
+            if compiled is not None:
+                return compiled.search(name) is not None
+            if pattern:
+                return fnmatch.fnmatch(name.lower(), pattern.lower())
+            return True
+
+        return [
+            column
+            for column in self.columns
+            if name_matches(str(column.name))
+            and (inferred_type is None or column.inferred_type == inferred_type)
+        ]
+
+    def set_selected(self, columns, selected=True):
+        for column in columns:
+            column.selected = selected
+        return len(columns)
+
+    def apply_detections(self, detections, select_confidence=DETECT_SELECT_CONFIDENCE):
+        """Pre-fill the field types suggested by detect.detect_pii.
+
+        Columns detected with at least select_confidence are also selected;
+        the others keep their suggestion for the user to confirm. Returns the
+        number of columns selected.
+        """
+        selected = 0
+        for name, detection in detections.items():
+            column = self._by_name.get(name)
+            if column is None:
+                continue
+            column.field_type = detection.field_type
+            column.confidence = detection.confidence
+            if detection.confidence >= select_confidence:
+                column.selected = True
+                selected += 1
+        return selected
+
+    def update(self, name, **values):
+        """Change settings of one column, checking the values as the form did."""
+        column = self._by_name[name]
+        if "field_type" in values and values["field_type"] not in FIELD_TYPE_CHOICES:
+            raise ValueError(f"Unsupported field type: {values['field_type']}")
+        if "blank_percent" in values:
+            try:
+                values["blank_percent"] = float(values["blank_percent"])
+            except (TypeError, ValueError):
+                raise ValueError("Blank percentage must be a number.") from None
+            if not 0 <= values["blank_percent"] <= 1:
+                raise ValueError("Blank percentage must be between 0 and 1.")
+        for key, value in values.items():
+            setattr(column, key, value)
+        return column
+
+    def selected_columns(self):
+        """Settings in the form spec_from_settings expects."""
+        return {
+            column.name: {
+                "selected": column.selected,
+                "field_type": column.field_type,
+                "blank_percent": column.blank_percent,
+            }
+            for column in self.columns
+        }
@@ -0,0 +1,192 @@
+import tkinter as tk
+from tkinter import ttk
+
+from app.ui.column_model import FIELD_TYPE_CHOICES, ColumnSettingsModel
+
+ANY_TYPE = "Any type"
+# Delay before the list is filtered, so typing a search term stays smooth
+SEARCH_DELAY_MS = 150
+
+
+class ColumnPanel:
+    """Shows a ColumnSettingsModel in the column Treeview of the main window.
+
+    Treeview rows are not widgets and Tk only draws the visible ones, so a
+    file with thousands of columns loads and scrolls quickly. Editing a cell
+    places a single Combobox or Entry over it.
+    """
+
+    def __init__(self, app, on_configure, log):
+        self.app = app
+        self.tree = app.column_tree
+        self.model = ColumnSettingsModel()
+        # Called with the column name and field type to open its configuration pane
+        self.on_configure = on_configure
+        self.log = log
+        self._editor = None
+        self._search_job = None
+
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.tree.bind("<space>", self._on_space)
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self._update_buttons())
+        self.tree.bind("<MouseWheel>", lambda event: self._close_editor())
+        app.search_var.trace_add("write", lambda *args: self._schedule_refresh())
+        app.select_matching_button.config(command=lambda: self.select_matching(True))
+        app.clear_matching_button.config(command=lambda: self.select_matching(False))
+        app.configure_button.config(command=self.configure_focused)
+
+    def load(self, df, detections=None):
+        """Show the columns of a newly loaded DataFrame.
+
+        detections (see detect.detect_pii) pre-fill suggested field types.
+        """
+        self.model = ColumnSettingsModel.from_dataframe(df)
+        if detections:
+            selected = self.model.apply_detections(detections)
+            self.log(
+                f"Detected {len(detections)} likely personal data column(s); "
+                f"selected {selected} with high confidence."
+            )
+        self.app.type_filter.config(values=[ANY_TYPE] + self.model.inferred_types)
+        self.app.type_filter_var.set(ANY_TYPE)
+        self.app.search_var.set("")
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the rows shown for the current search text."""
+        self._search_job = None
+        self._close_editor()
+        self.tree.delete(*self.tree.get_children())
+        positions = {id(column): i for i, column in enumerate(self.model.columns)}
+        for column in self.model.filter(self.app.search_var.get()):
+            self.tree.insert(
+                "", "end", iid=str(positions[id(column)]), values=self._row(column)
+            )
+        self._update_buttons()
+
+    def select_matching(self, selected=True):
+        """Select (or clear) every column matching the pattern and type filters."""
+        inferred_type = self.app.type_filter_var.get()
+        try:
+            columns = self.model.matching(
+                self.app.pattern_var.get().strip() or "*",
+                None if inferred_type == ANY_TYPE else inferred_type,
+            )
+        except ValueError as e:
+            self.log(str(e))
+            return
+        self.model.set_selected(columns, selected)
+        self.refresh()
+        self.log(f"{'Selected' if selected else 'Cleared'} {len(columns)} column(s).")
+
+    def configure_focused(self):
+        column = self._focused_column()
+        if column is not None and column.selected:
+            self.on_configure(column.name, column.field_type)
+
+    @staticmethod
+    def _row(column):
+        return (
+            "☑" if column.selected else "☐",
+            column.name,
+            column.inferred_type,
+            column.field_type if column.selected else "",
+            f"{column.blank_percent:g}" if column.selected else "",
+            "" if column.confidence is None else f"{column.confidence:.0%}",
+            column.sample,
+        )
+
+    def _column(self, iid):
+        return self.model.columns[int(iid)]
+
+    def _focused_column(self):
+        iid = self.tree.focus()
+        return self._column(iid) if iid else None
+
+    def _redraw(self, iid):
+        self.tree.item(iid, values=self._row(self._column(iid)))
+        self._update_buttons()
+
+    def _update_buttons(self):
+        column = self._focused_column()
+        enabled = column is not None and column.selected
+        self.app.configure_button.config(state="normal" if enabled else "disabled")
+
+    def _schedule_refresh(self):
+        if self._search_job is not None:
+            self.tree.after_cancel(self._search_job)
+        self._search_job = self.tree.after(SEARCH_DELAY_MS, self.refresh)
+
+    def _toggle(self, iid):
+        column = self._column(iid)
+        column.selected = not column.selected
+        self._redraw(iid)
+
+    def _on_click(self, event):
+        self._close_editor()
+        iid = self.tree.identify_row(event.y)
+        if iid and self.tree.identify_column(event.x) == "#1":
+            self._toggle(iid)
+
+    def _on_space(self, event):
+        iid = self.tree.focus()
+        if iid:
+            self._toggle(iid)
+        return "break"
+
+    def _on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        column_id = self.tree.identify_column(event.x)
+        if not iid or column_id == "#1":
+            return
+        if column_id == "#4":
+            self._edit(iid, column_id, "field_type")
+        elif column_id == "#5":
+            self._edit(iid, column_id, "blank_percent")
+        else:
+            self.tree.focus(iid)
+            self.configure_focused()
+
+    def _edit(self, iid, column_id, key):
+        """Place an editor over one cell; editing a column also selects it."""
+        bbox = self.tree.bbox(iid, column_id)
+        if not bbox:
+            return
+        column = self._column(iid)
+        if not column.selected:
+            column.selected = True
+            self._redraw(iid)
+        variable = tk.StringVar(value=str(getattr(column, key)))
+        if key == "field_type":
+            editor = ttk.Combobox(
+                self.tree, textvariable=variable, values=FIELD_TYPE_CHOICES, state="readonly"
+            )
+            editor.bind("<<ComboboxSelected>>", lambda event: self._commit())
+        else:
+            editor = tk.Entry(self.tree, textvariable=variable)
+            editor.select_range(0, tk.END)
+        x, y, width, height = bbox
+        editor.place(x=x, y=y, width=width, height=height)
+        editor.focus_set()
+        editor.bind("<Return>", lambda event: self._commit())
+        editor.bind("<FocusOut>", lambda event: self._commit())
+        editor.bind("<Escape>", lambda event: self._close_editor())
+        self._editor = (editor, iid, key, variable)
+
+    def _commit(self):
+        if self._editor is None:
+            return
+        _, iid, key, variable = self._editor
+        try:
+            self.model.update(self._column(iid).name, **{key: variable.get()})
+        except ValueError as e:
+            self.log(str(e))
+        self._close_editor()
+        self._redraw(iid)
+
+    def _close_editor(self):
+        if self._editor is not None:
+            editor = self._editor[0]
+            self._editor = None
+            editor.destroy()
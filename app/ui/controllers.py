@@ -1,13 +1,22 @@
 import tkinter as tk
 from tkinter import filedialog, Toplevel, ttk
-import pandas as pd
 
-from app.ui.views import MainWindow
-from app.services.mask import mask_data, save_masked_data
-from app.config.settings import FIELD_TYPES
-from app.utils import generate_uuid, generate_random_date
-from datetime import datetime
-import numpy as np
+from app.ui.views import AUTO_DELIMITER, MainWindow
+from app.ui.column_panel import ColumnPanel
+from app.services.detect import detect_pii
+from app.services.instrumentation import recording
+from app.services.io import ARROW_EXTENSIONS, SUPPORTED_EXTENSIONS
+from app.services.preview import read_sample
+from app.services.spec import compile_spec, spec_from_settings
+from app.services.streaming import mask_arrow_in_batches, mask_csv_in_chunks, mask_workbook
+from app.services.writers import OUTPUT_FILETYPES
+from app.ui.worker import BackgroundTask, TaskCancelled
+import os
+
+# The sample of the opened file, its path and CSV delimiter, shared by the event handlers
+df = None
+file_path = None
+file_delimiter = None
 
 def run_app():
     root = tk.Tk()
@@ -19,116 +28,118 @@ def run_app():
 
     # Global variables for configuration
     config_settings = {}
-    column_settings = {}
+    column_panel = ColumnPanel(
+        app,
+        on_configure=lambda col, field_type: open_config_pane(
+            root, col, field_type, config_settings
+        ),
+        log=lambda message: app.log_text.insert(tk.END, message + "\n"),
+    )
 
     # Set up event handlers
-    app.upload_button.config(command=lambda: process_file(app, config_settings, column_settings))
-    app.generate_button.config(command=lambda: generate_fake_data(app, config_settings, column_settings))
+    app.upload_button.config(command=lambda: process_file(app, config_settings, column_panel))
+    app.generate_button.config(command=lambda: generate_fake_data(app, config_settings, column_panel))
 
     # Start the UI loop
     root.mainloop()
 
-def process_file(app, config_settings, column_settings):
-    global df, file_path
-    file_path = filedialog.askopenfilename(
+def process_file(app, config_settings, column_panel):
+    path = filedialog.askopenfilename(
         filetypes=[
             ("CSV files", "*.csv"),
             ("Excel files", "*.xlsx"),
             ("Excel files", "*.xls"),
+            ("Parquet files", "*.parquet"),
+            ("Feather files", "*.feather"),
+            ("Arrow files", "*.arrow"),
         ]
     )
 
-    if not file_path:
+    if not path:
         return  # Exit if no file is selected
 
-    # Load the file with the selected delimiter for CSV files
-    try:
-        if file_path.endswith(".csv"):
-            selected_delimiter = app.delimiter_var.get()
-            df = pd.read_csv(file_path, delimiter=selected_delimiter, on_bad_lines='skip')
-        elif file_path.endswith((".xlsx", ".xls")):
-            df = pd.read_excel(file_path)
+    if not path.lower().endswith(SUPPORTED_EXTENSIONS):
+        app.log_text.insert(
+            tk.END,
+            "Unsupported file format. Please upload a CSV, Excel, Parquet or Arrow file.\n",
+        )
+        return
+
+    # Tk variables are read here; the worker thread must not touch them
+    delimiter = app.delimiter_var.get()
+    delimiter = None if delimiter == AUTO_DELIMITER else delimiter
+    reservoir = app.sample_var.get()
+
+    def open_sample(progress):
+        table_sample = read_sample(path, delimiter, reservoir=reservoir)
+        return table_sample, detect_pii(table_sample.sample)
+
+    def loaded(result, error):
+        global df, file_path, file_delimiter
+        if isinstance(error, TaskCancelled):
+            app.log_text.insert(tk.END, "Loading canceled.\n")
+        elif error is not None:
+            app.log_text.insert(tk.END, f"Error loading file: {error}\n")
         else:
+            table_sample, detections = result
+            # Only a sample is loaded; the whole file is read when masking
+            df, file_path = table_sample.sample, path
+            file_delimiter = table_sample.delimiter
+            app.log_text.insert(tk.END, f"File '{file_path}' loaded successfully.\n")
+            if file_delimiter is not None and delimiter is None:
+                app.log_text.insert(
+                    tk.END, f"Detected delimiter: {file_delimiter!r}.\n"
+                )
+            kind = "random sample" if table_sample.reservoir else "first rows"
             app.log_text.insert(
-                tk.END, "Unsupported file format. Please upload a CSV or Excel file.\n"
+                tk.END, f"Previewing {len(df)} rows ({kind}) of the file.\n"
             )
-            return
-    except Exception as e:
-        app.log_text.insert(tk.END, f"Error loading file: {e}\n")
-        return
-
-    app.log_text.insert(tk.END, f"File '{file_path}' loaded successfully.\n")
-
-    # Display column settings for masking
-    for widget in app.column_inner_frame.winfo_children():
-        widget.destroy()  # Clear previous widgets
-
-    column_settings.clear()
-    for col in df.columns:
-        col_var = tk.BooleanVar(value=False)
-        field_type_var = tk.StringVar(value="Name")
-        blank_percent_var = tk.DoubleVar(value=0.0)
-
-        column_settings[col] = {
-            "selected": col_var,
-            "field_type": field_type_var,
-            "blank_percent": blank_percent_var,
-        }
-
-        # Add checkbox
-        checkbox = tk.Checkbutton(
-            app.column_inner_frame,
-            text=col,
-            variable=col_var,
-            command=lambda cv=col_var, col=col: toggle_inputs(
-                cv,
-                column_settings[col]["field_type_widget"],
-                column_settings[col]["blank_percent_widget"],
-                column_settings[col]["config_button"],
-            ),
-        )
-        checkbox.pack(anchor="w")
-
-        # Add dropdown for field type (initially disabled)
-        field_type_dropdown = ttk.Combobox(
-            app.column_inner_frame,
-            textvariable=field_type_var,
-            values=list(FIELD_TYPES.keys())
-            + ["Row Number", "Custom List", "Number", "Date"],
-            state="disabled",
-        )
-        field_type_dropdown.pack(anchor="w")
-
-        # Add entry for blank percentage (initially disabled)
-        blank_percent_entry = tk.Entry(
-            app.column_inner_frame, textvariable=blank_percent_var, state="disabled"
-        )
-        blank_percent_entry.pack(anchor="w")
-
-        # Configuration button (initially disabled)
-        config_button = tk.Button(
-            app.column_inner_frame,
-            text="⚙️",
-            state="disabled",
-            command=lambda col=col, ft=field_type_var: open_config_pane(
-                app.root, col, ft.get(), config_settings
-            ),
-        )
-        config_button.pack(anchor="w")
-
-        # Store widget references to enable/disable them in toggle_inputs
-        column_settings[col]["field_type_widget"] = field_type_dropdown
-        column_settings[col]["blank_percent_widget"] = blank_percent_entry
-        column_settings[col]["config_button"] = config_button
-
-    # Enable generate button
-    app.generate_button.config(state="normal")
+            # Display column settings for masking, with detected types pre-filled
+            column_panel.load(df, detections)
+
+    run_in_background(
+        app,
+        open_sample,
+        loaded,
+        f"Opening '{os.path.basename(path)}'...",
+    )
 
-def toggle_inputs(checkbox_var, field_type_widget, blank_percent_widget, config_button):
-    state = "normal" if checkbox_var.get() else "disabled"
-    field_type_widget.config(state=state)
-    blank_percent_widget.config(state=state)
-    config_button.config(state=state)
+# Status bar text of each progress stage
+PROGRESS_LABELS = {
+    "read": "Rows read",
+    "mask": "Columns masked",
+    "rows": "Rows masked",
+    "write": "Rows written",
+}
+
+def run_in_background(app, func, on_done, status):
+    """Run func(progress) on the worker thread while the window stays responsive."""
+    app.upload_button.config(state="disabled")
+    app.generate_button.config(state="disabled")
+    app.progress_bar.config(mode="determinate", value=0)
+    app.status_var.set(status)
+
+    def on_progress(stage, done, total):
+        text = f"{PROGRESS_LABELS.get(stage, stage)}: {done:,}"
+        if total:
+            app.progress_bar.config(mode="determinate", maximum=total, value=done)
+            text += f" of {total:,}"
+        else:
+            app.progress_bar.config(mode="indeterminate")
+            app.progress_bar.step(5)
+        app.status_var.set(text)
+
+    def finish(result, error):
+        app.upload_button.config(state="normal")
+        app.generate_button.config(state="normal" if df is not None else "disabled")
+        app.cancel_button.config(state="disabled")
+        app.progress_bar.config(mode="determinate", value=0)
+        app.status_var.set("")
+        on_done(result, error)
+
+    task = BackgroundTask(app.root, func, finish, on_progress).start()
+    app.cancel_button.config(state="normal", command=task.cancel)
+    return task
 
 def open_config_pane(root, field_name, field_type, config_settings):
     """Opens a configuration pane to set options for the field type."""
@@ -164,6 +175,13 @@ def open_config_pane(root, field_name, field_type, config_settings):
                 )
                 config_settings[field_name]["uuid_type"] = uuid_type
                 config_settings[field_name]["char_length"] = char_length
+            if field_type == "Row Number":
+                config_settings[field_name]["start"] = int(start_entry.get() or 1)
+                config_settings[field_name]["pad_width"] = int(pad_width_entry.get() or 0)
+        elif field_type == "Format Preserving":
+            config_settings[field_name] = {
+                "checksum": "luhn" if luhn_check.get() else None
+            }
         elif field_type == "Custom List":
             custom_values = list_entry.get("1.0", "end-1c").split(",")
             config_settings[field_name] = {"values": [v.strip() for v in custom_values]}
@@ -182,7 +200,11 @@ def open_config_pane(root, field_name, field_type, config_settings):
             config_settings[field_name] = {
                 "start_date": start_date,
                 "end_date": end_date,
+                "distribution": distribution_var.get(),
+                "include_time": include_time_var.get(),
             }
+            if jitter_entry.get().strip():
+                config_settings[field_name]["jitter_days"] = int(jitter_entry.get())
 
         config_window.destroy()
 
@@ -248,6 +270,18 @@ def open_config_pane(root, field_name, field_type, config_settings):
 
         row_offset += 2
 
+    # Additional configuration for Row Number type
+    if field_type == "Row Number":
+        tk.Label(config_window, text="Start At:").grid(row=row_offset, column=0)
+        start_entry = tk.Entry(config_window)
+        start_entry.insert(0, str(existing_config.get("start", 1)))
+        start_entry.grid(row=row_offset, column=1)
+        tk.Label(config_window, text="Zero-Pad Width:").grid(row=row_offset + 1, column=0)
+        pad_width_entry = tk.Entry(config_window)
+        pad_width_entry.insert(0, str(existing_config.get("pad_width", 4)))
+        pad_width_entry.grid(row=row_offset + 1, column=1)
+        row_offset += 2
+
     # Specific configurations for other field types
     if field_type == "Custom List":
         tk.Label(config_window, text="Enter values (comma-separated):").grid(
@@ -271,6 +305,11 @@ def open_config_pane(root, field_name, field_type, config_settings):
         tk.Checkbutton(config_window, text="Integer", variable=int_check).grid(
             row=row_offset + 2, column=0, columnspan=2
         )
+    elif field_type == "Format Preserving":
+        luhn_check = tk.BooleanVar(value=existing_config.get("checksum") == "luhn")
+        tk.Checkbutton(
+            config_window, text="Recompute Luhn Check Digit", variable=luhn_check
+        ).grid(row=row_offset, column=0, columnspan=2)
     elif field_type == "Date":
         tk.Label(config_window, text="Start Date (YYYY-MM-DD):").grid(
             row=row_offset, column=0
@@ -286,21 +325,36 @@ def open_config_pane(root, field_name, field_type, config_settings):
         end_date_entry = tk.Entry(config_window)
         end_date_entry.insert(0, existing_config.get("end_date", ""))  # Load end date
         end_date_entry.grid(row=row_offset + 1, column=1)
+        tk.Label(config_window, text="Distribution:").grid(row=row_offset + 2, column=0)
+        distribution_var = tk.StringVar(
+            value=existing_config.get("distribution", "uniform")
+        )
+        ttk.Combobox(
+            config_window,
+            textvariable=distribution_var,
+            values=["uniform", "weekdays"],
+            state="readonly",
+        ).grid(row=row_offset + 2, column=1)
+        include_time_var = tk.BooleanVar(value=existing_config.get("include_time", False))
+        tk.Checkbutton(
+            config_window, text="Include Time of Day", variable=include_time_var
+        ).grid(row=row_offset + 3, column=0, columnspan=2)
+        # Shifting the original dates replaces the date range
+        tk.Label(config_window, text="Shift Originals by up to (days):").grid(
+            row=row_offset + 4, column=0
+        )
+        jitter_entry = tk.Entry(config_window)
+        jitter_entry.insert(0, str(existing_config.get("jitter_days") or ""))
+        jitter_entry.grid(row=row_offset + 4, column=1)
+        row_offset += 3
 
     # Save button for the configuration
     tk.Button(config_window, text="Save", command=save_configuration).grid(
         row=row_offset + 3, column=0, columnspan=2
     )
 
-def generate_fake_data(app, config_settings, column_settings):
-    selected_columns = {
-        col: {
-            "selected": settings["selected"],
-            "field_type": settings["field_type"],
-            "blank_percent": settings["blank_percent"],
-        }
-        for col, settings in column_settings.items()
-    }
+def generate_fake_data(app, config_settings, column_panel):
+    selected_columns = column_panel.model.selected_columns()
 
     keep_mapping = (
         app.keep_mapping_var.get()
@@ -313,11 +367,76 @@ def generate_fake_data(app, config_settings, column_settings):
         app.log_text.insert(tk.END, "No data loaded. Please upload a file first.\n")
         return
 
-    masked_df, log = mask_data(df, selected_columns, config_settings, keep_mapping)
-    output_file = save_masked_data(masked_df, file_path, app.log_text)
+    # The plan is compiled here because spec_from_settings reads Tk variables
+    try:
+        plan = compile_spec(
+            spec_from_settings(selected_columns, config_settings, keep_mapping)
+        )
+    except ValueError as e:
+        app.log_text.insert(tk.END, f"Invalid masking settings: {e}\n")
+        return
+
+    output_file = ask_save_path(file_path)
+    if not output_file:
+        app.log_text.insert(tk.END, "Save operation canceled.\n")
+        return
+
+    source_path, delimiter = file_path, file_delimiter
 
-    # Display logs
-    if output_file:
+    def mask_and_save(progress):
+        # Time of each stage is added to the log; memory tracking (tracemalloc)
+        # would slow the job down several times
+        with recording() as recorder:
+            log = mask_source_file(source_path, output_file, plan, delimiter, progress)
+        return log + recorder.report().summary()
+
+    run_in_background(
+        app,
+        mask_and_save,
+        lambda log, error: show_result(app, log, error, output_file),
+        "Masking...",
+    )
+
+def mask_source_file(source_path, output_file, plan, delimiter, progress):
+    """Read, mask and write the whole opened file; runs on the worker thread.
+
+    Every format is streamed in chunks, so only one chunk is in memory at a
+    time. Every sheet of an Excel workbook is masked with the same settings,
+    applied to the sheets that have the selected columns.
+    """
+    if source_path.lower().endswith(".csv"):
+        _, log = mask_csv_in_chunks(
+            source_path, output_file, plan, delimiter or ",", progress=progress
+        )
+    elif source_path.lower().endswith(ARROW_EXTENSIONS):
+        # Unmasked columns stay Arrow data up to the writer
+        _, log = mask_arrow_in_batches(source_path, output_file, plan, progress=progress)
+    else:
+        _, log = mask_workbook(source_path, output_file, plan, progress=progress)
+    return log
+
+def ask_save_path(original_file, extension=".xlsx"):
+    """Ask where the masked file goes; the extension picks the format."""
+    file_name, _ = os.path.splitext(original_file)
+    return filedialog.asksaveasfilename(
+        defaultextension=extension,
+        initialfile=file_name + "_masked" + extension,
+        filetypes=sorted(OUTPUT_FILETYPES, key=lambda ft: ft[1] != "*" + extension),
+        title="Select Save Location",
+    )
+
+def show_result(app, log, error, output_file):
+    """Log the outcome of a background masking job."""
+    if isinstance(error, TaskCancelled):
+        app.log_text.insert(tk.END, "Masking canceled; nothing was saved.\n")
+    elif isinstance(error, PermissionError):
+        app.log_text.insert(
+            tk.END,
+            f"Permission error - {error}. Close the file in other programs and try again.\n",
+        )
+    elif error is not None:
+        app.log_text.insert(tk.END, f"Error masking file: {error}\n")
+    else:
         for entry in log:
             app.log_text.insert(tk.END, entry + "\n")
         app.log_text.insert(tk.END, f"Masked data saved to '{output_file}'\n")
@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 
+# Delimiter choice that detects the delimiter of each CSV file
+AUTO_DELIMITER = "Auto-detect"
+
 
 class MainWindow:
     def __init__(self, root):
@@ -8,7 +11,7 @@ class MainWindow:
         self.root.title("Data Masking Tool")
 
         # Add global variable for delimiter selection
-        self.delimiter_var = tk.StringVar(value=",")
+        self.delimiter_var = tk.StringVar(value=AUTO_DELIMITER)
 
         # Frame to hold the upload button and delimiter options side by side
         upload_frame = tk.Frame(self.root)
@@ -17,7 +20,7 @@ class MainWindow:
         # Instructions label
         instructions = tk.Label(
             upload_frame,
-            text="Upload a CSV or Excel file to mask columns with fake data:",
+            text="Upload a CSV, Excel, Parquet or Arrow file to mask columns with fake data:",
         )
         instructions.pack(side="left")
 
@@ -36,37 +39,83 @@ class MainWindow:
         delimiter_dropdown = ttk.Combobox(
             delimiter_frame,
             textvariable=self.delimiter_var,
-            values=[",", ";", "|", "\t"],
+            values=[AUTO_DELIMITER, ",", ";", "|", "\t"],
             state="readonly",
         )
         delimiter_dropdown.pack()
-        delimiter_dropdown.set(",")  # Default delimiter
-
-        # Scrollable frame for column settings
-        self.column_canvas = tk.Canvas(self.root)
-        self.scrollbar = tk.Scrollbar(
-            self.root, orient="vertical", command=self.column_canvas.yview
+        delimiter_dropdown.set(AUTO_DELIMITER)  # Default delimiter
+
+        # Column settings: search, bulk selection and a Treeview with one row
+        # per column. Treeview rows are not widgets, so wide files stay fast.
+        column_frame = tk.Frame(self.root)
+        column_frame.pack(fill="both", expand=True, padx=5)
+
+        search_frame = tk.Frame(column_frame)
+        search_frame.pack(fill="x", pady=(5, 0))
+        tk.Label(search_frame, text="Search columns:").pack(side="left")
+        self.search_var = tk.StringVar(value="")
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var)
+        self.search_entry.pack(side="left", fill="x", expand=True)
+
+        bulk_frame = tk.Frame(column_frame)
+        bulk_frame.pack(fill="x", pady=5)
+        tk.Label(bulk_frame, text="Pattern:").pack(side="left")
+        self.pattern_var = tk.StringVar(value="*")
+        tk.Entry(bulk_frame, textvariable=self.pattern_var, width=15).pack(side="left")
+        self.type_filter_var = tk.StringVar(value="Any type")
+        self.type_filter = ttk.Combobox(
+            bulk_frame,
+            textvariable=self.type_filter_var,
+            values=["Any type"],
+            state="readonly",
+            width=10,
         )
-        self.scrollable_frame = tk.Frame(self.column_canvas)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.column_canvas.configure(
-                scrollregion=self.column_canvas.bbox("all")
+        self.type_filter.pack(side="left", padx=5)
+        self.select_matching_button = tk.Button(bulk_frame, text="Select Matching")
+        self.select_matching_button.pack(side="left")
+        self.clear_matching_button = tk.Button(bulk_frame, text="Clear Matching")
+        self.clear_matching_button.pack(side="left", padx=5)
+        self.configure_button = tk.Button(bulk_frame, text="⚙️ Configure", state="disabled")
+        self.configure_button.pack(side="right")
+
+        tree_frame = tk.Frame(column_frame)
+        tree_frame.pack(fill="both", expand=True)
+        self.column_tree = ttk.Treeview(
+            tree_frame,
+            columns=(
+                "mask",
+                "column",
+                "type",
+                "field_type",
+                "blank_percent",
+                "detected",
+                "sample",
             ),
+            show="headings",
+            height=12,
+            selectmode="browse",
         )
-
-        self.column_canvas.create_window(
-            (0, 0), window=self.scrollable_frame, anchor="nw"
+        for name, heading, width in (
+            ("mask", "Mask", 50),
+            ("column", "Column", 200),
+            ("type", "Type", 80),
+            ("field_type", "Field Type", 140),
+            ("blank_percent", "Blanks (0-1)", 80),
+            ("detected", "Detected", 70),
+            ("sample", "Sample Values", 200),
+        ):
+            self.column_tree.heading(name, text=heading)
+            self.column_tree.column(name, width=width, stretch=name in ("column", "sample"))
+        self.scrollbar = tk.Scrollbar(
+            tree_frame, orient="vertical", command=self.column_tree.yview
         )
-        self.column_canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.column_canvas.pack(side="left", fill="both", expand=True)
+        self.column_tree.configure(yscrollcommand=self.scrollbar.set)
+        self.column_tree.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
-
-        # Inner frame to hold column settings widgets
-        self.column_inner_frame = tk.Frame(self.scrollable_frame)
-        self.column_inner_frame.pack()
+        tk.Label(
+            column_frame,
+            text="Click Mask (or press Space) to select a column; double-click Field Type or Blanks to edit.",
+        ).pack(anchor="w")
 
         # Generate button (initially disabled)
         self.generate_button = tk.Button(
@@ -74,6 +123,19 @@ class MainWindow:
         )
         self.generate_button.pack(pady=5)
 
+        # Progress of the background load/mask/save job and its cancel button
+        progress_frame = tk.Frame(self.root)
+        progress_frame.pack(pady=5)
+        self.progress_bar = ttk.Progressbar(
+            progress_frame, orient="horizontal", length=300, mode="determinate"
+        )
+        self.progress_bar.pack(side="left")
+        self.cancel_button = tk.Button(progress_frame, text="Cancel", state="disabled")
+        self.cancel_button.pack(side="left", padx=(10, 0))
+        self.status_var = tk.StringVar(value="")
+        self.status_label = tk.Label(self.root, textvariable=self.status_var)
+        self.status_label.pack()
+
         # Checkbox to keep mapping consistent (default checked)
         self.keep_mapping_var = tk.BooleanVar(value=True)
         self.keep_mapping_checkbox = tk.Checkbutton(
@@ -81,6 +143,13 @@ class MainWindow:
         )
         self.keep_mapping_checkbox.pack(pady=5)
 
+        # Checkbox to preview a random sample of the whole file instead of its first rows
+        self.sample_var = tk.BooleanVar(value=False)
+        self.sample_checkbox = tk.Checkbutton(
+            self.root, text="Preview Random Sample (Scans File)", variable=self.sample_var
+        )
+        self.sample_checkbox.pack(pady=5)
+
         # Log display
         self.log_text = scrolledtext.ScrolledText(
             self.root, wrap=tk.WORD, width=60, height=20
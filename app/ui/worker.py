@@ -0,0 +1,60 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# One background job runs at a time; the Tk main thread only polls for results
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="masking")
+
+
+class TaskCancelled(Exception):
+    """Raised inside a background task once its cancel button was pressed."""
+
+
+class BackgroundTask:
+    """Runs func(progress) on a worker thread and reports back on the Tk thread.
+
+    func passes progress to the masking services, which call it after every
+    chunk or column. Each call queues the update and raises TaskCancelled
+    once cancel() was called, so the job stops cleanly between steps (writers
+    discard their partial output). The main thread polls the queue with
+    root.after and calls on_progress(stage, done, total) for every update and
+    finally on_done(result, error).
+    """
+
+    def __init__(self, root, func, on_done, on_progress=None, poll_ms=100):
+        self.root = root
+        self.func = func
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+        self.updates = queue.Queue()
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def start(self):
+        self.future = _executor.submit(self.func, self.progress)
+        self.root.after(self.poll_ms, self._poll)
+        return self
+
+    def progress(self, stage, done, total=None):
+        """Called on the worker thread by the masking services."""
+        if self.cancelled.is_set():
+            raise TaskCancelled()
+        self.updates.put((stage, done, total))
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _poll(self):
+        while True:
+            try:
+                update = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            if self.on_progress:
+                self.on_progress(*update)
+        if not self.future.done():
+            self.root.after(self.poll_ms, self._poll)
+            return
+        error = self.future.exception()
+        self.on_done(None if error else self.future.result(), error)
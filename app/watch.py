@@ -0,0 +1,126 @@
+"""Service mode: mask the files dropped into watched folders until stopped.
+
+Example:
+
+    python -m app.watch exports/ --spec csv=csv_spec.json \\
+        --spec xlsx=excel_spec.yaml --output masked/
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from app.config.settings import DEFAULT_CHUNKSIZE, WATCH_POLL_INTERVAL, WATCH_QUEUE_SIZE
+from app.services.mapping_store import MappingStore
+from app.services.spec import load_spec
+from app.services.watch import ANY_FILE_TYPE, WatchService
+
+
+def parse_specs(values):
+    """Map file types to spec paths from TYPE=PATH (or PATH for any type) values."""
+    specs = {}
+    for value in values:
+        file_type, separator, path = value.partition("=")
+        if not separator:
+            file_type, path = ANY_FILE_TYPE, value
+        specs[file_type.lower().lstrip(".")] = path
+    return specs
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m app.watch",
+        description="Watch folders and mask every CSV, Excel, Parquet or Feather/Arrow "
+        "file dropped into them.",
+    )
+    parser.add_argument("folders", nargs="+", help="Folders to watch.")
+    parser.add_argument(
+        "-s",
+        "--spec",
+        action="append",
+        required=True,
+        help="Masking spec of one file type as TYPE=PATH (e.g. csv=spec.json), "
+        "or PATH for every type without its own spec. May be repeated.",
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="Folder the masked files are written to."
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=2, help="Number of files masked at once."
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=WATCH_QUEUE_SIZE,
+        help="Files waiting to be masked before scanning pauses.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_POLL_INTERVAL,
+        help="Seconds between scans of the watched folders.",
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--mapping-store",
+        help="SQLite file with mappings shared across files and runs "
+        "(used by columns with a namespace).",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Random seed for reproducible output."
+    )
+    parser.add_argument(
+        "--key-env",
+        default="DATA_MASKING_KEY",
+        help="Environment variable holding the secret key of deterministic specs.",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    specs = {}
+    for file_type, path in parse_specs(args.spec).items():
+        try:
+            specs[file_type] = load_spec(path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading spec '{path}': {e}", file=sys.stderr)
+            return 2
+    secret = os.environ.get(args.key_env)
+    if any(spec.deterministic for spec in specs.values()) and not secret:
+        print(
+            f"Deterministic specs need a secret key in ${args.key_env}.", file=sys.stderr
+        )
+        return 2
+    missing = [folder for folder in args.folders if not os.path.isdir(folder)]
+    if missing:
+        print(f"Not a folder: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    mapping_store = MappingStore(args.mapping_store) if args.mapping_store else None
+    try:
+        service = WatchService(
+            specs,
+            args.output,
+            args.workers,
+            args.queue_size,
+            args.interval,
+            args.chunksize,
+            mapping_store,
+            args.seed,
+            secret,
+        )
+        asyncio.run(service.run(args.folders))
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    finally:
+        if mapping_store is not None:
+            mapping_store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+"""Masking throughput benchmarks with machine-readable results.
+
+Example:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick
+    python -m benchmarks.run --suite cardinality --cardinalities 10 1000 10000000
+
+Every benchmark is timed several times and the best run is reported, so
+the numbers reflect the code rather than noise from the machine. Results
+are written as JSON together with the package versions and machine they
+were measured on, so runs of different releases can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from app.services.io import read_table
+from app.services.mask import mask_with_plan
+from app.services.spec import OPTION_KEYS, ColumnSpec, MaskingSpec, compile_spec
+from app.services.writers import WRITERS, write_dataframe
+
+SUITES = ("field_types", "keep_mapping", "cardinality", "blanks", "end_to_end")
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+DEFAULT_CARDINALITIES = (10, 1_000, 100_000, 1_000_000)
+QUICK_ROWS = (1_000,)
+QUICK_CARDINALITIES = (10, 1_000)
+BLANK_PERCENTS = (0.0, 0.1, 0.5)
+
+# Options that make every field type valid in a spec
+FIELD_OPTIONS = {
+    "Custom List": {"values": ["Red", "Green", "Blue"]},
+    "Number": {"min": 0, "max": 1000, "is_integer": True},
+}
+
+
+def time_best(func, repeat):
+    """Best wall-clock time of repeat calls to func, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def source_frame(rows, cardinality=None, seed=0):
+    """A single text column with the given number of distinct values."""
+    rng = np.random.default_rng(seed)
+    cardinality = min(cardinality or rows, rows)
+    codes = rng.integers(0, cardinality, size=rows)
+    return pd.DataFrame({"Value": np.char.add("v", codes.astype(str)).astype(object)})
+
+
+def plan_for(field_type, keep_mapping=True, blank_percent=0.0):
+    column = ColumnSpec(
+        "Value", field_type, blank_percent, dict(FIELD_OPTIONS.get(field_type, {}))
+    )
+    return compile_spec(MaskingSpec([column], keep_mapping))
+
+
+def mask_timer(df, plan):
+    def run():
+        mask_with_plan(df, plan, rng=0)
+
+    # Warm up so value pools are built (or loaded) before timing
+    mask_with_plan(df.head(10), plan, rng=0)
+    return run
+
+
+def result(suite, params, rows, seconds):
+    return {
+        "suite": suite,
+        "params": params,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_sec": round(rows / seconds) if seconds else 0,
+    }
+
+
+def bench_field_types(rows_list, repeat):
+    for rows in rows_list:
+        df = source_frame(rows)
+        for field_type in OPTION_KEYS:
+            for keep_mapping in (True, False):
+                plan = plan_for(field_type, keep_mapping)
+                seconds = time_best(mask_timer(df, plan), repeat)
+                yield result(
+                    "field_types",
+                    {"field_type": field_type, "keep_mapping": keep_mapping},
+                    rows,
+                    seconds,
+                )
+
+
+def bench_keep_mapping(rows_list, repeat):
+    for rows in rows_list:
+        # Few repeated values, where keeping mappings pays off most
+        df = source_frame(rows, cardinality=max(1, rows // 100))
+        for keep_mapping in (True, False):
+            plan = plan_for("Full Name", keep_mapping)
+            seconds = time_best(mask_timer(df, plan), repeat)
+            yield result("keep_mapping", {"keep_mapping": keep_mapping}, rows, seconds)
+
+
+def bench_cardinality(cardinalities, repeat):
+    for cardinality in cardinalities:
+        # At least ten rows per unique value, so mappings are reused
+        rows = max(cardinality, min(cardinality * 10, 10_000_000))
+        df = source_frame(rows, cardinality)
+        for field_type in ("UUID", "Number"):
+            plan = plan_for(field_type, keep_mapping=True)
+            seconds = time_best(mask_timer(df, plan), repeat)
+            yield result(
+                "cardinality",
+                {"field_type": field_type, "cardinality": cardinality},
+                rows,
+                seconds,
+            )
+
+
+def bench_blanks(rows_list, repeat):
+    for rows in rows_list:
+        df = source_frame(rows)
+        for blank_percent in BLANK_PERCENTS:
+            for field_type in ("Full Name", "Number", "Date"):
+                plan = plan_for(field_type, False, blank_percent)
+                seconds = time_best(mask_timer(df, plan), repeat)
+                yield result(
+                    "blanks",
+                    {"field_type": field_type, "blank_percent": blank_percent},
+                    rows,
+                    seconds,
+                )
+
+
+def bench_end_to_end(rows_list, repeat):
+    spec = MaskingSpec(
+        [
+            ColumnSpec("Name", "Full Name"),
+            ColumnSpec("Amount", "Number", options={"min": 0, "max": 100}),
+            ColumnSpec("Joined", "Date"),
+        ]
+    )
+    plan = compile_spec(spec)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in rows_list:
+            rng = np.random.default_rng(0)
+            df = pd.DataFrame(
+                {
+                    "Name": source_frame(rows, rows // 10 or 1)["Value"],
+                    "Amount": rng.uniform(0, 100, rows),
+                    "Joined": pd.Timestamp("2020-01-01")
+                    + pd.to_timedelta(rng.integers(0, 1000, rows), unit="D"),
+                    "Notes": source_frame(rows, 50, seed=1)["Value"],
+                }
+            )
+            for ext in WRITERS:
+                if ext == ".xlsx" and rows > 100_000:
+                    continue  # Excel is too slow to be useful at this size
+                input_path = os.path.join(temp_dir, f"input{ext}")
+                output_path = os.path.join(temp_dir, f"output{ext}")
+                write_dataframe(df, input_path)
+
+                def run():
+                    masked_df, _ = mask_with_plan(
+                        read_table(input_path), plan, rng=0, inplace=True
+                    )
+                    write_dataframe(masked_df, output_path)
+
+                seconds = time_best(run, repeat)
+                yield result("end_to_end", {"format": ext.lstrip(".")}, rows, seconds)
+
+
+def environment():
+    """Versions and machine details stored alongside the results."""
+    versions = {"python": platform.python_version()}
+    for package in ("numpy", "pandas", "Faker", "pyarrow", "XlsxWriter", "openpyxl"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def run_benchmarks(
+    suites=SUITES,
+    rows=DEFAULT_ROWS,
+    cardinalities=DEFAULT_CARDINALITIES,
+    repeat=3,
+    progress=None,
+):
+    """Run the selected suites and return the results document."""
+    runners = {
+        "field_types": lambda: bench_field_types(rows, repeat),
+        "keep_mapping": lambda: bench_keep_mapping(rows, repeat),
+        "cardinality": lambda: bench_cardinality(cardinalities, repeat),
+        "blanks": lambda: bench_blanks(rows, repeat),
+        "end_to_end": lambda: bench_end_to_end(rows, repeat),
+    }
+    results = []
+    for suite in suites:
+        for entry in runners[suite]():
+            results.append(entry)
+            if progress:
+                progress(entry)
+    return {"environment": environment(), "repeat": repeat, "results": results}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run", description="Benchmark masking throughput."
+    )
+    parser.add_argument(
+        "--suite", nargs="+", choices=SUITES, default=list(SUITES), help="Suites to run."
+    )
+    parser.add_argument("--rows", nargs="+", type=int, help="Row counts to benchmark.")
+    parser.add_argument(
+        "--cardinalities",
+        nargs="+",
+        type=int,
+        help="Unique value counts for the cardinality suite (up to 10,000,000).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark.")
+    parser.add_argument(
+        "--quick", action="store_true", help="Small sizes and one run, for smoke testing."
+    )
+    parser.add_argument("-o", "--output", help="Write the JSON results to this file.")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    rows = args.rows or (QUICK_ROWS if args.quick else DEFAULT_ROWS)
+    cardinalities = args.cardinalities or (
+        QUICK_CARDINALITIES if args.quick else DEFAULT_CARDINALITIES
+    )
+    repeat = 1 if args.quick else args.repeat
+
+    def progress(entry):
+        params = ", ".join(f"{k}={v}" for k, v in entry["params"].items())
+        print(
+            f"{entry['suite']:<13} {params:<50} {entry['rows']:>10} rows "
+            f"{entry['rows_per_sec']:>12,} rows/s",
+            file=sys.stderr,
+        )
+
+    document = run_benchmarks(args.suite, rows, cardinalities, repeat, progress)
+    text = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Value pools built by the tests go to a temporary folder rather than the
+# user's pool cache. Set before the app is imported, as the registries read
+# the folder at import time, and inherited by worker processes.
+POOL_DIR = tempfile.mkdtemp(prefix="data_masking_pools_")
+os.environ["DATA_MASKING_POOL_DIR"] = POOL_DIR
+atexit.register(shutil.rmtree, POOL_DIR, ignore_errors=True)
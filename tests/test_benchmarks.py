@@ -0,0 +1,27 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.run import SUITES, main, run_benchmarks
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_every_suite_runs_and_reports_throughput(self):
+        document = run_benchmarks(rows=(50,), cardinalities=(10,), repeat=1)
+        self.assertIn('pandas', document['environment']['versions'])
+        suites = {entry['suite'] for entry in document['results']}
+        self.assertEqual(suites, set(SUITES))
+        for entry in document['results']:
+            self.assertGreater(entry['rows_per_sec'], 0, entry)
+
+    def test_main_writes_json(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'results.json')
+            main(['--quick', '--suite', 'blanks', '--rows', '20', '--output', path])
+            with open(path) as f:
+                results = json.load(f)['results']
+        self.assertEqual(len(results), 9)
+        self.assertEqual({entry['rows'] for entry in results}, {20})
+
+if __name__ == '__main__':
+    unittest.main()
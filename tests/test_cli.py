@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import pandas as pd
+from app.cli import expand_inputs, main, output_path_for
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spec_file = os.path.join(self.temp_dir.name, 'spec.json')
+        with open(self.spec_file, 'w') as f:
+            json.dump({
+                'keep_mapping': True,
+                'columns': {
+                    'Name': {'field_type': 'Full Name', 'blank_percent': 0.0},
+                    'Age': {'field_type': 'Number', 'min': 20, 'max': 60, 'is_integer': True}
+                }
+            }, f)
+        self.df = pd.DataFrame({
+            'Name': ['Alice', 'Bob', 'Alice'],
+            'Age': [25, 30, 35],
+            'City': ['Lisbon', 'Porto', 'Faro'],
+        })
+        for name in ('a.csv', 'b.csv'):
+            self.df.to_csv(os.path.join(self.temp_dir.name, name), index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_expand_inputs_and_output_paths(self):
+        inputs = expand_inputs([os.path.join(self.temp_dir.name, '*.csv')])
+        self.assertEqual([os.path.basename(p) for p in inputs], ['a.csv', 'b.csv'])
+        self.assertEqual(output_path_for('in/data.xls', None), os.path.join('in', 'data_masked.xlsx'))
+        self.assertEqual(output_path_for('in/data.csv', 'out.xlsx'), 'out.xlsx')
+        self.assertEqual(output_path_for('in/data.csv', 'out', '.xlsx', many=True), os.path.join('out', 'data_masked.xlsx'))
+
+    def test_main_masks_glob_in_parallel(self):
+        output_dir = os.path.join(self.temp_dir.name, 'masked')
+        status = main([
+            os.path.join(self.temp_dir.name, '*.csv'),
+            '--spec', self.spec_file, '--output', output_dir, '--workers', '2'
+        ])
+        self.assertEqual(status, 0)
+        for name in ('a_masked.csv', 'b_masked.csv'):
+            masked = pd.read_csv(os.path.join(output_dir, name))
+            self.assertEqual(list(masked['City']), ['Lisbon', 'Porto', 'Faro'])
+            self.assertTrue(masked['Age'].between(20, 60).all())
+            self.assertEqual(masked['Name'][0], masked['Name'][2])
+
+    def test_main_writes_metrics(self):
+        input_path = os.path.join(self.temp_dir.name, 'a.csv')
+        output_path = os.path.join(self.temp_dir.name, 'out.parquet')
+        status = main([input_path, '--spec', self.spec_file, '--output', output_path, '--metrics'])
+        self.assertEqual(status, 0)
+        with open(output_path + '.metrics.json') as f:
+            metrics = json.load(f)
+        self.assertTrue(set(metrics['stages']) >= {'read', 'mask', 'mask.column', 'write'})
+        self.assertEqual(metrics['counters']['rows'], 3)
+
+    def test_main_rejects_invalid_spec(self):
+        with open(self.spec_file, 'w') as f:
+            json.dump({'columns': {'Name': {'field_type': 'Unknown'}}}, f)
+        status = main([os.path.join(self.temp_dir.name, 'a.csv'), '--spec', self.spec_file])
+        self.assertEqual(status, 2)
+
+    def test_cli_does_not_import_tkinter(self):
+        code = "import sys, app.cli; print('tkinter' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
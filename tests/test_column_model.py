@@ -0,0 +1,83 @@
+import time
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.spec import spec_from_settings
+from app.services.detect import Detection
+from app.ui.column_model import ColumnSettingsModel
+
+class TestColumnSettingsModel(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'customer_name': ['a'],
+            'customer_email': ['b'],
+            'order_total': [1.5],
+            'order_count': [2],
+            'created_at': pd.to_datetime(['2020-01-01']),
+            'active': [True],
+        })
+        self.model = ColumnSettingsModel.from_dataframe(self.df)
+
+    def test_inferred_types(self):
+        types = {column.name: column.inferred_type for column in self.model}
+        self.assertEqual(types['customer_name'], 'Text')
+        self.assertEqual(types['order_total'], 'Number')
+        self.assertEqual(types['created_at'], 'Date')
+        self.assertEqual(types['active'], 'Boolean')
+        self.assertEqual(self.model.inferred_types, ['Boolean', 'Date', 'Number', 'Text'])
+
+    def test_search_and_bulk_select(self):
+        self.assertEqual([c.name for c in self.model.filter('ORDER')], ['order_total', 'order_count'])
+        self.assertEqual([c.name for c in self.model.filter('*_at')], ['created_at'])
+        self.assertEqual(len(self.model.filter('')), 6)
+
+        self.model.set_selected(self.model.matching('customer_*'))
+        self.model.set_selected(self.model.matching(inferred_type='Number'))
+        self.model.set_selected(self.model.matching('order_c*'), selected=False)
+        selected = [c.name for c in self.model if c.selected]
+        self.assertEqual(selected, ['customer_name', 'customer_email', 'order_total'])
+        self.assertEqual([c.name for c in self.model.matching(r'^cust.*mail$', regex=True)], ['customer_email'])
+        with self.assertRaises(ValueError):
+            self.model.matching('(', regex=True)
+
+    def test_update_and_build_spec(self):
+        self.model.set_selected(self.model.matching('customer_email'))
+        self.model.update('customer_email', field_type='Email', blank_percent='0.25')
+        with self.assertRaises(ValueError):
+            self.model.update('customer_email', blank_percent='2')
+        with self.assertRaises(ValueError):
+            self.model.update('customer_email', field_type='Unknown')
+
+        spec = spec_from_settings(self.model.selected_columns(), {})
+        self.assertEqual(len(spec.columns), 1)
+        self.assertEqual(spec.columns[0].field_type, 'Email')
+        self.assertEqual(spec.columns[0].blank_percent, 0.25)
+
+    def test_apply_detections(self):
+        detections = {
+            'customer_email': Detection('customer_email', 'Email', 0.95),
+            'customer_name': Detection('customer_name', 'Full Name', 0.55),
+            'missing': Detection('missing', 'Phone', 1.0),
+        }
+        self.assertEqual(self.model.apply_detections(detections), 1)
+        self.assertTrue(self.model['customer_email'].selected)
+        self.assertEqual(self.model['customer_email'].field_type, 'Email')
+        self.assertFalse(self.model['customer_name'].selected)
+        self.assertEqual(self.model['customer_name'].confidence, 0.55)
+
+    def test_sample_values(self):
+        df = pd.DataFrame({'city': ['Oslo', None, 'Oslo', 'Rome', 'Bern', 'Lima']})
+        model = ColumnSettingsModel.from_dataframe(df)
+        self.assertEqual(model['city'].sample, 'Oslo, Rome, Bern')
+
+    def test_wide_files_are_cheap(self):
+        wide = pd.DataFrame(np.zeros((1, 20_000)), columns=[f'col_{i}' for i in range(20_000)])
+        start = time.perf_counter()
+        model = ColumnSettingsModel.from_dataframe(wide)
+        model.set_selected(model.matching('col_1*'))
+        self.assertEqual(len(model), 20_000)
+        self.assertLess(time.perf_counter() - start, 2)
+
+if __name__ == '__main__':
+    unittest.main()
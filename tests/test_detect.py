@@ -0,0 +1,84 @@
+import time
+import unittest
+import uuid
+import numpy as np
+import pandas as pd
+from faker import Faker
+from app.services.detect import detect_column, detect_pii
+from app.ui.column_model import ColumnSettingsModel
+
+class TestDetectPii(unittest.TestCase):
+
+    def setUp(self):
+        fake = Faker()
+        Faker.seed(0)
+        rows = 300
+        self.df = pd.DataFrame({
+            'email': [fake.email() for _ in range(rows)],
+            'contact': [fake.free_email() for _ in range(rows)],
+            'phone': [fake.phone_number() for _ in range(rows)],
+            'id': [str(uuid.uuid4()) for _ in range(rows)],
+            'signup': [fake.date() for _ in range(rows)],
+            'joined': pd.date_range('2020-01-01', periods=rows),
+            'zip': [fake.zipcode() for _ in range(rows)],
+            'customer_name': [fake.name() for _ in range(rows)],
+            'first_name': [fake.first_name() for _ in range(rows)],
+            'amount': np.random.default_rng(0).random(rows),
+            'quantity': np.arange(rows),
+            'status': ['Active', 'Closed'] * (rows // 2),
+        })
+
+    def test_detects_field_types(self):
+        detections = detect_pii(self.df)
+        expected = {
+            'email': 'Email',
+            'contact': 'Email',
+            'phone': 'Phone',
+            'id': 'UUID',
+            'signup': 'Date',
+            'joined': 'Date',
+            'zip': 'Zip Code',
+            'customer_name': 'Full Name',
+            'first_name': 'Name',
+        }
+        self.assertEqual({name: d.field_type for name, d in detections.items()}, expected)
+        for detection in detections.values():
+            self.assertGreaterEqual(detection.confidence, 0.8)
+
+    def test_weak_patterns_need_a_column_name_hint(self):
+        codes = self.df['zip'].rename('code')
+        self.assertLess(detect_column(codes).confidence, 0.8)
+        # Two capitalized words repeated over and over are not names
+        self.assertLess(detect_column(self.df['status']).confidence, 0.5)
+        self.assertIsNone(detect_column(self.df['amount']))
+
+    def test_integer_ids_are_not_phone_numbers(self):
+        df = pd.DataFrame({
+            'order_id': np.arange(1_000_000, 1_000_200),
+            'amount_cents': np.arange(2_500_000, 2_500_200),
+            'phone': np.arange(5_551_000_000, 5_551_000_200),
+        })
+        detections = detect_pii(df)
+        self.assertEqual(list(detections), ['phone'])
+        model = ColumnSettingsModel.from_dataframe(df)
+        model.apply_detections(detections)
+        self.assertFalse(model['order_id'].selected)
+        self.assertFalse(model['amount_cents'].selected)
+
+    def test_blanks_and_mixed_values(self):
+        emails = self.df['email'].copy()
+        emails[::4] = None
+        self.assertEqual(detect_column(emails).confidence, 1.0)
+        emails[1::4] = 'n/a'
+        self.assertLess(detect_column(emails).confidence, 0.8)
+        self.assertIsNone(detect_column(pd.Series([None, None], name='email', dtype=object)))
+
+    def test_time_does_not_depend_on_rows(self):
+        big = pd.concat([self.df] * 1000, ignore_index=True)
+        start = time.perf_counter()
+        detections = detect_pii(big, sample_size=200)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(detections['email'].field_type, 'Email')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+import uuid
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from app.services.generators import (
+    CustomListGenerator,
+    DateGenerator,
+    FormatPreservingGenerator,
+    NumberGenerator,
+    RowNumberGenerator,
+    UuidGenerator,
+    apply_blanks,
+    blank_mask,
+    generate_column,
+    get_rng,
+    inject_blanks,
+    make_generator,
+)
+from app.config.settings import FIELD_TYPES
+
+class TestGenerators(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = get_rng(42)
+
+    def test_every_field_type_generates_full_column(self):
+        for field_type in FIELD_TYPES:
+            values = make_generator(field_type).generate(25, self.rng)
+            self.assertEqual(len(values), 25, field_type)
+
+    def test_number_generator_integer_range(self):
+        values = NumberGenerator(20, 60, True).generate(1000, self.rng)
+        self.assertTrue(((values >= 20) & (values <= 60)).all())
+        self.assertEqual(values.dtype.kind, 'i')
+
+    def test_number_generator_float(self):
+        values = NumberGenerator(1.5, 2.5, False).generate(1000, self.rng)
+        self.assertTrue(((values >= 1.5) & (values <= 2.5)).all())
+        np.testing.assert_array_equal(values, np.round(values, 2))
+
+    def test_date_generator_range(self):
+        values = DateGenerator('2020-01-01', '2020-01-31').generate(1000, self.rng)
+        self.assertEqual(values.dtype, np.dtype('datetime64[ns]'))
+        self.assertTrue((values >= np.datetime64('2020-01-01')).all())
+        self.assertTrue((values <= np.datetime64('2020-01-31')).all())
+
+    def test_date_generator_weekdays_and_times(self):
+        values = DateGenerator('2024-01-01', '2024-01-31', 'weekdays', include_time=True).generate(1000, self.rng)
+        dates = pd.DatetimeIndex(values)
+        self.assertTrue((dates.dayofweek < 5).all())
+        self.assertGreater(dates.hour.nunique(), 20)
+        self.assertTrue((dates < pd.Timestamp('2024-02-01')).all())
+        with self.assertRaises(ValueError):
+            DateGenerator('2024-01-06', '2024-01-07', 'weekdays')
+
+    def test_date_generator_jitter(self):
+        originals = pd.Series(pd.date_range('2021-01-01', periods=500, freq='D'))
+        originals[3] = pd.NaT
+        generator = make_generator('Date', {'jitter_days': 7})
+        self.assertTrue(generator.uses_source)
+        values = generate_column(generator, len(originals), 0.0, self.rng, source=originals)
+        self.assertEqual(values.dtype, np.dtype('datetime64[ns]'))
+        shift = pd.Series(values) - originals
+        self.assertLessEqual(shift.abs().max(), pd.Timedelta(days=7))
+        self.assertGreater(shift.nunique(), 10)
+        self.assertTrue(np.isnat(values[3]))
+
+    def test_format_preserving_generator(self):
+        originals = pd.Series(['AB-1234-xy', 'Zz 9', '', None, 'é.42'])
+        values = make_generator('Format Preserving').generate_from(originals, self.rng)
+        for original, value in zip(originals[:3], values[:3]):
+            self.assertEqual(len(value), len(original))
+            for a, b in zip(original, value):
+                self.assertEqual((a.isdigit(), a.isupper(), a.islower()), (b.isdigit(), b.isupper(), b.islower()))
+                if not a.isalnum():
+                    self.assertEqual(a, b)
+        self.assertIsNone(values[3])
+        self.assertTrue(values[4].startswith('é.'))
+        self.assertNotEqual(list(values[:2]), list(originals[:2]))
+
+    def test_format_preserving_luhn(self):
+        def luhn_valid(text):
+            digits = [int(c) for c in text if c.isdigit()][::-1]
+            total = sum(d if i % 2 == 0 else (2 * d - 9 if d > 4 else 2 * d) for i, d in enumerate(digits))
+            return total % 10 == 0
+
+        originals = pd.Series(['4111-1111-1111-1111'] * 200 + ['79927398713', '5'])
+        values = FormatPreservingGenerator('luhn').generate_from(originals, self.rng)
+        self.assertTrue(all(luhn_valid(value) for value in values))
+        self.assertTrue(all(value[4] == '-' for value in values[:200]))
+        self.assertGreater(len(set(values)), 190)
+
+    def test_custom_list_generator(self):
+        values = CustomListGenerator(['a', 'b', 'c']).generate(500, self.rng)
+        self.assertEqual(set(values), {'a', 'b', 'c'})
+        with self.assertRaises(ValueError):
+            CustomListGenerator([])
+
+    def test_uuid_generator(self):
+        values = UuidGenerator(prefix='ID-', suffix='-X').generate(100, self.rng)
+        for value in values:
+            self.assertTrue(value.startswith('ID-') and value.endswith('-X'))
+            parsed = uuid.UUID(value[3:-2])
+            self.assertEqual(parsed.version, 4)
+        self.assertEqual(len(set(values)), 100)
+
+    def test_alphanumeric_code_generator(self):
+        values = UuidGenerator(uuid_type='Alphanumeric Code', char_length=12).generate(50, self.rng)
+        for value in values:
+            self.assertEqual(len(value), 12)
+            self.assertTrue(value.isalpha())
+
+    def test_unsupported_field_type(self):
+        with self.assertRaises(ValueError):
+            make_generator('Unknown')
+
+    def test_row_number_generator(self):
+        generator = make_generator('Row Number')
+        self.assertEqual(list(generator.generate(3, self.rng)), ['ROW-0001', 'ROW-0002', 'ROW-0003'])
+        generator = RowNumberGenerator(prefix='ID-', suffix='-X', start=98, pad_width=2)
+        self.assertEqual(list(generator.generate_rows(0, 4)), ['ID-98-X', 'ID-99-X', 'ID-100-X', 'ID-101-X'])
+        # Rows generated in pieces match rows generated at once
+        whole = RowNumberGenerator(pad_width=0).generate_rows(0, 25)
+        pieces = np.concatenate([RowNumberGenerator(pad_width=0).generate_rows(start, 5) for start in range(0, 25, 5)])
+        self.assertEqual(list(whole), list(pieces))
+        self.assertEqual(len(generator.generate_rows(0, 0)), 0)
+
+    def test_apply_blanks_by_dtype(self):
+        mask = np.array([True, False])
+        self.assertTrue(np.isnan(apply_blanks(np.array([1, 2]), mask)[0]))
+        self.assertTrue(np.isnat(apply_blanks(np.array(['2020-01-01', '2020-01-02'], dtype='datetime64[ns]'), mask)[0]))
+        self.assertIsNone(apply_blanks(np.array(['a', 'b'], dtype=object), mask)[0])
+
+    def test_generate_column_blank_percent(self):
+        values = generate_column(make_generator('Name'), 2000, 0.5, self.rng)
+        blanks = pd.isnull(values).sum()
+        self.assertTrue(800 < blanks < 1200)
+        self.assertFalse(blank_mask(10, 0.0, self.rng).any())
+        self.assertEqual(blank_mask(1001, 0.25, self.rng, exact=True).sum(), 250)
+
+    def test_inject_blanks(self):
+        source = pd.Series(['a', None, 'b', 'a', None, 'c', 'a', 'd', 'e', 'f'])
+        values = np.arange(10, dtype=object)
+        rows = SimpleNamespace(blank_percent=0.3, blank_mode='rows', keep_nulls=True)
+        masked = inject_blanks(values, source, rows, self.rng)
+        # The two original blanks count towards the three rows to blank
+        self.assertEqual(pd.isnull(masked).sum(), 3)
+        self.assertTrue(pd.isnull(masked[[1, 4]]).all())
+
+        by_value = SimpleNamespace(blank_percent=0.5, blank_mode='values', keep_nulls=False)
+        blanked = set(source[pd.isnull(inject_blanks(values, source, by_value, self.rng))])
+        self.assertEqual(len(blanked), 3)
+        self.assertNotIn(None, blanked)
+        self.assertTrue(pd.isnull(inject_blanks(values, source, by_value, self.rng, mapped=True)).sum() == 0)
+
+        untouched = SimpleNamespace(blank_percent=0.5, blank_mode='random', keep_nulls=False)
+        self.assertIs(inject_blanks(values, source, untouched, self.rng), values)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import tracemalloc
+import unittest
+import numpy as np
+import pandas as pd
+from app.services import instrumentation
+from app.services.instrumentation import count, recording, span
+from app.services.mask import mask_with_plan
+from app.services.spec import ColumnSpec, MaskingSpec, compile_spec
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Name': ['Alice', 'Bob', 'Alice', 'Dan'],
+            'Code': ['a', 'b', 'c', 'd'],
+        })
+        self.plan = compile_spec(MaskingSpec([
+            ColumnSpec('Name', 'Full Name'),
+            ColumnSpec('Code', 'UUID'),
+        ]))
+
+    def test_records_stages_columns_and_counters(self):
+        with recording(track_memory=True) as recorder:
+            mask_with_plan(self.df, self.plan, rng=0)
+        report = recorder.report()
+
+        self.assertEqual([s.name for s in report.spans], ['mask', 'mask.column', 'mask.column'])
+        self.assertEqual([s.attrs.get('column') for s in report.spans[1:]], ['Name', 'Code'])
+        self.assertEqual(report.spans[1].depth, 1)
+        self.assertTrue(all(s.peak_memory is not None for s in report.spans))
+        self.assertEqual(report.counters['rows'], 4)
+        self.assertEqual(report.counters['unique_values'], 7)
+        self.assertEqual(report.counters['generator_calls'], 2)
+
+        data = json.loads(report.to_json())
+        self.assertEqual(data['stages']['mask.column']['count'], 2)
+        self.assertTrue(any(line.startswith('mask:') for line in report.summary()))
+
+    def test_peak_memory_of_nested_spans(self):
+        with recording(track_memory=True) as recorder:
+            with span('outer'):
+                with span('inner'):
+                    block = np.ones(2**20)  # 8 MiB
+                    del block
+        inner, outer = recorder.report().spans[1], recorder.report().spans[0]
+        self.assertEqual((outer.name, inner.name), ('outer', 'inner'))
+        self.assertGreaterEqual(inner.peak_memory, 8 * 2**20)
+        self.assertGreaterEqual(outer.peak_memory, inner.peak_memory)
+
+    def test_hooks_receive_events(self):
+        events, global_events = [], []
+        instrumentation.add_hook(global_events.append)
+        try:
+            # Memory is only tracked when asked for, as tracemalloc is slow
+            with recording(hooks=[events.append]):
+                self.assertFalse(tracemalloc.is_tracing())
+                with span('stage', column='A'):
+                    count('rows', 3)
+        finally:
+            instrumentation.remove_hook(global_events.append)
+        self.assertEqual(events, global_events)
+        self.assertEqual([e['type'] for e in events], ['counter', 'span'])
+        self.assertEqual(events[1]['attrs'], {'column': 'A'})
+        self.assertIsNone(events[1]['peak_memory'])
+
+    def test_no_op_without_recorder(self):
+        with span('stage') as record:
+            count('rows')
+        self.assertIsNone(record)
+        self.assertIsNone(instrumentation.active_recorder())
+
+if __name__ == '__main__':
+    unittest.main()
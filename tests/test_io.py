@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+from app.services.io import excel_sheet_names, iter_arrow_batches, iter_excel_chunks, read_arrow_table, read_table
+from app.services.mask import mask_arrow_table
+from app.services.spec import ColumnSpec, MaskingSpec, compile_spec
+from app.services.streaming import mask_arrow_in_batches, mask_workbook
+
+class TestColumnarInput(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({
+            'Name': ['Alice', 'Bob', 'Alice', 'Dan'],
+            'Age': [25, 30, 35, 40],
+            'City': ['Paris', 'Rome', 'Oslo', 'Bern'],
+            'Notes': ['a', 'b', 'c', 'd'],
+        })
+        self.spec = MaskingSpec(
+            [ColumnSpec('Name', 'Custom List', options={'values': ['X', 'Y']})],
+            passthrough=['Age'],
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_read_table_projects_columns(self):
+        for name in ('in.csv', 'in.parquet', 'in.feather', 'in.arrow', 'in.xlsx'):
+            path = self.path(name)
+            if name.endswith('.csv'):
+                self.df.to_csv(path, index=False)
+            elif name.endswith('.xlsx'):
+                self.df.to_excel(path, index=False)
+            elif name.endswith('.parquet'):
+                self.df.to_parquet(path)
+            else:
+                self.df.to_feather(path)
+            result = read_table(path, columns=['Age', 'Name'])
+            # Columns keep the file order
+            self.assertEqual(list(result.columns), ['Name', 'Age'], name)
+            self.assertEqual(list(read_table(path).columns), list(self.df.columns), name)
+
+    def test_read_csv_with_progress(self):
+        self.df.to_csv(self.path('in.csv'), index=False)
+        updates = []
+        result = read_table(self.path('in.csv'), progress=lambda *u: updates.append(u))
+        pd.testing.assert_frame_equal(result, pd.read_csv(self.path('in.csv')))
+        self.assertEqual(updates, [('read', 4)])
+
+    def test_mask_arrow_table_keeps_passthrough_buffers(self):
+        self.df.to_parquet(self.path('in.parquet'))
+        plan = compile_spec(self.spec)
+        self.assertEqual(plan.input_columns, ['Name', 'Age'])
+        table = read_arrow_table(self.path('in.parquet'), plan.input_columns)
+        self.assertEqual(table.column_names, ['Name', 'Age'])
+
+        masked, log = mask_arrow_table(table, plan, rng=0)
+        self.assertIsInstance(masked, pa.Table)
+        # The passthrough column is the very same Arrow data, not a copy
+        self.assertEqual(
+            masked.column('Age').chunk(0).buffers()[1].address,
+            table.column('Age').chunk(0).buffers()[1].address,
+        )
+        names = masked.column('Name').to_pylist()
+        self.assertTrue(set(names) <= {'X', 'Y'})
+        self.assertEqual(names[0], names[2])
+        self.assertIn("Column 'Age' was not selected for masking.", log)
+
+    def test_mask_arrow_in_batches(self):
+        self.df.to_feather(self.path('in.feather'))
+        self.assertEqual(
+            [len(batch) for batch in iter_arrow_batches(self.path('in.feather'), batch_size=3)],
+            [3, 1],
+        )
+        plan = compile_spec(self.spec)
+        for output in ('out.parquet', 'out.csv'):
+            rows, log = mask_arrow_in_batches(
+                self.path('in.feather'), self.path(output), plan, chunksize=3, rng=0
+            )
+            self.assertEqual(rows, 4)
+            result = read_table(self.path(output))
+            self.assertEqual(list(result.columns), ['Name', 'Age'], output)
+            self.assertEqual(list(result['Age']), [25, 30, 35, 40], output)
+            self.assertEqual(result['Name'][0], result['Name'][2], output)
+
+class TestExcelInput(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name, 'book.xlsx')
+        with pd.ExcelWriter(self.input_file) as writer:
+            pd.DataFrame({
+                'Id': ['a', 'b', 'a', 'c', 'b'],
+                'Joined': pd.date_range('2020-01-01', periods=5),
+                'Notes': ['x', None, 'y', 'z', 'w'],
+            }).to_excel(writer, sheet_name='Customers', index=False)
+            pd.DataFrame({'Id': ['b', 'a', 'd'], 'Total': [1.5, 2.5, 3.5]}).to_excel(writer, sheet_name='Orders', index=False)
+            pd.DataFrame({'Code': []}).to_excel(writer, sheet_name='Empty', index=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sheet_names_and_chunks(self):
+        self.assertEqual(excel_sheet_names(self.input_file), ['Customers', 'Orders', 'Empty'])
+        chunks = list(iter_excel_chunks(self.input_file, 'Customers', chunksize=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(chunks[0]['Joined'].dtype.kind, 'M')
+        self.assertTrue(pd.isna(chunks[0]['Notes'][1]))
+        chunks = list(iter_excel_chunks(self.input_file, columns=['Notes']))
+        self.assertEqual(list(chunks[0].columns), ['Notes'])
+        empty = list(iter_excel_chunks(self.input_file, 'Empty'))
+        self.assertEqual([list(chunk.columns) for chunk in empty], [['Code']])
+
+    def test_mask_workbook(self):
+        spec = MaskingSpec.from_dict({
+            'columns': {'Id': {'field_type': 'UUID'}, 'Notes': {'field_type': 'Name'}},
+            'sheets': {'Empty': {'columns': {'Code': {'field_type': 'Row Number'}}}},
+        })
+        output_file = os.path.join(self.temp_dir.name, 'masked.xlsx')
+        rows, log = mask_workbook(self.input_file, output_file, compile_spec(spec), chunksize=2, rng=0)
+        self.assertEqual(rows, 8)
+        sheets = pd.read_excel(output_file, sheet_name=None)
+        self.assertEqual(list(sheets), ['Customers', 'Orders', 'Empty'])
+        customers, orders = sheets['Customers'], sheets['Orders']
+        # Mappings are shared by the sheets and the chunks of each sheet
+        self.assertEqual(customers['Id'][0], customers['Id'][2])
+        self.assertEqual(orders['Id'][0], customers['Id'][1])
+        self.assertEqual(orders['Id'][1], customers['Id'][0])
+        self.assertNotIn(orders['Id'][2], set(customers['Id']))
+        self.assertEqual(list(orders['Total']), [1.5, 2.5, 3.5])
+        self.assertIn("Sheet 'Orders': Column 'Total' was not selected for masking.", log)
+
+        csv_file = os.path.join(self.temp_dir.name, 'masked.csv')
+        rows, _ = mask_workbook(self.input_file, csv_file, compile_spec(spec))
+        self.assertEqual(rows, 5)
+
+        strict = MaskingSpec.from_dict({'sheets': {'Orders': {'columns': {'Notes': {'field_type': 'Name'}}}}})
+        with self.assertRaises(ValueError):
+            mask_workbook(self.input_file, output_file, compile_spec(strict))
+
+if __name__ == '__main__':
+    unittest.main()
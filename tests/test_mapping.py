@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.generators import get_rng
+from app.services.mapping import ColumnMapping
+from app.services.spec import ColumnSpec, MaskingSpec, compile_spec
+
+class TestColumnMapping(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = get_rng(3)
+
+    def compile_column(self, field_type, blank_percent=0.0, **options):
+        spec = MaskingSpec([ColumnSpec('col', field_type, blank_percent, options)])
+        return compile_spec(spec).columns[0]
+
+    def test_same_original_gets_same_fake_value(self):
+        column = self.compile_column('Number', min=0, max=10**9, is_integer=True)
+        series = pd.Series(['a', 'b', 'a', 'c', 'b', 'a'])
+        masked = ColumnMapping().apply(series, column, self.rng)
+        self.assertEqual(len(masked), 6)
+        self.assertEqual(len({masked[0], masked[2], masked[5]}), 1)
+        self.assertEqual(masked[1], masked[4])
+        self.assertEqual(len(set(masked)), 3)
+
+    def test_nan_maps_to_a_single_value(self):
+        column = self.compile_column('Name')
+        series = pd.Series([1.0, np.nan, 2.0, np.nan])
+        masked = ColumnMapping().apply(series, column, self.rng)
+        self.assertEqual(masked[1], masked[3])
+        self.assertIsNotNone(masked[1])
+
+    def test_mapping_extends_across_calls(self):
+        column = self.compile_column('UUID')
+        mapping = ColumnMapping()
+        first = mapping.apply(pd.Series(['x', 'y']), column, self.rng)
+        second = mapping.apply(pd.Series(['z', 'y', 'x']), column, self.rng)
+        self.assertEqual(len(mapping), 3)
+        self.assertEqual(second[1], first[1])
+        self.assertEqual(second[2], first[0])
+
+    def test_blanks_and_numbers_match_across_chunks(self):
+        column = self.compile_column('UUID')
+        mapping = ColumnMapping()
+        first = mapping.apply(pd.Series([1.0, np.nan]), column, self.rng)
+        second = mapping.apply(pd.Series([None, 2.0, 1.0]), column, self.rng)
+        self.assertEqual(len(mapping), 3)
+        self.assertEqual(second[0], first[1])
+        self.assertEqual(second[2], first[0])
+
+    def test_custom_list_cycles_through_values(self):
+        column = self.compile_column('Custom List', values=['A', 'B'])
+        mapping = ColumnMapping()
+        masked = mapping.apply(pd.Series(['p', 'q', 'r']), column, self.rng)
+        self.assertEqual(list(masked), ['A', 'B', 'A'])
+        masked = mapping.apply(pd.Series(['s']), column, self.rng)
+        self.assertEqual(list(masked), ['B'])
+
+    def test_unique_values_across_chunks(self):
+        column = self.compile_column('Name', unique=True, prefix='N-')
+        mapping = ColumnMapping()
+        originals = pd.Series([f'person {i}' for i in range(200)])
+        for start in range(0, 200, 50):
+            mapping.apply(originals[start:start + 50], column, self.rng)
+        self.assertEqual(len(mapping), 200)
+        self.assertEqual(len(set(mapping.values)), 200)
+        self.assertTrue(all(value.startswith('N-') for value in mapping.values))
+
+    def test_value_level_blanks(self):
+        column = self.compile_column('Name', blank_percent=1.0)
+        masked = ColumnMapping().apply(pd.Series(['a', 'b', 'a']), column, self.rng)
+        self.assertTrue(pd.isnull(masked).all())
+
+    def test_empty_series(self):
+        column = self.compile_column('Date')
+        masked = ColumnMapping().apply(pd.Series([], dtype=object), column, self.rng)
+        self.assertEqual(len(masked), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
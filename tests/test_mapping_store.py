@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.mapping_store import MappingStore, from_stored, to_stored
+from app.services.mask import mask_with_plan
+from app.services.spec import MaskingSpec, compile_spec
+
+class TestMappingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'mappings.sqlite')
+        self.plan = compile_spec(MaskingSpec.from_dict({
+            'columns': {
+                'customer_id': {'field_type': 'UUID', 'namespace': 'customer_id'},
+                'signup': {'field_type': 'Date', 'namespace': 'signup'},
+            }
+        }))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_or_create_reuses_stored_values(self):
+        calls = []
+
+        def generate(n):
+            calls.append(n)
+            return [f'fake-{len(calls)}-{i}' for i in range(n)]
+
+        with MappingStore(self.path) as store:
+            first = store.get_or_create('ns', ['a', 'b'], generate)
+            second = store.get_or_create('ns', ['b', 'c'], generate)
+            self.assertEqual(second[0], first[1])
+            self.assertEqual(calls, [2, 1])
+            self.assertEqual(store.count('ns'), 3)
+            self.assertEqual(store.count('other'), 0)
+
+    def test_lru_cache_and_persistence(self):
+        with MappingStore(self.path, cache_size=1) as store:
+            values = store.get_or_create('ns', ['a', 'b'], lambda n: list(range(n)))
+            store.get_or_create('ns', ['b'], lambda n: [])
+            self.assertEqual(store.hits, 1)
+            # 'a' was evicted from the cache and is read from the database
+            store.get_or_create('ns', ['a'], lambda n: [])
+            self.assertEqual(store.misses, 3)
+
+        with MappingStore(self.path) as store:
+            self.assertEqual(store.get_or_create('ns', ['a', 'b'], lambda n: []), values)
+
+    def test_stored_value_conversion(self):
+        dates = np.array(['2020-01-02', 'NaT'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(from_stored(to_stored(dates), 'M'), dates)
+        self.assertEqual(from_stored(to_stored(np.array([1, 2])), 'i').dtype, np.int64)
+        self.assertTrue(np.isnan(from_stored(to_stored(np.array([1.5, np.nan])), 'f')[1]))
+
+    def test_mappings_are_shared_between_files(self):
+        customers = pd.DataFrame({
+            'customer_id': [1, 2, 3],
+            'signup': pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01']),
+        })
+        orders = pd.DataFrame({'customer_id': [3, 3, 1, 4]})
+        order_plan = compile_spec(MaskingSpec.from_dict({
+            'columns': {'customer_id': {'field_type': 'UUID', 'namespace': 'customer_id'}}
+        }))
+
+        with MappingStore(self.path) as store:
+            masked_customers, _ = mask_with_plan(customers, self.plan, mapping_store=store)
+        # A later run with a new connection sees the same mappings
+        with MappingStore(self.path) as store:
+            masked_orders, _ = mask_with_plan(orders, order_plan, mapping_store=store)
+
+        self.assertEqual(masked_orders['customer_id'][0], masked_customers['customer_id'][2])
+        self.assertEqual(masked_orders['customer_id'][2], masked_customers['customer_id'][0])
+        self.assertNotIn(masked_orders['customer_id'][3], set(masked_customers['customer_id']))
+        self.assertEqual(masked_customers['signup'].dtype.kind, 'M')
+
+
+if __name__ == '__main__':
+    unittest.main()
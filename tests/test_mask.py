@@ -118,6 +118,65 @@ class TestMask(unittest.TestCase):
         num_blanks = masked_df['Name'].isnull().sum()
         self.assertTrue(1 <= num_blanks <= 3)
 
+    def test_exact_blank_modes(self):
+        from app.services.mask import mask_with_plan
+        from app.services.spec import ColumnSpec, MaskingSpec, compile_spec
+        df = pd.DataFrame({'Name': ['a', 'b', None, 'a', 'c', None, 'a', 'b', 'd', 'e'] * 10})
+        for keep_mapping in (True, False):
+            rows = compile_spec(MaskingSpec([ColumnSpec('Name', 'Name', 0.3, blank_mode='rows')], keep_mapping))
+            masked_df, _ = mask_with_plan(df, rows, rng=1)
+            self.assertEqual(masked_df['Name'].isnull().sum(), 30)
+
+            # Keeping the original blanks: the 20 blank rows count towards the 30
+            kept = compile_spec(MaskingSpec(
+                [ColumnSpec('Name', 'Name', 0.3, blank_mode='rows', keep_nulls=True)], keep_mapping
+            ))
+            masked_df, _ = mask_with_plan(df, kept, rng=1)
+            self.assertEqual(masked_df['Name'].isnull().sum(), 30)
+            self.assertTrue(masked_df['Name'][df['Name'].isnull()].isnull().all())
+
+            values = compile_spec(MaskingSpec([ColumnSpec('Name', 'Name', 0.4, blank_mode='values')], keep_mapping))
+            masked_df, _ = mask_with_plan(df, values, rng=1)
+            blank = masked_df['Name'].isnull().groupby(df['Name'], dropna=False)
+            # Exactly two of the distinct values are blanked, on every row
+            self.assertTrue((blank.all() == blank.any()).all())
+            self.assertEqual(blank.all().sum(), 2)
+
+    def test_mask_data_with_seed_is_reproducible(self):
+        for keep_mapping in (True, False):
+            first, _ = mask_data(self.df, self.selected_columns, self.config_settings, keep_mapping, rng=11)
+            second, _ = mask_data(self.df, self.selected_columns, self.config_settings, keep_mapping, rng=11)
+            pd.testing.assert_frame_equal(first, second)
+
+    def test_row_number_field_type(self):
+        self.selected_columns['Name']['field_type'] = self.create_mock_var('Row Number')
+        self.config_settings['Name'] = {'prefix': 'ROW-', 'suffix': '', 'start': 7, 'pad_width': 3}
+        for keep_mapping in (True, False):
+            masked_df, log = mask_data(self.df, self.selected_columns, self.config_settings, keep_mapping)
+            self.assertEqual(list(masked_df['Name']), ['ROW-007', 'ROW-008', 'ROW-009', 'ROW-010'])
+
+    def test_date_jitter_keeps_mapping(self):
+        df = pd.DataFrame({'Date': pd.to_datetime(['2020-01-01', '2020-06-01', '2020-01-01'])})
+        selected = {'Date': self.selected_columns['Date']}
+        masked_df, _ = mask_data(df, selected, {'Date': {'jitter_days': 10}}, keep_mapping=True, rng=2)
+        self.assertEqual(masked_df['Date'][0], masked_df['Date'][2])
+        self.assertLessEqual((masked_df['Date'] - df['Date']).abs().max(), pd.Timedelta(days=10))
+
+    def test_unmasked_columns_are_shared_not_copied(self):
+        self.selected_columns['Age']['selected'] = self.create_mock_var(False)
+        original = self.df.copy()
+        masked_df, log = mask_data(self.df, self.selected_columns, self.config_settings, rng=3)
+        self.assertTrue(np.shares_memory(masked_df['Age'].to_numpy(), self.df['Age'].to_numpy()))
+        # The original frame is left untouched
+        pd.testing.assert_frame_equal(self.df, original)
+
+        masked_df, log = mask_data(
+            self.df, self.selected_columns, self.config_settings, rng=3, inplace=True
+        )
+        self.assertIs(masked_df, self.df)
+        self.assertFalse((self.df['Name'] == original['Name']).any())
+        pd.testing.assert_series_equal(self.df['Age'], original['Age'])
+
     def test_save_masked_data(self):
         # Create a temporary file path
         temp_original_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
@@ -133,7 +192,7 @@ class TestMask(unittest.TestCase):
         # Since save_masked_data involves file dialogs, we will mock filedialog.asksaveasfilename
         from unittest.mock import patch
 
-        with patch('data_masking_tool.services.mask.filedialog.asksaveasfilename') as mock_saveas:
+        with patch('tkinter.filedialog.asksaveasfilename') as mock_saveas:
             # Mock the save location
             mock_saveas.return_value = temp_original_file.name  # Overwrite the same file for testing
 
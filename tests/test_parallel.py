@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.parallel import mask_parallel
+from app.services.spec import MaskingSpec
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': ['a', 'b', 'c', 'a', 'b', 'a'] * 50,
+            'age': np.arange(300),
+            'joined': pd.date_range('2020-01-01', periods=300),
+            'city': ['Lisbon'] * 300,
+        })
+        self.columns = {
+            'id': {'field_type': 'Email'},
+            'age': {'field_type': 'Number', 'min': 1, 'max': 9, 'is_integer': True, 'blank_percent': 0.2},
+            'joined': {'field_type': 'Date', 'start_date': '2021-01-01', 'end_date': '2021-12-31'},
+        }
+
+    def spec(self, **options):
+        return MaskingSpec.from_dict({'columns': self.columns, **options})
+
+    def test_partitioned_masking(self):
+        masked, log = mask_parallel(self.df, self.spec(keep_mapping=False), workers=2, partition_rows=70, seed=1)
+        self.assertEqual(len(masked), 300)
+        self.assertTrue(masked['age'].dropna().between(1, 9).all())
+        self.assertTrue(masked['age'].isnull().any())
+        self.assertTrue(masked['joined'].between('2021-01-01', '2021-12-31').all())
+        self.assertEqual(masked['id'].isnull().sum(), 0)
+        self.assertEqual(list(masked['city'].unique()), ['Lisbon'])
+        self.assertIn("Column 'city' was not selected for masking.", log)
+
+    def test_seeded_runs_are_reproducible(self):
+        spec = self.spec(keep_mapping=False)
+        first, _ = mask_parallel(self.df, spec, workers=2, partition_rows=70, seed=5)
+        second, _ = mask_parallel(self.df, spec, workers=3, partition_rows=70, seed=5)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_default_partitions_do_not_depend_on_workers(self):
+        spec = self.spec(keep_mapping=False)
+        first, _ = mask_parallel(self.df, spec, workers=2, seed=6)
+        second, _ = mask_parallel(self.df, spec, workers=3, seed=6)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_row_numbers_across_partitions(self):
+        self.columns['city'] = {'field_type': 'Row Number', 'pad_width': 0, 'prefix': ''}
+        for keep_mapping in (True, False):
+            masked, _ = mask_parallel(self.df, self.spec(keep_mapping=keep_mapping), workers=2, partition_rows=70)
+            self.assertEqual(list(masked['city']), [str(i) for i in range(1, 301)])
+
+    def test_jittered_dates_across_partitions(self):
+        self.columns['joined'] = {'field_type': 'Date', 'jitter_days': 2}
+        masked, _ = mask_parallel(self.df, self.spec(keep_mapping=False), workers=2, partition_rows=70, seed=3)
+        self.assertLessEqual((masked['joined'] - self.df['joined']).abs().max(), pd.Timedelta(days=2))
+
+    def test_exact_blank_rows_across_partitions(self):
+        self.columns['age']['blank_mode'] = 'rows'
+        masked, _ = mask_parallel(self.df, self.spec(keep_mapping=False), workers=2, partition_rows=70, seed=4)
+        self.assertEqual(masked['age'].isnull().sum(), 60)
+
+    def test_blanked_values_across_partitions(self):
+        self.columns['id']['blank_percent'] = 0.5
+        self.columns['id']['blank_mode'] = 'values'
+        masked, _ = mask_parallel(self.df, self.spec(keep_mapping=False), workers=2, partition_rows=70, seed=4)
+        rates = masked['id'].isnull().groupby(self.df['id']).mean()
+        # round(0.5 * 3) of the values, each blank in all of its rows
+        self.assertEqual(sorted(rates), [0.0, 1.0, 1.0])
+
+    def test_keep_mapping_columns(self):
+        masked, _ = mask_parallel(self.df, self.spec(keep_mapping=True), workers=2)
+        self.assertEqual(masked['id'].nunique(), 3)
+        self.assertEqual(masked.loc[self.df['id'] == 'a', 'id'].nunique(), 1)
+
+    def test_deterministic_matches_across_partitions(self):
+        spec = self.spec(deterministic=True)
+        masked, _ = mask_parallel(self.df, spec, workers=2, partition_rows=7, secret='k')
+        self.assertEqual(masked.loc[self.df['id'] == 'a', 'id'].nunique(), 1)
+        with self.assertRaises(ValueError):
+            mask_parallel(self.df, spec, workers=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
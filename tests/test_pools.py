@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from app.services.pools import PoolRegistry, ValuePool
+from app.services.generators import FakerGenerator, get_rng
+
+class TestPools(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry = PoolRegistry(size=200, cache_dir=self.temp_dir.name, seed=1)
+        self.rng = get_rng(7)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_pool_is_built_once_and_reused(self):
+        pool = self.registry.get('Email')
+        self.assertEqual(len(pool), 200)
+        self.assertIs(self.registry.get('Email'), pool)
+
+    def test_pool_persists_to_disk(self):
+        pool = self.registry.get('City')
+        path = self.registry.path_for('City', 'en_US')
+        self.assertTrue(os.path.exists(path))
+
+        warm_registry = PoolRegistry(size=200, cache_dir=self.temp_dir.name, seed=1)
+        warm_pool = warm_registry.get('City')
+        np.testing.assert_array_equal(warm_pool.values, pool.values)
+
+    def test_seeded_pools_grow_the_same_way(self):
+        small = self.registry.get('City').values
+        grown = self.registry.get('City', min_size=300).values
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fresh = PoolRegistry(size=200, cache_dir=cache_dir, seed=1).get('City', min_size=300)
+        np.testing.assert_array_equal(grown, fresh.values)
+        # Values already handed out keep their positions
+        np.testing.assert_array_equal(grown[:200], small)
+
+    def test_sample_returns_pool_values(self):
+        values = self.registry.sample('Company', 1000, self.rng)
+        self.assertEqual(len(values), 1000)
+        self.assertTrue(set(values) <= set(self.registry.get('Company').values))
+
+    def test_unique_sampling_without_replacement(self):
+        values = self.registry.sample('Email', 300, self.rng, unique=True)
+        self.assertEqual(len(set(values)), 300)
+
+    def test_unique_sampling_fails_when_pool_is_exhausted(self):
+        pool = ValuePool('Name', ['a', 'b'])
+        with self.assertRaises(ValueError):
+            pool.sample(3, self.rng, unique=True)
+
+    def test_locale_pools_are_separate(self):
+        self.registry.get('Name', locale='de_DE')
+        self.assertTrue(os.path.exists(self.registry.path_for('Name', 'de_DE')))
+        self.assertFalse(os.path.exists(self.registry.path_for('Name', 'en_US')))
+
+    def test_faker_generator_uses_registry(self):
+        values = FakerGenerator('Phone', pools=self.registry).generate(50, self.rng)
+        self.assertTrue(set(values) <= set(self.registry.get('Phone').values))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.preview import read_sample, reservoir_sample, sniff_delimiter
+
+class TestReadSample(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({'Id': range(5000), 'Name': [f'name_{i}' for i in range(5000)]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_sniff_delimiter(self):
+        for delimiter in (';', '\t', '|', ','):
+            path = self.path('data.csv')
+            self.df.head(20).to_csv(path, sep=delimiter, index=False)
+            self.assertEqual(sniff_delimiter(path), delimiter)
+
+        path = self.path('single.csv')
+        with open(path, 'w') as f:
+            f.write('value\n1\n2\n')
+        self.assertEqual(sniff_delimiter(path, default=';'), ';')
+
+    def test_csv_head_sample(self):
+        path = self.path('data.csv')
+        self.df.to_csv(path, sep=';', index=False)
+        sample = read_sample(path, rows=100)
+        self.assertEqual(sample.delimiter, ';')
+        self.assertEqual(sample.columns, ['Id', 'Name'])
+        self.assertEqual(list(sample.sample['Id']), list(range(100)))
+        self.assertFalse(sample.reservoir)
+
+    def test_csv_reservoir_sample(self):
+        path = self.path('data.csv')
+        self.df.to_csv(path, index=False)
+        sample = read_sample(path, delimiter=',', rows=500, reservoir=True, seed=1)
+        ids = sample.sample['Id']
+        self.assertEqual(len(ids), 500)
+        self.assertTrue(ids.is_unique)
+        self.assertTrue(ids.is_monotonic_increasing)
+        # Rows come from the whole file, not just its start
+        self.assertGreater(ids.max(), 4000)
+        self.assertTrue(sample.reservoir)
+
+    def test_reservoir_sample_is_uniform(self):
+        chunks = [pd.DataFrame({'x': np.arange(start, start + 100)}) for start in range(0, 1000, 100)]
+        counts = np.zeros(1000)
+        for seed in range(200):
+            counts[reservoir_sample(iter(chunks), 100, seed)['x']] += 1
+        # Each row is kept with probability 0.1: 20 of 200 runs on average
+        self.assertLess(abs(counts[:500].mean() - counts[500:].mean()), 3)
+        self.assertEqual(len(reservoir_sample(iter(chunks), 5000)), 1000)
+        self.assertIsNone(reservoir_sample(iter([]), 10))
+
+    def test_header_only_csv(self):
+        path = self.path('empty.csv')
+        with open(path, 'w') as f:
+            f.write('Id,Name\n')
+        for reservoir in (False, True):
+            sample = read_sample(path, reservoir=reservoir)
+            self.assertEqual(sample.columns, ['Id', 'Name'])
+            self.assertEqual(len(sample.sample), 0)
+
+    def test_arrow_samples(self):
+        for name in ('data.parquet', 'data.feather'):
+            path = self.path(name)
+            if name.endswith('.parquet'):
+                self.df.to_parquet(path, index=False)
+            else:
+                self.df.to_feather(path)
+            head = read_sample(path, rows=10)
+            self.assertEqual(list(head.sample['Id']), list(range(10)))
+            self.assertIsNone(head.delimiter)
+            sample = read_sample(path, rows=50, reservoir=True, seed=0)
+            self.assertEqual(len(sample.sample), 50)
+            self.assertTrue(sample.sample['Id'].is_monotonic_increasing)
+
+        path = self.path('empty.parquet')
+        self.df.head(0).to_parquet(path, index=False)
+        self.assertEqual(read_sample(path).columns, ['Id', 'Name'])
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            read_sample(self.path('data.json'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import subprocess
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+from app.services.mask import mask_with_plan
+from app.services.pseudonymize import KeyedRandom, keyed_hash
+from app.services.spec import MaskingSpec, SpecError, compile_spec
+
+class TestPseudonymize(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = MaskingSpec.from_dict({
+            'deterministic': True,
+            'keep_mapping': False,
+            'columns': {
+                'id': {'field_type': 'UUID', 'namespace': 'customer_id'},
+                'name': {'field_type': 'Name'},
+                'age': {'field_type': 'Number', 'min': 0, 'max': 99, 'is_integer': True},
+                'joined': {'field_type': 'Date', 'blank_percent': 0.3},
+            }
+        })
+        self.plan = compile_spec(self.spec)
+        self.df = pd.DataFrame({
+            'id': [101, 102, 101, 103],
+            'name': ['Ann', 'Bob', 'Ann', None],
+            'age': [30, 40, 30, 50],
+            'joined': pd.to_datetime(['2020-01-01', '2021-01-01', '2020-01-01', '2022-01-01']),
+        })
+
+    def test_keyed_hash(self):
+        hashes = keyed_hash(np.array(['a', 'b', 'a'], dtype=object), 'secret')
+        self.assertEqual(hashes.dtype, np.uint64)
+        self.assertEqual(hashes[0], hashes[2])
+        self.assertNotEqual(hashes[0], keyed_hash(np.array(['a'], dtype=object), 'other')[0])
+        self.assertNotEqual(hashes[0], keyed_hash(np.array(['a'], dtype=object), 'secret', 'ns')[0])
+        # Numbers and their text form hash the same
+        np.testing.assert_array_equal(keyed_hash(pd.Index([7.0, 8.0]), 'k'), keyed_hash(pd.Index(['7', '8']), 'k'))
+
+    def test_keyed_random_is_row_deterministic(self):
+        hashes = keyed_hash(pd.Index(['x', 'y', 'z']), 'k')
+        first = KeyedRandom(hashes).integers(0, 1000, size=3)
+        second = KeyedRandom(hashes[[2, 0]]).integers(0, 1000, size=2)
+        self.assertEqual(list(second), [first[2], first[0]])
+        uniform = KeyedRandom(hashes).uniform(5, 6, size=3)
+        self.assertTrue(((uniform >= 5) & (uniform < 6)).all())
+        self.assertEqual(KeyedRandom(hashes).integers(0, 256, size=(3, 16), dtype=np.uint8).shape, (3, 16))
+        with self.assertRaises(ValueError):
+            KeyedRandom(hashes).choice(10, size=3, replace=False)
+
+    def test_same_value_same_fake_across_runs(self):
+        first, _ = mask_with_plan(self.df, self.plan, secret='s3cret')
+        second, _ = mask_with_plan(self.df.iloc[::-1].reset_index(drop=True), self.plan, secret='s3cret')
+        pd.testing.assert_frame_equal(first, second.iloc[::-1].reset_index(drop=True))
+        self.assertEqual(first['id'][0], first['id'][2])
+        self.assertTrue(first['age'].between(0, 99).all())
+
+    def test_format_preserving_is_deterministic(self):
+        spec = MaskingSpec.from_dict({
+            'deterministic': True,
+            'columns': {'card': {'field_type': 'Format Preserving', 'checksum': 'luhn'}},
+        })
+        df = pd.DataFrame({'card': ['4111-1111-1111-1111', '5500-0000-0000-0004', '4111-1111-1111-1111']})
+        first, _ = mask_with_plan(df, compile_spec(spec), secret='k')
+        second, _ = mask_with_plan(df.iloc[[1]], compile_spec(spec), secret='k')
+        self.assertEqual(first['card'][0], first['card'][2])
+        self.assertEqual(first['card'][1], second['card'].iloc[0])
+        self.assertRegex(first['card'][0], r'^\d{4}-\d{4}-\d{4}-\d{4}$')
+
+    def test_different_key_gives_different_values(self):
+        first, _ = mask_with_plan(self.df, self.plan, secret='one')
+        second, _ = mask_with_plan(self.df, self.plan, secret='two')
+        self.assertFalse((first['id'] == second['id']).any())
+
+    def test_namespace_links_columns_across_files(self):
+        other_plan = compile_spec(MaskingSpec.from_dict({
+            'deterministic': True,
+            'columns': {'customer': {'field_type': 'UUID', 'namespace': 'customer_id'}}
+        }))
+        orders = pd.DataFrame({'customer': ['103', '101']})
+        masked_orders, _ = mask_with_plan(orders, other_plan, secret='s3cret')
+        masked, _ = mask_with_plan(self.df, self.plan, secret='s3cret')
+        self.assertEqual(masked_orders['customer'][0], masked['id'][3])
+        self.assertEqual(masked_orders['customer'][1], masked['id'][0])
+
+    def test_consistent_across_processes(self):
+        code = (
+            "import pandas as pd;"
+            "from app.services.mask import mask_with_plan;"
+            "from app.services.spec import MaskingSpec, compile_spec;"
+            "plan = compile_spec(MaskingSpec.from_dict({'deterministic': True, 'columns': {'id': {'field_type': 'Email'}}}));"
+            "print(mask_with_plan(pd.DataFrame({'id': ['a', 'b']}), plan, secret='k')[0]['id'].tolist())"
+        )
+        outputs = {
+            subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+            for _ in range(2)
+        }
+        self.assertEqual(len(outputs), 1)
+
+    def test_requires_secret_and_rejects_unique(self):
+        with self.assertRaises(ValueError):
+            mask_with_plan(self.df, self.plan)
+        with self.assertRaises(SpecError):
+            MaskingSpec.from_dict({'deterministic': True, 'columns': {'a': {'field_type': 'Name', 'unique': True}}})
+
+
+if __name__ == '__main__':
+    unittest.main()
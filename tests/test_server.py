@@ -0,0 +1,99 @@
+import http.client
+import io
+import json
+import threading
+import time
+import unittest
+import pandas as pd
+from app.services.server import MaskingServer, RequestBody
+from app.services.spec import MaskingSpec
+
+class TestMaskingServer(unittest.TestCase):
+
+    def setUp(self):
+        spec = MaskingSpec.from_dict({'columns': {'Name': {'field_type': 'Full Name'}}})
+        self.server = MaskingServer(('127.0.0.1', 0), {'people': spec}, max_concurrent=2, wait_seconds=0, chunksize=2, seed=1)
+        self.server.RequestHandlerClass.log_message = lambda *args: None
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        self.df = pd.DataFrame({'Name': ['Alice', 'Bob', 'Alice', 'Eve', 'Bob'], 'Amount': [1, 2, 3, 4, 5]})
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, method, path, body=None, headers=None):
+        connection = http.client.HTTPConnection(*self.server.server_address[:2], timeout=30)
+        try:
+            connection.request(method, path, body, headers or {})
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def test_mask_csv(self):
+        status, body = self.request('POST', '/mask/people', self.df.to_csv(index=False).encode(), {'Content-Type': 'text/csv'})
+        self.assertEqual(status, 200)
+        masked = pd.read_csv(io.BytesIO(body))
+        self.assertEqual(list(masked['Amount']), [1, 2, 3, 4, 5])
+        self.assertNotIn('Alice', set(masked['Name']))
+        # Chunks of two rows share the mapping of the spec
+        self.assertEqual(masked['Name'][0], masked['Name'][2])
+        self.assertEqual(masked['Name'][1], masked['Name'][4])
+
+        # http.client sends an iterator as a chunked body; it is masked with
+        # the mappings kept from the first request
+        chunks = iter([b'Name;Amount\nAlice;', b'7\nZoe;8\n'])
+        status, body = self.request('POST', '/mask/people?delimiter=;', chunks, {'Content-Type': 'text/csv'})
+        self.assertEqual(status, 200)
+        again = pd.read_csv(io.BytesIO(body), sep=';')
+        self.assertEqual(again['Name'][0], masked['Name'][0])
+        self.assertEqual(list(again['Amount']), [7, 8])
+
+    def test_mask_parquet_with_spec_header(self):
+        spec = json.dumps({'columns': {'Name': {'field_type': 'Row Number', 'pad_width': 0, 'prefix': ''}}})
+        status, body = self.request('POST', '/mask?format=parquet', self.df.to_parquet(index=False), {'X-Masking-Spec': spec})
+        self.assertEqual(status, 200)
+        masked = pd.read_parquet(io.BytesIO(body))
+        self.assertEqual(list(masked['Name']), ['1', '2', '3', '4', '5'])
+        self.assertEqual(list(masked['Amount']), [1, 2, 3, 4, 5])
+
+    def test_errors_and_limits(self):
+        csv = self.df.to_csv(index=False).encode()
+        self.assertEqual(self.request('POST', '/mask/unknown', csv, {'Content-Type': 'text/csv'})[0], 404)
+        self.assertEqual(self.request('POST', '/mask/people', csv, {'Content-Type': 'text/plain'})[0], 415)
+        self.assertEqual(self.request('POST', '/mask', csv, {'Content-Type': 'text/csv', 'X-Masking-Spec': '{'})[0], 400)
+        self.assertEqual(self.request('POST', '/mask/people', b'Other\n1\n', {'Content-Type': 'text/csv'})[0], 400)
+        self.assertEqual(self.request('GET', '/nothing')[0], 404)
+
+        # Every slot is taken, so the request is turned away
+        for _ in range(2):
+            self.server.slots.acquire()
+        try:
+            self.assertEqual(self.request('POST', '/mask/people', csv, {'Content-Type': 'text/csv'})[0], 503)
+        finally:
+            for _ in range(2):
+                self.server.slots.release()
+
+        self.request('POST', '/mask/people', csv, {'Content-Type': 'text/csv'})
+        # A request is recorded just after its last byte is sent
+        deadline = time.monotonic() + 10
+        while self.server.metrics.requests < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status, body = self.request('GET', '/metrics')
+        metrics = json.loads(body)
+        self.assertEqual(status, 200)
+        self.assertEqual((metrics['requests'], metrics['errors'], metrics['rejected']), (5, 4, 1))
+        self.assertEqual(metrics['rows'], 5)
+        self.assertEqual(metrics['active'], 0)
+        self.assertGreater(metrics['rows_per_second'], 0)
+        self.assertEqual(metrics['latency_seconds']['window'], 5)
+
+    def test_request_body_reads_chunked_encoding(self):
+        body = RequestBody(io.BytesIO(b'5;ext=1\r\nhello\r\n6\r\n world\r\n0\r\nX-Trailer: 1\r\n\r\nnext'), chunked=True)
+        self.assertEqual(body.read(), b'hello world')
+        self.assertEqual(body.bytes_read, 11)
+        self.assertEqual(RequestBody(io.BytesIO(b'abcdef'), 4).read(), b'abcd')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from unittest.mock import MagicMock
+from app.services.generators import DateGenerator, FakerGenerator, NumberGenerator
+from app.services.spec import (
+    ColumnSpec,
+    MaskingSpec,
+    SpecError,
+    compile_spec,
+    load_spec,
+    save_spec,
+    spec_from_settings,
+)
+
+class TestSpec(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            'keep_mapping': False,
+            'columns': {
+                'Name': {'field_type': 'Full Name', 'blank_percent': 0.1, 'blank_mode': 'rows', 'keep_nulls': True, 'prefix': 'N-'},
+                'Age': {'field_type': 'Number', 'min': 20, 'max': 60, 'is_integer': True},
+                'Date': {'field_type': 'Date', 'start_date': '2020-01-01', 'end_date': '2020-12-31'},
+                'Skipped': {'field_type': 'Name', 'selected': False},
+            }
+        }
+
+    def test_from_dict(self):
+        spec = MaskingSpec.from_dict(self.data)
+        self.assertFalse(spec.keep_mapping)
+        self.assertEqual([c.name for c in spec.columns], ['Name', 'Age', 'Date'])
+        self.assertEqual(spec.columns[0].options, {'prefix': 'N-'})
+        self.assertEqual((spec.columns[0].blank_mode, spec.columns[0].keep_nulls), ('rows', True))
+        self.assertEqual(spec.columns[1].blank_mode, 'random')
+
+    def test_round_trip_through_json(self):
+        spec = MaskingSpec.from_dict({**self.data, 'passthrough': ['Notes']})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'spec.json')
+            save_spec(spec, path)
+            self.assertEqual(load_spec(path), spec)
+
+    def test_sheet_specs(self):
+        spec = MaskingSpec.from_dict({
+            **self.data,
+            'sheets': {'Orders': {'columns': {'Id': {'field_type': 'UUID'}}, 'passthrough': ['Total']}},
+        })
+        self.assertFalse(spec.sheets['Orders'].keep_mapping)
+        self.assertEqual(MaskingSpec.from_dict(spec.to_dict()), spec)
+        plan = compile_spec(spec)
+        self.assertEqual(plan.for_sheet('Orders').column_names, ['Id'])
+        self.assertIs(plan.for_sheet('Other'), plan)
+        with self.assertRaises(SpecError):
+            MaskingSpec.from_dict({'sheets': {'A': {'columns': {'X': {'field_type': 'Unknown'}}}}})
+        with self.assertRaises(SpecError):
+            MaskingSpec.from_dict({'sheets': ['A']})
+
+    def test_load_yaml_spec(self):
+        try:
+            import yaml
+        except ImportError:
+            self.skipTest('PyYAML is not installed')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'spec.yaml')
+            with open(path, 'w') as f:
+                yaml.safe_dump(self.data, f, sort_keys=False)
+            self.assertEqual(load_spec(path), MaskingSpec.from_dict(self.data))
+
+    def test_validation_errors(self):
+        invalid_columns = [
+            ColumnSpec('A', 'Unknown'),
+            ColumnSpec('A', 'Name', blank_percent=1.5),
+            ColumnSpec('A', 'Name', options={'min': 1}),
+            ColumnSpec('A', 'Number', options={'min': 5, 'max': 1}),
+            ColumnSpec('A', 'Date', options={'start_date': 'not a date'}),
+            ColumnSpec('A', 'Date', options={'start_date': '2021-01-01', 'end_date': '2020-01-01'}),
+            ColumnSpec('A', 'Custom List', options={'values': []}),
+            ColumnSpec('A', 'UUID', options={'uuid_type': 'Other'}),
+            ColumnSpec('A', 'Date', options={'distribution': 'normal'}),
+            ColumnSpec('A', 'Date', options={'start_date': '2024-01-06', 'end_date': '2024-01-07', 'distribution': 'weekdays'}),
+            ColumnSpec('A', 'Date', options={'jitter_days': 0}),
+            ColumnSpec('A', 'Date', options={'jitter_days': 3}, namespace='dates'),
+            ColumnSpec('A', 'Format Preserving', options={'checksum': 'crc'}),
+            ColumnSpec('A', 'Format Preserving', namespace='cards'),
+            ColumnSpec('A', 'Row Number', options={'start': -1}),
+            ColumnSpec('A', 'Row Number', options={'pad_width': '4'}),
+            ColumnSpec('A', 'Name', blank_mode='exact'),
+            ColumnSpec('A', 'Name', keep_nulls='yes'),
+        ]
+        for column in invalid_columns:
+            with self.assertRaises(SpecError, msg=str(column)):
+                column.validate()
+        # Empty Date entries of the GUI are saved as ''
+        for options in ({'start_date': ''}, {'end_date': ''}, {'start_date': None}, {'end_date': 20200101}):
+            with self.assertRaisesRegex(SpecError, "Column 'Joined'"):
+                ColumnSpec('Joined', 'Date', options=options).validate()
+        with self.assertRaises(SpecError):
+            MaskingSpec.from_dict({'columns': {'A': {'blank_percent': 0.1}}})
+        with self.assertRaises(SpecError):
+            MaskingSpec.from_dict({'columns': {}, 'passthrough': 'Notes'})
+        with self.assertRaises(SpecError):
+            MaskingSpec.from_dict({'deterministic': True, 'columns': {'A': {'field_type': 'Name', 'blank_mode': 'rows'}}})
+
+    def test_compile_builds_generators(self):
+        plan = compile_spec(MaskingSpec.from_dict(self.data))
+        self.assertEqual(plan.column_names, ['Name', 'Age', 'Date'])
+        self.assertIsInstance(plan.columns[0].generator, FakerGenerator)
+        self.assertEqual(plan.columns[0].generator.prefix, 'N-')
+        self.assertIsInstance(plan.columns[1].generator, NumberGenerator)
+        self.assertIsInstance(plan.columns[2].generator, DateGenerator)
+        self.assertEqual(plan.columns[2].generator.start, np.datetime64('2020-01-01'))
+
+    def test_spec_from_settings_with_tk_variables(self):
+        def var(value):
+            mock_var = MagicMock()
+            mock_var.get.return_value = value
+            return mock_var
+
+        selected_columns = {
+            'Name': {'selected': var(True), 'field_type': var('Name'), 'blank_percent': var(0.2)},
+            'Other': {'selected': var(False), 'field_type': var('Name'), 'blank_percent': var(0.0)},
+        }
+        # Options left over from a previously chosen field type are dropped
+        config_settings = {'Name': {'prefix': 'X', 'values': ['a']}}
+        spec = spec_from_settings(selected_columns, config_settings)
+        self.assertEqual(spec.columns, [ColumnSpec('Name', 'Name', 0.2, {'prefix': 'X'})])
+        self.assertEqual(json.loads(json.dumps(spec.to_dict())), spec.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from unittest.mock import MagicMock
+from app.services.spec import ColumnSpec, MaskingSpec, compile_spec, spec_from_settings
+from app.services.streaming import mask_csv_in_chunks
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name, 'input.csv')
+        self.output_file = os.path.join(self.temp_dir.name, 'output.csv')
+        pd.DataFrame({
+            'CustomerId': ['C1', 'C2', 'C3', 'C1', 'C2', 'C4', 'C1'],
+            'Amount': [10, 20, 30, 40, 50, 60, 70],
+        }).to_csv(self.input_file, index=False)
+
+        self.selected_columns = {
+            'CustomerId': {
+                'selected': self.create_mock_var(True),
+                'field_type': self.create_mock_var('Name'),
+                'blank_percent': self.create_mock_var(0.0)
+            },
+            'Amount': {
+                'selected': self.create_mock_var(False),
+                'field_type': self.create_mock_var('Name'),
+                'blank_percent': self.create_mock_var(0.0)
+            }
+        }
+
+        self.plan = compile_spec(spec_from_settings(self.selected_columns, {}))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_mock_var(self, value):
+        mock_var = MagicMock()
+        mock_var.get.return_value = value
+        return mock_var
+
+    def test_chunks_are_appended_to_output(self):
+        rows, log = mask_csv_in_chunks(
+            self.input_file, self.output_file, self.plan, chunksize=2
+        )
+        self.assertEqual(rows, 7)
+        masked = pd.read_csv(self.output_file)
+        self.assertEqual(len(masked), 7)
+        self.assertEqual(list(masked['Amount']), [10, 20, 30, 40, 50, 60, 70])
+
+    def test_mapping_is_consistent_across_chunks(self):
+        mask_csv_in_chunks(self.input_file, self.output_file, self.plan, chunksize=2)
+        masked = pd.read_csv(self.output_file)
+        # 'C1' appears in the first, second and fourth chunk
+        self.assertEqual(masked['CustomerId'][[0, 3, 6]].nunique(), 1)
+        self.assertEqual(masked['CustomerId'][[1, 4]].nunique(), 1)
+
+    def test_blanked_values_are_consistent_across_chunks(self):
+        spec = MaskingSpec(
+            [ColumnSpec('CustomerId', 'Name', 0.5, blank_mode='values')], keep_mapping=False
+        )
+        for seed in range(5):
+            mask_csv_in_chunks(self.input_file, self.output_file, compile_spec(spec), chunksize=2, rng=seed)
+            masked = pd.read_csv(self.output_file)
+            rates = masked['CustomerId'].isnull().groupby([1, 2, 3, 1, 2, 4, 1]).mean()
+            self.assertTrue(rates.isin([0.0, 1.0]).all())
+
+    def test_row_numbers_continue_across_chunks(self):
+        spec = MaskingSpec([ColumnSpec('CustomerId', 'Row Number', options={'prefix': 'R', 'pad_width': 2})])
+        mask_csv_in_chunks(self.input_file, self.output_file, compile_spec(spec), chunksize=3)
+        masked = pd.read_csv(self.output_file)
+        self.assertEqual(list(masked['CustomerId']), [f'R{i:02d}' for i in range(1, 8)])
+
+    def test_writes_other_formats(self):
+        output_file = os.path.join(self.temp_dir.name, 'out.parquet')
+        rows, _ = mask_csv_in_chunks(self.input_file, output_file, self.plan, chunksize=3)
+        self.assertEqual(len(pd.read_parquet(output_file)), rows)
+
+    def test_column_drifting_to_text_in_a_later_chunk(self):
+        with open(self.input_file, 'w') as f:
+            f.write('CustomerId,Notes\nC1,\nC2,\nC3,12\nC1,see ticket\n')
+        output_file = os.path.join(self.temp_dir.name, 'output.parquet')
+        rows, _ = mask_csv_in_chunks(self.input_file, output_file, self.plan, chunksize=2)
+        self.assertEqual(rows, 4)
+        masked = pd.read_parquet(output_file)
+        self.assertEqual(list(masked['Notes'].fillna('')), ['', '', '12', 'see ticket'])
+
+    def test_rejects_unsupported_output(self):
+        with self.assertRaises(ValueError):
+            mask_csv_in_chunks(
+                self.input_file, os.path.join(self.temp_dir.name, 'out.txt'),
+                self.plan
+            )
+        self.assertEqual(os.listdir(self.temp_dir.name), ['input.csv'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import pandas as pd
+from app.services.spec import MaskingSpec
+from app.services.watch import WatchService
+from app.watch import parse_specs
+
+class TestWatchService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.inbox = os.path.join(self.temp_dir.name, 'inbox')
+        self.outbox = os.path.join(self.temp_dir.name, 'outbox')
+        os.makedirs(self.inbox)
+        self.spec = MaskingSpec.from_dict({'columns': {'Name': {'field_type': 'Full Name'}}})
+        self.messages = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def service(self, **options):
+        return WatchService({'csv': self.spec}, self.outbox, log=self.messages.append, **options)
+
+    def drop(self, name, names):
+        path = os.path.join(self.inbox, name)
+        pd.DataFrame({'Name': names, 'Amount': range(len(names))}).to_csv(path, sep=';', index=False)
+        return path
+
+    def test_scan_waits_for_complete_files(self):
+        service = self.service()
+        path = self.drop('a.csv', ['Alice'])
+        self.drop('b.parquet', ['Bob'])
+        open(os.path.join(self.inbox, '.hidden.csv'), 'w').close()
+        self.assertEqual(service.scan([self.inbox]), [])
+        self.assertEqual(service.scan([self.inbox]), [path])
+        self.assertEqual(service.scan([self.inbox]), [])
+        # A file written again is masked again
+        self.drop('a.csv', ['Alice', 'Bob'])
+        service.scan([self.inbox])
+        self.assertEqual(service.scan([self.inbox]), [path])
+
+    def test_scan_skips_files_masked_before(self):
+        masked = self.drop('a.csv', ['Alice'])
+        path = self.drop('b.csv', ['Bob'])
+        os.makedirs(self.outbox)
+        service = self.service()
+        service.mask_file(masked)
+        # As after a restart: a new service sees both files for the first time
+        service = self.service()
+        service.scan([self.inbox])
+        self.assertEqual(service.scan([self.inbox]), [path])
+        # An input changed after it was masked is masked again
+        stat = os.stat(masked)
+        os.utime(masked, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**10))
+        service.scan([self.inbox])
+        self.assertEqual(service.scan([self.inbox]), [masked])
+
+    def test_run_masks_dropped_files_with_warm_mappings(self):
+        for i in range(3):
+            self.drop(f'export_{i}.csv', ['Alice', 'Bob', f'Person {i}'])
+        service = self.service(workers=2, queue_size=1, poll_interval=0.01, seed=3)
+
+        async def run():
+            stop = asyncio.Event()
+            task = asyncio.create_task(service.run([self.inbox], stop))
+            while service.processed + service.failed < 3:
+                await asyncio.sleep(0.01)
+            stop.set()
+            await task
+
+        asyncio.run(asyncio.wait_for(run(), 30))
+        self.assertEqual(service.failed, 0)
+        masked = [pd.read_csv(os.path.join(self.outbox, f'export_{i}_masked.csv'), sep=';') for i in range(3)]
+        # Alice and Bob get the same fake names in every file
+        self.assertEqual(len({tuple(df['Name'][:2]) for df in masked}), 1)
+        self.assertNotIn('Alice', set(masked[0]['Name']))
+        self.assertEqual(list(masked[2]['Amount']), [0, 1, 2])
+
+    def test_output_folder_must_not_be_watched(self):
+        service = WatchService({'*': self.spec}, self.inbox, log=self.messages.append)
+        with self.assertRaises(ValueError):
+            asyncio.run(service.run([self.inbox]))
+
+    def test_parse_specs(self):
+        self.assertEqual(parse_specs(['csv=a.json', '.XLSX=b.yaml', 'c.json']), {'csv': 'a.json', 'xlsx': 'b.yaml', '*': 'c.json'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+import pandas as pd
+from app.services.mask import mask_with_plan
+from app.services.spec import ColumnSpec, MaskingSpec, compile_spec
+from app.ui.worker import BackgroundTask, TaskCancelled
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks are run by run_until_done."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run_until_done(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            self.callbacks.pop(0)()
+            time.sleep(0.001)
+
+class TestBackgroundTask(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.updates = []
+        self.results = []
+        self.plan = compile_spec(MaskingSpec([
+            ColumnSpec('A', 'UUID'), ColumnSpec('B', 'Number'), ColumnSpec('C', 'Date'),
+        ], keep_mapping=False))
+        self.df = pd.DataFrame({'A': range(10), 'B': range(10), 'C': range(10)})
+
+    def start(self, func):
+        return BackgroundTask(
+            self.root,
+            func,
+            lambda result, error: self.results.append((result, error)),
+            lambda *update: self.updates.append(update),
+        ).start()
+
+    def test_progress_reaches_main_thread(self):
+        main_thread = threading.current_thread()
+        threads = []
+
+        def job(progress):
+            threads.append(threading.current_thread())
+            return mask_with_plan(self.df, self.plan, rng=0, progress=progress)[0]
+
+        self.start(job)
+        self.root.run_until_done()
+        self.assertIsNot(threads[0], main_thread)
+        self.assertEqual(self.updates, [('mask', 1, 3), ('mask', 2, 3), ('mask', 3, 3)])
+        result, error = self.results[0]
+        self.assertIsNone(error)
+        self.assertEqual(len(result), 10)
+
+    def test_cancel_stops_between_columns(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def progress_then_wait(progress):
+            def slow_progress(stage, done, total=None):
+                progress(stage, done, total)
+                started.set()
+                release.wait(5)
+            return mask_with_plan(self.df, self.plan, rng=0, progress=slow_progress)
+
+        task = self.start(progress_then_wait)
+        started.wait(5)
+        task.cancel()
+        release.set()
+        self.root.run_until_done()
+        result, error = self.results[0]
+        self.assertIsNone(result)
+        self.assertIsInstance(error, TaskCancelled)
+        self.assertEqual(self.updates, [('mask', 1, 3)])
+
+if __name__ == '__main__':
+    unittest.main()
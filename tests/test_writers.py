@@ -0,0 +1,152 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import io
+from app.services.writers import EXCEL_MAX_ROWS, StreamWriter, open_writer, write_dataframe
+
+class TestWriters(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({
+            'Name': ['Alice', None, 'Charlie'],
+            'Age': [25.0, np.nan, 35.0],
+            'Date': pd.to_datetime(['2020-01-01', None, '2022-03-10']),
+        })
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_round_trip_every_format(self):
+        readers = {
+            'out.csv': lambda p: pd.read_csv(p, parse_dates=['Date']),
+            'out.parquet': pd.read_parquet,
+            'out.feather': pd.read_feather,
+            'out.arrow': pd.read_feather,
+            'out.xlsx': pd.read_excel,
+        }
+        for name, read in readers.items():
+            write_dataframe(self.df, self.path(name))
+            result = read(self.path(name))
+            self.assertEqual(list(result.columns), ['Name', 'Age', 'Date'], name)
+            self.assertEqual(result['Age'].isnull().sum(), 1, name)
+            self.assertEqual(result['Date'][2], pd.Timestamp('2022-03-10'), name)
+
+    def test_chunks_are_appended(self):
+        for name in ('out.csv', 'out.parquet', 'out.feather', 'out.xlsx'):
+            with open_writer(self.path(name)) as writer:
+                writer.write(self.df)
+                writer.write(self.df)
+            self.assertEqual(writer.rows, 6)
+        self.assertEqual(len(pd.read_csv(self.path('out.csv'))), 6)
+        self.assertEqual(len(pd.read_parquet(self.path('out.parquet'))), 6)
+        self.assertEqual(len(pd.read_feather(self.path('out.feather'))), 6)
+        self.assertEqual(len(pd.read_excel(self.path('out.xlsx'))), 6)
+
+    def test_column_types_drifting_between_chunks(self):
+        chunks = [
+            pd.DataFrame({'Code': [None, None], 'Amount': [1, 2], 'Note': [1.5, 2.5]}),
+            pd.DataFrame({'Code': [7.0, None], 'Amount': [3.5, 4.0], 'Note': [3.0, 4.0]}),
+            pd.DataFrame({'Code': ['A-1', 'B-2'], 'Amount': [5, 6], 'Note': ['n/a', 'x']}),
+        ]
+        for name, read in (('out.parquet', pd.read_parquet), ('out.feather', pd.read_feather)):
+            with open_writer(self.path(name)) as writer:
+                for chunk in chunks:
+                    writer.write(chunk)
+            result = read(self.path(name))
+            self.assertEqual(list(result['Code'].fillna('')), ['', '', '7', '', 'A-1', 'B-2'], name)
+            self.assertEqual(list(result['Amount']), [1, 2, 3.5, 4, 5, 6], name)
+            self.assertEqual(list(result['Note']), ['1.5', '2.5', '3', '4', 'n/a', 'x'], name)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['out.feather', 'out.parquet'])
+
+        # A stream cannot be rewritten: empty first chunks become strings
+        sink = io.BytesIO()
+        writer = StreamWriter(sink, 'parquet')
+        writer.write(chunks[0])
+        writer.write(chunks[2][['Code']].assign(Amount=[5, 6], Note=[1.0, 2.0]))
+        with self.assertRaises(ValueError):
+            writer.write(chunks[2])
+        writer.close()
+        self.assertEqual(list(pd.read_parquet(io.BytesIO(sink.getvalue()))['Code'].fillna('')), ['', '', 'A-1', 'B-2'])
+
+    def test_excel_sheets(self):
+        with open_writer(self.path('out.xlsx')) as writer:
+            writer.start_sheet('First')
+            writer.write(self.df)
+            writer.write(self.df)
+            writer.start_sheet('Second')
+            writer.write(self.df.head(1))
+            writer.start_sheet('Empty')
+            writer.write(self.df.head(0))
+        sheets = pd.read_excel(self.path('out.xlsx'), sheet_name=None)
+        self.assertEqual(list(sheets), ['First', 'Second', 'Empty'])
+        self.assertEqual([len(sheet) for sheet in sheets.values()], [6, 1, 0])
+        self.assertEqual(list(sheets['Empty'].columns), ['Name', 'Age', 'Date'])
+        self.assertEqual(writer.rows, 7)
+
+    def test_progress_writes_in_chunks(self):
+        updates = []
+        write_dataframe(
+            self.df, self.path('out.csv'), chunksize=2,
+            progress=lambda *update: updates.append(update),
+        )
+        self.assertEqual(updates, [('write', 2, 3), ('write', 3, 3)])
+        self.assertEqual(len(pd.read_csv(self.path('out.csv'))), 3)
+
+        def cancel(*update):
+            raise KeyboardInterrupt
+        with self.assertRaises(KeyboardInterrupt):
+            write_dataframe(self.df, self.path('cancelled.csv'), chunksize=2, progress=cancel)
+        self.assertEqual(os.listdir(self.temp_dir.name), ['out.csv'])
+
+    def test_failed_write_leaves_no_file(self):
+        with self.assertRaises(RuntimeError):
+            with open_writer(self.path('out.csv')) as writer:
+                writer.write(self.df)
+                raise RuntimeError('boom')
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_existing_file_is_replaced(self):
+        write_dataframe(self.df, self.path('out.csv'))
+        write_dataframe(self.df.head(1), self.path('out.csv'))
+        self.assertEqual(len(pd.read_csv(self.path('out.csv'))), 1)
+
+    @unittest.skipIf(os.name == 'nt', 'file modes are POSIX only')
+    def test_output_gets_the_mode_of_new_files(self):
+        with patch('app.services.writers.FILE_MODE', 0o640):
+            write_dataframe(self.df, self.path('out.parquet'))
+        self.assertEqual(os.stat(self.path('out.parquet')).st_mode & 0o777, 0o640)
+
+    def test_excel_row_limit(self):
+        with patch('app.services.writers.EXCEL_MAX_ROWS', 3):
+            with self.assertRaises(ValueError):
+                write_dataframe(self.df, self.path('out.xlsx'))
+        self.assertFalse(os.path.exists(self.path('out.xlsx')))
+        self.assertEqual(EXCEL_MAX_ROWS, 1_048_576)
+
+    def test_stream_writer(self):
+        for file_format, read in (('csv', pd.read_csv), ('parquet', pd.read_parquet), ('feather', pd.read_feather)):
+            sink = io.BytesIO()
+            writer = StreamWriter(sink, file_format)
+            writer.write(self.df.iloc[:2])
+            writer.write(self.df.iloc[2:])
+            writer.close()
+            self.assertEqual(writer.rows, 3)
+            result = read(io.BytesIO(sink.getvalue()))
+            self.assertEqual(list(result['Name'].fillna('')), ['Alice', '', 'Charlie'], file_format)
+        with self.assertRaises(ValueError):
+            StreamWriter(io.BytesIO(), 'xlsx')
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            write_dataframe(self.df, self.path('out.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()